@@ -0,0 +1,56 @@
+"""
+Benchmark: limpieza de texto vectorizada (`clean_column`) vs. `apply(clean_text)`.
+
+Mide la etapa de limpieza de `process_dataframe` (cuatro columnas de texto más
+los valores explotados) y verifica que ambos caminos den el mismo resultado.
+Uso: python benchmarks/bench_clean_text.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from synthetic import generate_raw_survey
+import data_utils
+
+TEXT_COLUMNS = ["Correo electrónico", "Nombre", "Atributo", "Valor"]
+
+
+def clean_stage(df: pd.DataFrame, clean) -> pd.DataFrame:
+    """
+    Limpia las columnas de texto y los valores explotados con `clean(serie)`.
+    """
+    for col in TEXT_COLUMNS:
+        df[col] = clean(df[col])
+    exploded = df.assign(Valor=df['Valor'].astype(str).str.split(';')).explode('Valor')
+    exploded['Valor'] = clean(exploded['Valor'])
+    return exploded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'filas':>10} {'apply (s)':>10} {'vector (s)':>11} {'speedup':>8}")
+    for n_rows in args.sizes:
+        raw = generate_raw_survey(n_rows)
+        # Espacios, nbsp y saltos de línea como los que llegan desde Forms/Excel
+        raw['Nombre'] = '  ' + raw['Nombre'] + '\xa0'
+        raw['Valor'] = raw['Valor'].str.replace(' ', '  \n', n=1, regex=False)
+
+        t0 = time.perf_counter()
+        esperado = clean_stage(raw.copy(), lambda s: s.apply(data_utils.clean_text))
+        t_legacy = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        obtenido = clean_stage(raw.copy(), data_utils.clean_column)
+        t_vector = time.perf_counter() - t0
+
+        pd.testing.assert_frame_equal(obtenido, esperado)
+        print(f"{n_rows:>10} {t_legacy:>10.3f} {t_vector:>11.3f} {t_legacy / t_vector:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: columnas derivadas vectorizadas vs. `apply` fila a fila.
+
+Uso: python benchmarks/bench_derived_columns.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from synthetic import generate_raw_survey
+import data_utils
+
+
+def legacy_add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Implementación original (fila a fila) usada como referencia.
+    """
+    df['Likert_Score'] = df.apply(lambda row: data_utils.map_likert_score(row), axis=1)
+    df['NPS_Class'] = df.apply(lambda row: data_utils.map_nps_class(row), axis=1)
+    return df
+
+
+def exploded_frame(n_rows: int) -> pd.DataFrame:
+    """
+    Tabla explotada de `n_rows` filas lista para derivar columnas.
+    """
+    raw = generate_raw_survey(n_rows)
+    raw['Valor'] = raw['Valor'].str.split(';')
+    return raw.explode('Valor').head(n_rows).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'filas':>10} {'apply (s)':>10} {'vector (s)':>11} {'speedup':>8}")
+    for n_rows in args.sizes:
+        base = exploded_frame(n_rows)
+
+        t0 = time.perf_counter()
+        esperado = legacy_add_derived_columns(base.copy())
+        t_legacy = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        obtenido = data_utils.add_derived_columns(base.copy())
+        t_vector = time.perf_counter() - t0
+
+        pd.testing.assert_series_equal(obtenido['Likert_Score'], esperado['Likert_Score'].astype(float))
+        assert np.array_equal(
+            obtenido['NPS_Class'].fillna('').to_numpy(dtype=object),
+            esperado['NPS_Class'].fillna('').to_numpy(dtype=object)
+        )
+        print(f"{n_rows:>10} {t_legacy:>10.3f} {t_vector:>11.3f} {t_legacy / t_vector:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
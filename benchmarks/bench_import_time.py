@@ -0,0 +1,128 @@
+"""
+Benchmark: tiempo de import de los módulos y latencia de arranque del dashboard.
+
+Para cada módulo corre `python -X importtime -c "import <módulo>"` en un proceso
+nuevo y muestra los imports más caros (tiempo acumulado) y el costo de los
+módulos propios. Después mide el arranque en frío de `dashboard.py` (importar
+Streamlit y la primera ejecución del script, con el snapshot ya generado) en
+procesos nuevos y lo compara con el presupuesto `STARTUP_BUDGET_MS`: si la
+mediana lo supera, termina con código 1.
+
+Uso: python benchmarks/bench_import_time.py [--modules dashboard data_utils charts]
+                                            [--top 15] [--repeat 3] [--budget-ms 2500]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Presupuesto de arranque en frío de dashboard.py (import de Streamlit + primera ejecución)
+STARTUP_BUDGET_MS = 2500
+
+# Módulos propios (para separar su costo del de las dependencias)
+PROJECT_MODULES = {
+    os.path.splitext(f)[0] for f in os.listdir(REPO_DIR) if f.endswith('.py')
+}
+
+_IMPORTTIME_RE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+# Arranque medido en un proceso nuevo: import de Streamlit, primera ejecución y un rerun
+_STARTUP_SNIPPET = """
+import json, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file({path!r}, default_timeout=120)
+at.run()
+t2 = time.perf_counter()
+at.run()
+t3 = time.perf_counter()
+assert not at.exception, at.exception
+print(json.dumps({{'import_ms': (t1 - t0) * 1000, 'first_run_ms': (t2 - t1) * 1000,
+                  'rerun_ms': (t3 - t2) * 1000}}))
+"""
+
+
+def import_report(module: str) -> List[Dict]:
+    """
+    Imports de `module` en un proceso nuevo: [{'module', 'self_ms', 'cumulative_ms', 'depth'}].
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True
+    )
+    filas = []
+    for linea in proc.stderr.splitlines():
+        m = _IMPORTTIME_RE.match(linea)
+        if m:
+            filas.append({
+                'module': m.group(4),
+                'self_ms': int(m.group(1)) / 1000,
+                'cumulative_ms': int(m.group(2)) / 1000,
+                'depth': len(m.group(3)) // 2,
+            })
+    return filas
+
+
+def summarize_imports(module: str, top: int = 15) -> Dict:
+    """
+    Resumen del import de `module`: total, costo propio y los imports más caros.
+    """
+    filas = import_report(module)
+    total = sum(f['cumulative_ms'] for f in filas if f['depth'] == 0)
+    propios = sum(f['self_ms'] for f in filas if f['module'] in PROJECT_MODULES)
+    mas_caros = sorted((f for f in filas if f['depth'] <= 1),
+                       key=lambda f: f['cumulative_ms'], reverse=True)[:top]
+    return {'module': module, 'total_ms': round(total, 1), 'project_ms': round(propios, 1),
+            'top': mas_caros}
+
+
+def startup_latency(repeat: int = 3) -> Dict:
+    """
+    Arranque en frío de dashboard.py (mediana de `repeat` procesos nuevos).
+    """
+    snippet = _STARTUP_SNIPPET.format(path=os.path.join(REPO_DIR, 'dashboard.py'))
+    muestras = []
+    for _ in range(repeat + 1):  # la primera corrida solo genera el snapshot si falta
+        proc = subprocess.run([sys.executable, '-c', snippet], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True)
+        muestras.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    muestras = muestras[1:]
+    resultado = {k: round(statistics.median(m[k] for m in muestras), 1) for k in muestras[0]}
+    resultado['startup_ms'] = round(resultado['import_ms'] + resultado['first_run_ms'], 1)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--modules', nargs='+', default=['dashboard', 'data_utils', 'charts'])
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        resumen = summarize_imports(module, args.top)
+        print(f"\nimport {module}: {resumen['total_ms']:.1f} ms "
+              f"(módulos propios: {resumen['project_ms']:.1f} ms)")
+        for fila in resumen['top']:
+            print(f"  {fila['cumulative_ms']:>8.1f} ms  {'  ' * fila['depth']}{fila['module']}")
+
+    arranque = startup_latency(args.repeat)
+    estado = "OK" if arranque['startup_ms'] <= args.budget_ms else "EXCEDIDO"
+    print(f"\nArranque de dashboard.py (mediana de {args.repeat}): "
+          f"import Streamlit {arranque['import_ms']:.0f} ms + primera ejecución "
+          f"{arranque['first_run_ms']:.0f} ms = {arranque['startup_ms']:.0f} ms "
+          f"(rerun {arranque['rerun_ms']:.0f} ms) | presupuesto {args.budget_ms:.0f} ms: {estado}")
+    sys.exit(0 if estado == "OK" else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Reporte de memoria: tabla procesada con columnas de texto vs. representación compacta.
+
+Uso: python benchmarks/bench_memory_footprint.py [--rows 200000]
+"""
+
+import argparse
+
+import pandas as pd
+
+from synthetic import generate_raw_survey
+import data_utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    raw = generate_raw_survey(args.rows)
+    texto = data_utils.process_dataframe(raw.copy(), compact=False)
+    compacto = data_utils.compact_dataframe(texto.copy())
+
+    antes = texto.memory_usage(deep=True, index=False) / 1024 / 1024
+    despues = compacto.memory_usage(deep=True, index=False) / 1024 / 1024
+    reporte = pd.DataFrame({'antes (MB)': antes, 'después (MB)': despues}).fillna(0)
+    reporte.loc['TOTAL'] = reporte.sum()
+    reporte['reducción'] = (reporte['antes (MB)'] / reporte['después (MB)']).map(
+        lambda x: f"{x:.1f}x" if x != float('inf') else '-'
+    )
+
+    print(f"Filas procesadas: {len(compacto):,}")
+    print(reporte.round(2).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: ingesta de varias encuestas (una por unidad) en serie vs. en un pool de procesos.
+
+Genera `--files` libros sintéticos en un directorio temporal y mide
+`storage.load_sources` en frío (sin snapshots) con un solo proceso y con el pool
+completo, y después la carga en caliente desde los snapshots. Verifica que ambos
+caminos den el mismo DataFrame.
+Uso: python benchmarks/bench_multi_source.py [--files 8] [--rows 20000] [--workers 4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from synthetic import generate_raw_survey, write_survey
+import storage
+
+
+def timed_load(source: str, cache_dir: str, workers: int):
+    """
+    Carga la fuente y devuelve (DataFrame, segundos).
+    """
+    t0 = time.perf_counter()
+    df = storage.load_sources(source, cache_dir=cache_dir, max_workers=workers)
+    return df, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=8)
+    parser.add_argument('--rows', type=int, default=20_000, help="Filas crudas por archivo")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, 'encuestas')
+        os.makedirs(source)
+        for i in range(args.files):
+            write_survey(generate_raw_survey(args.rows, seed=i),
+                         os.path.join(source, f"unidad_{i:02d}.xlsx"))
+
+        serie, t_serie = timed_load(source, os.path.join(workdir, 'cache_serie'), 1)
+        pool, t_pool = timed_load(source, os.path.join(workdir, 'cache_pool'), args.workers)
+        _, t_caliente = timed_load(source, os.path.join(workdir, 'cache_pool'), args.workers)
+        pd.testing.assert_frame_equal(pool, serie)
+
+    print(f"{args.files} archivos x {args.rows} filas -> {len(pool)} filas procesadas")
+    print(f"  {'en serie (1 proceso)':<26}{t_serie:8.2f} s")
+    print(f"  {f'pool ({args.workers} procesos)':<26}{t_pool:8.2f} s  ({t_serie / t_pool:.1f}x)")
+    print(f"  {'desde snapshots':<26}{t_caliente:8.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: estadísticas desde el cubo de respuestas vs. reagrupando las filas.
+
+Verifica que ambos caminos den exactamente el mismo resultado para el total,
+para selecciones aleatorias de personas y, con dos copias del dataset como
+fuentes distintas, para el filtro por fuente.
+Uso: python benchmarks/bench_response_cube.py [--sizes 100000 1000000] [--personas 50]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from synthetic import generate_raw_survey
+import cube
+import data_utils
+import indexes
+import storage
+from constants import Q_YO_PREFIX, Q_EQ_PREFIX
+
+SECCIONES = {
+    'kpis': data_utils.compute_kpis,
+    'actividades': data_utils.get_actividades_stats,
+    'modos': data_utils.get_modos_stats,
+    'likert_yo': lambda df: data_utils.get_likert_stats(df, Q_YO_PREFIX),
+    'likert_equipo': lambda df: data_utils.get_likert_stats(df, Q_EQ_PREFIX),
+    'distribucion_yo': lambda df: data_utils.get_likert_distribution(df, Q_YO_PREFIX),
+}
+
+
+def assert_same(a, b):
+    """
+    Compara resultados de ambos caminos.
+    """
+    if isinstance(a, pd.DataFrame):
+        pd.testing.assert_frame_equal(a, b)
+    else:
+        assert a == b, (a, b)
+
+
+def timed(func, df):
+    """
+    Ejecuta `func(df)` y devuelve (resultado, milisegundos).
+    """
+    t0 = time.perf_counter()
+    result = func(df)
+    return result, (time.perf_counter() - t0) * 1000
+
+
+def compare(sin: pd.DataFrame, con: pd.DataFrame, etiqueta: str, **filtro) -> None:
+    """
+    Compara cada sección con y sin cubo para un filtro e imprime los tiempos.
+    """
+    sin = data_utils.filter_df(sin, **filtro)
+    con = data_utils.filter_df(con, **filtro)
+    for nombre, func in SECCIONES.items():
+        esperado, t_filas = timed(func, sin)
+        obtenido, t_cubo = timed(func, con)
+        assert_same(esperado, obtenido)
+        print(f"{nombre:>16} {etiqueta:>10} {t_filas:>11.1f} {t_cubo:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--personas', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n_rows in args.sizes:
+        filas = data_utils.process_dataframe(generate_raw_survey(n_rows))
+        con_cubo = filas.copy()
+        t0 = time.perf_counter()
+        cube.get_response_cube(con_cubo)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        nombres = indexes.person_names(filas)
+        seleccion = list(rng.choice(nombres, size=min(args.personas, len(nombres)), replace=False))
+        print(f"\n{len(filas):,} filas procesadas - cubo construido en {build_ms:.0f} ms")
+        print(f"{'sección':>16} {'selección':>10} {'filas (ms)':>11} {'cubo (ms)':>10}")
+        for etiqueta, personas in (('todos', None), (f'{len(seleccion)} pers.', seleccion)):
+            compare(filas, con_cubo, etiqueta, personas=personas)
+
+        # Dos fuentes con las mismas respuestas: el cubo no debe fusionarlas
+        fuentes = storage.concat_sources({'a': filas, 'b': filas})
+        fuentes_cubo = fuentes.copy()
+        cube.get_response_cube(fuentes_cubo)
+        compare(fuentes, fuentes_cubo, 'fuente a', fuentes=['a'])
+
+
+if __name__ == '__main__':
+    main()
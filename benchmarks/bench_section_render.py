@@ -0,0 +1,89 @@
+"""
+Benchmark: tiempo de render por sección del dashboard, en frío vs. en caliente.
+
+Cada sección calcula sus estadísticas, arma sus figuras y las serializa a JSON
+(lo mismo que hace `st.plotly_chart`). En frío se vacía el cache antes de cada
+sección; en caliente se repite la sección con el cache ya poblado.
+Uso: python benchmarks/bench_section_render.py [--sizes 10000 1000000] [--repeat 5]
+"""
+
+import argparse
+import time
+
+from synthetic import generate_raw_survey
+import charts
+import cube
+import data_utils
+import memo
+from constants import Q_SENTIMIENTO, Q_YO_PREFIX, Q_EQ_PREFIX
+
+
+def _portada(df):
+    data_utils.compute_kpis(df)
+    return [
+        charts.create_sentiment_chart(df, Q_SENTIMIENTO, "pie"),
+        charts.create_nps_pie_chart(df),
+    ]
+
+
+def _uso(df):
+    return [
+        charts.create_horizontal_bar_chart(
+            data_utils.get_actividades_stats(df), "Todas las actividades utilizadas"
+        ),
+        charts.create_horizontal_bar_chart(
+            data_utils.get_modos_stats(df), "Modos de uso preferidos"
+        ),
+    ]
+
+
+def _percepcion(prefix, title):
+    def render(df):
+        data_utils.get_likert_stats(df, prefix)
+        return [charts.create_likert_stacked_bar(df, prefix, title)]
+    return render
+
+
+SECCIONES = {
+    'Portada': _portada,
+    'Uso': _uso,
+    'Percepción Individual': _percepcion(Q_YO_PREFIX, "Percepción Individual - Distribución"),
+    'Percepción Equipo': _percepcion(Q_EQ_PREFIX, "Percepción del Equipo - Distribución"),
+}
+
+
+def render_ms(render, df) -> float:
+    """
+    Renderiza una sección (estadísticas + figuras + JSON) y devuelve los milisegundos.
+    """
+    t0 = time.perf_counter()
+    for fig in render(df):
+        fig.to_json()
+    return (time.perf_counter() - t0) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for n_rows in args.sizes:
+        df = data_utils.process_dataframe(generate_raw_survey(n_rows))
+        cube.get_response_cube(df)
+        memo.register_dataset(df)
+
+        print(f"\n{len(df):,} filas procesadas")
+        print(f"{'sección':>22} {'frío (ms)':>10} {'caliente (ms)':>14}")
+        for nombre, render in SECCIONES.items():
+            frio = []
+            caliente = []
+            for _ in range(args.repeat):
+                memo.clear_cache()
+                frio.append(render_ms(render, df))
+                caliente.append(render_ms(render, df))
+            print(f"{nombre:>22} {min(frio):>10.1f} {min(caliente):>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
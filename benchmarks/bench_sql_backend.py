@@ -0,0 +1,105 @@
+"""
+Benchmark: estadísticas consultando la base SQLite (sqlstore.py) vs. en memoria.
+
+Guarda el dataset sintético en una base temporal, verifica que `read_frame`
+reconstruya el mismo DataFrame y que cada sección dé exactamente el mismo
+resultado en ambos backends, sin filtro y con filtros por personas, fechas y
+dominio.
+Uso: python benchmarks/bench_sql_backend.py [--sizes 100000 1000000] [--personas 50]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from synthetic import generate_raw_survey
+import data_utils
+import indexes
+import sqlstore
+from constants import Q_YO_PREFIX, Q_EQ_PREFIX, Q_COMENTARIOS, Q_IMPEDIMENTOS
+
+SECCIONES = {
+    'kpis': data_utils.compute_kpis,
+    'actividades': data_utils.get_actividades_stats,
+    'modos': data_utils.get_modos_stats,
+    'likert_yo': lambda df: data_utils.get_likert_stats(df, Q_YO_PREFIX),
+    'likert_equipo': lambda df: data_utils.get_likert_stats(df, Q_EQ_PREFIX),
+    'impedimentos': lambda df: data_utils.get_text_responses(df, Q_IMPEDIMENTOS),
+    'comentarios': lambda df: data_utils.get_text_responses(df, Q_COMENTARIOS),
+}
+
+
+def assert_same(a, b):
+    """
+    Compara resultados de ambos backends.
+    """
+    if isinstance(a, pd.DataFrame):
+        pd.testing.assert_frame_equal(a, b)
+    else:
+        assert a == b and type(a) is type(b), (a, b)
+
+
+def timed(func, df):
+    """
+    Ejecuta `func(df)` y devuelve (resultado, milisegundos).
+    """
+    t0 = time.perf_counter()
+    result = func(df)
+    return result, (time.perf_counter() - t0) * 1000
+
+
+def filtros(df: pd.DataFrame, personas: int, rng: np.random.Generator):
+    """
+    Selecciones de prueba: (etiqueta, kwargs de `filter_df`).
+    """
+    nombres = indexes.person_names(df)
+    fechas = df['Hora de inicio'].dropna().sort_values()
+    desde = fechas.iloc[len(fechas) // 4].date()
+    hasta = fechas.iloc[len(fechas) // 2].date()
+    dominio = indexes.email_domain(df['Correo electrónico'].dropna().iloc[0])
+    return [
+        ('todos', {}),
+        (f'{personas} pers.', {'personas': list(rng.choice(nombres, size=min(personas, len(nombres)),
+                                                           replace=False))}),
+        ('fechas', {'fecha_desde': desde, 'fecha_hasta': hasta}),
+        ('dominio', {'dominios': [dominio]}),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--personas', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_rows in args.sizes:
+            filas = data_utils.process_dataframe(generate_raw_survey(n_rows))
+            path = os.path.join(workdir, f"survey-{n_rows}.sqlite")
+            t0 = time.perf_counter()
+            sqlstore.write_database(filas, path)
+            write_ms = (time.perf_counter() - t0) * 1000
+            pd.testing.assert_frame_equal(sqlstore.read_frame(path), filas)
+
+            con_sql = filas.copy()
+            sqlstore.attach(con_sql, path)
+            print(f"\n{len(filas):,} filas procesadas - base escrita en {write_ms:.0f} ms "
+                  f"({os.path.getsize(path) / 1e6:.1f} MB)")
+            print(f"{'sección':>14} {'selección':>10} {'pandas (ms)':>12} {'sqlite (ms)':>12}")
+            for etiqueta, kwargs in filtros(filas, args.personas, rng):
+                sin = data_utils.filter_df(filas, **kwargs)
+                con = data_utils.filter_df(con_sql, **kwargs)
+                for nombre, func in SECCIONES.items():
+                    esperado, t_pandas = timed(func, sin)
+                    obtenido, t_sql = timed(func, con)
+                    assert_same(esperado, obtenido)
+                    print(f"{nombre:>14} {etiqueta:>10} {t_pandas:>12.1f} {t_sql:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: memoria pico (RSS) de la ingesta en memoria vs. streaming por chunks.
+
+Cada medición corre en un subproceso propio para que el pico no se contamine.
+Uso: python benchmarks/bench_streaming_memory.py [--sizes 100000 500000] [--chunk-size 50000]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from synthetic import generate_raw_survey
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import resource, sys, time
+sys.path.insert(0, {root!r})
+import pandas as pd
+import data_utils, storage
+
+
+def peak_rss_kb():
+    # VmHWM se reinicia con exec (ru_maxrss en Linux hereda el pico del padre)
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+modo, fuente, destino, chunk_size = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+base = peak_rss_kb()
+t0 = time.perf_counter()
+if modo == 'memoria':
+    df = data_utils.process_dataframe(pd.read_csv(fuente))
+    storage.write_snapshot(df, destino)
+else:
+    storage.stream_to_snapshot(fuente, destino, chunk_size=chunk_size)
+elapsed = time.perf_counter() - t0
+peak = peak_rss_kb()
+print(f"{{peak / 1024:.1f}} {{(peak - base) / 1024:.1f}} {{elapsed:.3f}}")
+"""
+
+
+def measure(modo: str, fuente: str, destino: str, chunk_size: int):
+    """
+    Corre una ingesta en un subproceso y devuelve (rss_pico_mb, delta_mb, segundos).
+    """
+    salida = subprocess.run(
+        [sys.executable, "-c", WORKER.format(root=ROOT), modo, fuente, destino, str(chunk_size)],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+    return tuple(float(x) for x in salida)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 500_000, 1_000_000])
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print(f"{'filas crudas':>12} {'CSV (MB)':>9} {'modo':>10} {'RSS pico (MB)':>14} {'delta (MB)':>11} {'tiempo (s)':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.sizes:
+            fuente = os.path.join(tmp, f"encuesta_{n_rows}.csv")
+            generate_raw_survey(n_rows).to_csv(fuente, index=False)
+            size_mb = os.path.getsize(fuente) / 1024 / 1024
+            for modo in ("memoria", "streaming"):
+                destino = os.path.join(tmp, f"{modo}_{n_rows}.parquet")
+                rss, delta, elapsed = measure(modo, fuente, destino, args.chunk_size)
+                print(f"{n_rows:>12} {size_mb:>9.1f} {modo:>10} {rss:>14.1f} {delta:>11.1f} {elapsed:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Suite de benchmarks del pipeline completo sobre encuestas sintéticas.
+
+Para cada tamaño y formato genera el archivo fuente, mide la lectura,
+`load_data`, `process_dataframe`, `compute_kpis`, cada función de estadísticas y
+cada constructor de gráficos, y guarda los resultados en JSON para comparar
+corridas (por ejemplo entre commits). También registra el tiempo de import de
+los módulos principales y, con `--startup`, el arranque en frío de dashboard.py
+(ver bench_import_time.py).
+
+Uso: python benchmarks/run_suite.py [--sizes 1000 10000 100000] [--formats xlsx csv]
+                                    [--repeat 3] [--startup] [--output benchmark_results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from bench_import_time import summarize_imports, startup_latency
+from synthetic import generate_raw_survey, write_survey, XLSX_MAX_ROWS
+import charts
+import data_utils
+import memo
+from constants import (
+    Q_SENTIMIENTO, Q_YO_PREFIX, Q_EQ_PREFIX, Q_IMPEDIMENTOS, Q_CAPACITACIONES, Q_COMENTARIOS
+)
+
+# Etapas que reciben el DataFrame procesado
+STATS = {
+    'compute_kpis': data_utils.compute_kpis,
+    'get_actividades_stats': data_utils.get_actividades_stats,
+    'get_modos_stats': data_utils.get_modos_stats,
+    'get_likert_stats[yo]': lambda df: data_utils.get_likert_stats(df, Q_YO_PREFIX),
+    'get_likert_stats[equipo]': lambda df: data_utils.get_likert_stats(df, Q_EQ_PREFIX),
+    'get_likert_distribution[yo]': lambda df: data_utils.get_likert_distribution(df, Q_YO_PREFIX),
+    'get_text_responses[impedimentos]': lambda df: data_utils.get_text_responses(df, Q_IMPEDIMENTOS),
+    'get_text_responses[capacitaciones]': lambda df: data_utils.get_text_responses(df, Q_CAPACITACIONES),
+    'get_text_responses[comentarios]': lambda df: data_utils.get_text_responses(df, Q_COMENTARIOS),
+}
+
+CHARTS = {
+    'create_sentiment_chart[pie]': lambda df: charts.create_sentiment_chart(df, Q_SENTIMIENTO, "pie"),
+    'create_sentiment_chart[bar]': lambda df: charts.create_sentiment_chart(df, Q_SENTIMIENTO, "bar"),
+    'create_nps_pie_chart': charts.create_nps_pie_chart,
+    'create_horizontal_bar_chart[actividades]': lambda df: charts.create_horizontal_bar_chart(
+        data_utils.get_actividades_stats(df), "Actividades"),
+    'create_horizontal_bar_chart[modos]': lambda df: charts.create_horizontal_bar_chart(
+        data_utils.get_modos_stats(df), "Modos"),
+    'create_likert_heatmap[yo]': lambda df: charts.create_likert_heatmap(
+        data_utils.get_likert_stats(df, Q_YO_PREFIX), "Percepción Individual"),
+    'create_likert_stacked_bar[yo]': lambda df: charts.create_likert_stacked_bar(
+        df, Q_YO_PREFIX, "Percepción Individual"),
+    'create_likert_stacked_bar[equipo]': lambda df: charts.create_likert_stacked_bar(
+        df, Q_EQ_PREFIX, "Percepción del Equipo"),
+}
+
+# Módulos cuyo import (en un proceso nuevo) se registra en cada corrida
+IMPORT_MODULES = ['data_utils', 'charts', 'storage', 'dashboard']
+
+
+def timed(func: Callable, repeat: int):
+    """
+    Ejecuta `func()` `repeat` veces con el cache vacío; devuelve (resultado, mejor tiempo en s).
+    """
+    mejor = float('inf')
+    resultado = None
+    for _ in range(repeat):
+        memo.clear_cache()
+        t0 = time.perf_counter()
+        resultado = func()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return resultado, mejor
+
+
+def read_raw(path: str) -> pd.DataFrame:
+    """
+    Lee la fuente cruda sin procesar.
+    """
+    if path.endswith('.csv'):
+        return pd.read_csv(path)
+    return pd.read_excel(path, engine='openpyxl')
+
+
+def git_commit() -> str:
+    """
+    Commit actual del repositorio (vacío si no se puede determinar).
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def run_case(n_rows: int, fmt: str, repeat: int, workdir: str) -> List[Dict]:
+    """
+    Mide todas las etapas para un tamaño y formato de fuente.
+    """
+    path = os.path.join(workdir, f"encuesta_{n_rows}.{fmt}")
+    write_survey(generate_raw_survey(n_rows), path)
+    tamano = os.path.getsize(path)
+    registros = []
+
+    def registrar(etapa, segundos, filas):
+        registros.append({
+            'rows': n_rows, 'format': fmt, 'file_bytes': tamano,
+            'stage': etapa, 'seconds': round(segundos, 6), 'output_rows': filas,
+        })
+        print(f"{n_rows:>9} {fmt:>5} {etapa:>42} {segundos * 1000:>11.1f}")
+
+    raw, segundos = timed(lambda: read_raw(path), repeat)
+    registrar('read', segundos, len(raw))
+
+    if fmt == 'xlsx':
+        cargado, segundos = timed(lambda: data_utils.load_data(path), repeat)
+        registrar('load_data', segundos, len(cargado))
+        del cargado
+
+    df, segundos = timed(lambda: data_utils.process_dataframe(raw.copy()), repeat)
+    registrar('process_dataframe', segundos, len(df))
+    del raw
+
+    for etapa, func in {**STATS, **CHARTS}.items():
+        resultado, segundos = timed(lambda: func(df), repeat)
+        filas = len(resultado) if isinstance(resultado, pd.DataFrame) else None
+        registrar(etapa, segundos, filas)
+
+    os.remove(path)
+    return registros
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--formats', nargs='+', choices=['xlsx', 'csv'], default=['xlsx', 'csv'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--startup', action='store_true',
+                        help="Medir también el arranque en frío de dashboard.py")
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args()
+
+    imports = []
+    for module in IMPORT_MODULES:
+        resumen = summarize_imports(module, top=10)
+        imports.append(resumen)
+        print(f"import {module:>10}: {resumen['total_ms']:>7.1f} ms "
+              f"(módulos propios {resumen['project_ms']:.1f} ms)")
+    arranque = startup_latency() if args.startup else None
+    if arranque:
+        print(f"arranque dashboard.py: {arranque['startup_ms']:.0f} ms")
+    print()
+
+    resultados = []
+    print(f"{'filas':>9} {'fmt':>5} {'etapa':>42} {'mejor (ms)':>11}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_rows in args.sizes:
+            for fmt in args.formats:
+                if fmt == 'xlsx' and n_rows > XLSX_MAX_ROWS:
+                    print(f"{n_rows:>9} {fmt:>5} {'(omitido: supera el máximo de filas de Excel)':>42}")
+                    continue
+                resultados += run_case(n_rows, fmt, args.repeat, workdir)
+
+    informe = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'imports': imports,
+        'startup': arranque,
+        'results': resultados,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados guardados en {args.output}")
+
+
+if __name__ == '__main__':
+    main()
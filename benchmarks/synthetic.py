@@ -0,0 +1,179 @@
+"""
+Generador de datos sintéticos con el esquema de la encuesta para benchmarks.
+
+Uso: python benchmarks/synthetic.py --rows 100000 --output encuesta_100k.xlsx
+"""
+
+import argparse
+import os
+import sys
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import (
+    Q_SENTIMIENTO, Q_USO, Q_USO_IMPACTO, Q_YO_PREFIX, Q_EQ_PREFIX, Q_MODO,
+    Q_NPS, Q_IMPEDIMENTOS, Q_CAPACITACIONES, Q_COMENTARIOS, REQUIRED_COLUMNS
+)
+
+LIKERT_ITEMS_YO = [
+    "Disfruto más programar",
+    "Escribo código de mejor calidad",
+    "Completo tareas más rapido",
+    "Aprendo con las sugerencias",
+    "Busco menos ejemplos / información en la web",
+    "Tengo un mejor ritmo de trabajo",
+    "No tiene un impacto visible en mis tareas diarias",
+    "Pierdo tiempo corrigiendo sus sugerencias y dandole contexto",
+]
+
+LIKERT_ITEMS_EQ = [
+    "Hace mejores revisiones de código",
+    "Integra a producción más rápido",
+    "Acelera la resolución de casos",
+    "Documenta mejor (README, comentarios, ejemplos)",
+    "No percibo un impacto real en el equipo",
+]
+
+LIKERT_VALUES = ["Estoy muy de acuerdo", "Estoy de acuerdo", "Neutro",
+                 "No estoy de acuerdo", "Estoy muy en desacuerdo"]
+
+# Respuestas por pregunta de opción (simple o múltiple)
+OPCIONES = {
+    Q_SENTIMIENTO: ["Muy decepcionado", "Algo decepcionado", "No decepcionado"],
+    Q_USO: ["Explorar lenguajes / frameworks / APIs", "Programar en un lenguaje conocido",
+            "Revisar códigos de otros", "Escribir código repetitivo / boilerplate",
+            "Refactorizar", "Explicar código que no conocía"],
+    Q_USO_IMPACTO: ["Percibo que ahorre tiempo de trabajo", "No lo usé"],
+    Q_MODO: ["Utilizo el chat en modo Ask para hacerle consultas técnicas",
+             "Sugerencias en línea de código",
+             "Utilizo el chat en modo Agent supervisando sus sugerencias y ejecuciones"],
+    Q_NPS: ["Muy recomendable", "Recomendable", "Poco recomendable",
+            "No recomendable", "Nada recomendable"],
+}
+
+# Distribuciones de las preguntas de respuesta única (en el orden de las opciones)
+PESOS = {
+    Q_SENTIMIENTO: [0.45, 0.35, 0.20],
+    Q_USO_IMPACTO: [0.80, 0.20],
+    Q_NPS: [0.35, 0.35, 0.15, 0.10, 0.05],
+}
+
+# Likert: los ítems positivos tienden al acuerdo y los negativos al desacuerdo
+PESOS_LIKERT = [0.25, 0.35, 0.20, 0.12, 0.08]
+ITEMS_NEGATIVOS = {
+    "No tiene un impacto visible en mis tareas diarias",
+    "Pierdo tiempo corrigiendo sus sugerencias y dandole contexto",
+    "No percibo un impacto real en el equipo",
+}
+
+# Una hoja de Excel admite 1.048.576 filas contando el encabezado
+XLSX_MAX_ROWS = 1_048_575
+
+TEXTOS_LIBRES = {
+    Q_IMPEDIMENTOS: ["Ninguno", "No", "La licencia tarda en asignarse",
+                     "No está disponible en mi IDE"],
+    Q_CAPACITACIONES: ["Cursos online de copilot para desarrolladores",
+                       "Buenas prácticas de prompts", "Posiblemente pruebas unitarias."],
+    Q_COMENTARIOS: ["Ninguna por ahora.", "Muy útil para tareas repetitivas",
+                    "A veces sugiere código incorrecto"],
+}
+
+
+def survey_questions():
+    """
+    Lista de (atributo, opciones, multivalor, pesos) en el orden del formulario.
+
+    `pesos` es None para respuestas uniformes.
+    """
+    def likert(prefix, item):
+        pesos = PESOS_LIKERT[::-1] if item in ITEMS_NEGATIVOS else PESOS_LIKERT
+        return (f"{prefix}....{item}", LIKERT_VALUES, False, pesos)
+
+    preguntas = [
+        (Q_SENTIMIENTO, OPCIONES[Q_SENTIMIENTO], False, PESOS[Q_SENTIMIENTO]),
+        (Q_USO, OPCIONES[Q_USO], True, None),
+        (Q_USO_IMPACTO, OPCIONES[Q_USO_IMPACTO], False, PESOS[Q_USO_IMPACTO]),
+    ]
+    preguntas += [likert(Q_YO_PREFIX, item) for item in LIKERT_ITEMS_YO]
+    preguntas += [likert(Q_EQ_PREFIX, item) for item in LIKERT_ITEMS_EQ]
+    preguntas += [
+        (Q_MODO, OPCIONES[Q_MODO], True, None),
+        (Q_NPS, OPCIONES[Q_NPS], False, PESOS[Q_NPS]),
+    ]
+    preguntas += [(q, textos, False, None) for q, textos in TEXTOS_LIBRES.items()]
+    return preguntas
+
+
+def generate_raw_survey(n_rows: int, seed: Optional[int] = 0) -> pd.DataFrame:
+    """
+    Genera una tabla cruda (formato largo, sin explotar) de aproximadamente `n_rows` filas.
+    """
+    rng = np.random.default_rng(seed)
+    preguntas = survey_questions()
+    n_personas = max(1, int(np.ceil(n_rows / len(preguntas))))
+
+    ids = np.arange(1, n_personas + 1)
+    inicio = pd.Timestamp("2025-08-01") + pd.to_timedelta(
+        rng.integers(0, 60 * 24 * 3600, n_personas), unit="s")
+    fin = inicio + pd.to_timedelta(rng.integers(60, 1800, n_personas), unit="s")
+
+    columnas = {col: [] for col in REQUIRED_COLUMNS}
+    for atributo, opciones, multivalor, pesos in preguntas:
+        if multivalor:
+            cantidad = rng.integers(1, min(4, len(opciones)) + 1, n_personas)
+            valores = [
+                ";".join(rng.choice(opciones, size=k, replace=False)) for k in cantidad
+            ]
+        else:
+            valores = rng.choice(opciones, size=n_personas, p=pesos).tolist()
+        columnas["Id"].append(ids)
+        columnas["Hora de inicio"].append(inicio.strftime("%d/%m/%Y %H:%M:%S"))
+        columnas["Hora de finalización"].append(fin.strftime("%d/%m/%Y %H:%M:%S"))
+        columnas["Correo electrónico"].append([f"persona{i}@empresa.com" for i in ids])
+        columnas["Nombre"].append([f" Persona {i} " for i in ids])
+        columnas["Atributo"].append([atributo] * n_personas)
+        columnas["Valor"].append(valores)
+
+    raw = pd.DataFrame({col: np.concatenate(partes) for col, partes in columnas.items()})
+    return raw.sort_values("Id", kind="stable").head(n_rows).reset_index(drop=True)
+
+
+def write_survey(raw: pd.DataFrame, path: str) -> None:
+    """
+    Escribe la tabla cruda como .csv o .xlsx (según la extensión de `path`).
+    """
+    if os.path.splitext(path)[1].lower() == ".csv":
+        raw.to_csv(path, index=False)
+        return
+    if len(raw) > XLSX_MAX_ROWS:
+        raise ValueError(f"Una hoja de Excel admite hasta {XLSX_MAX_ROWS} filas: usar .csv")
+
+    from openpyxl import Workbook
+
+    # Modo write_only: las filas se vuelcan al archivo sin armar las celdas en memoria
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Encuesta")
+    sheet.append(list(raw.columns))
+    for row in raw.itertuples(index=False, name=None):
+        sheet.append([v.item() if isinstance(v, np.generic) else v for v in row])
+    workbook.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True, help="Archivo .xlsx o .csv a generar")
+    args = parser.parse_args()
+
+    raw = generate_raw_survey(args.rows, seed=args.seed)
+    write_survey(raw, args.output)
+    print(f"{len(raw):,} filas escritas en {args.output}")
+
+
+if __name__ == '__main__':
+    main()
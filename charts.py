@@ -1,21 +1,66 @@
 """
-Funciones para generar gráficos con Plotly Express.
+Funciones para generar gráficos con Plotly.
+
+Las figuras se arman directamente con `graph_objects` y se cachean como JSON
+por (gráfico, huella de las estadísticas de entrada): en un rerun con los mismos
+datos se rehidrata el JSON en lugar de volver a construir y validar la figura.
 """
 
-import plotly.express as px
+import json
+from html import escape
+
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
-from typing import Optional
+from typing import Callable, Optional
+
+import data_utils
+import indexes
+import memo
+import perf
+from constants import LIKERT_LABELS
+
+
+def _value_counts(values: pd.Series) -> pd.Series:
+    """
+    Cuenta valores; con columnas categóricas solo incluye los observados.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(values.cat.categories.dtype)
+    return values.value_counts()
+
+
+def _figure_json(fig: go.Figure) -> str:
+    """
+    Serializa una figura sin la plantilla (se vuelve a aplicar la por defecto al rehidratar).
+    """
+    from plotly.io.json import to_json_plotly  # solo hace falta al construir
+
+    figura = fig.to_dict()
+    figura['layout'].pop('template', None)
+    return to_json_plotly(figura)
+
+
+def _cached_figure(nombre: str, entradas: tuple, build: Callable[[], go.Figure]) -> go.Figure:
+    """
+    Devuelve la figura cacheada para (nombre, huella de `entradas`) o la construye con `build`.
+    """
+    key = ('figura', nombre, memo.fingerprint(*entradas))
+    payload = memo.lookup(key)
+    if payload is not None:
+        return go.Figure(json.loads(payload))
+    fig = build()
+    memo.store(key, _figure_json(fig))
+    return fig
 
 
+@perf.timed
 def create_sentiment_chart(df: pd.DataFrame, atributo: str, 
                           chart_type: str = "pie") -> go.Figure:
     """
     Crea gráfico de dona o barras para sentimientos.
     """
-    data = df[df['Atributo'] == atributo]['Valor'].value_counts()
+    data = _value_counts(indexes.select_question(df, atributo)['Valor'])
     
     if len(data) == 0:
         fig = go.Figure()
@@ -26,25 +71,42 @@ def create_sentiment_chart(df: pd.DataFrame, atributo: str,
         )
         return fig
     
+    return _cached_figure(
+        'sentimiento', (data, chart_type),
+        lambda: _build_sentiment_chart(data, chart_type)
+    )
+
+
+def _build_sentiment_chart(data: pd.Series, chart_type: str) -> go.Figure:
+    """
+    Construye el gráfico de sentimiento a partir de los conteos por respuesta.
+    """
     if chart_type == "pie":
-        fig = px.pie(
+        fig = go.Figure(go.Pie(
             values=data.values,
-            names=data.index,
-            title="Sentimiento hacia GitHub Copilot",
-            hole=0.4  # Hacer dona
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label')
+            labels=data.index,
+            hole=0.4,  # Hacer dona
+            showlegend=True,
+            textposition='inside',
+            textinfo='percent+label',
+            hovertemplate='label=%{label}<br>value=%{value}<extra></extra>'
+        ))
     else:  # barras
-        fig = px.bar(
+        fig = go.Figure(go.Bar(
             x=data.values,
             y=data.index,
             orientation='h',
-            title="Sentimiento hacia GitHub Copilot",
-            labels={'x': 'Cantidad', 'y': 'Respuesta'}
+            showlegend=False,
+            hovertemplate='Cantidad=%{x}<br>Respuesta=%{y}<extra></extra>'
+        ))
+        fig.update_layout(
+            xaxis_title='Cantidad',
+            yaxis_title='Respuesta',
+            yaxis={'categoryorder': 'total ascending'}
         )
-        fig.update_layout(yaxis={'categoryorder': 'total ascending'})
     
     fig.update_layout(
+        title="Sentimiento hacia GitHub Copilot",
         showlegend=True,
         margin=dict(t=50, b=50, l=50, r=50)
     )
@@ -52,6 +114,7 @@ def create_sentiment_chart(df: pd.DataFrame, atributo: str,
     return fig
 
 
+@perf.timed
 def create_horizontal_bar_chart(stats_df: pd.DataFrame, 
                                title: str, 
                                x_col: str = 'porcentaje',
@@ -69,28 +132,40 @@ def create_horizontal_bar_chart(stats_df: pd.DataFrame,
         )
         return fig
     
-    data = stats_df.copy()
-    
-    if top_n:
-        data = data.head(top_n)
+    data = stats_df.head(top_n) if top_n else stats_df
     
+    return _cached_figure(
+        'barras_horizontales', (data, title, x_col, y_col),
+        lambda: _build_horizontal_bar_chart(data, title, x_col, y_col)
+    )
+
+
+def _build_horizontal_bar_chart(data: pd.DataFrame, title: str,
+                                x_col: str, y_col: Optional[str]) -> go.Figure:
+    """
+    Construye el gráfico de barras horizontales.
+    """
     if y_col is None:
         y_values = data.index
     else:
         y_values = data[y_col]
+    y_name = y_values.name if y_values.name is not None else 'index'
     
-    fig = px.bar(
-        data,
-        x=x_col,
+    fig = go.Figure(go.Bar(
+        x=data[x_col],
         y=y_values,
         orientation='h',
-        title=title,
-        labels={'x': 'Porcentaje (%)', 'y': ''},
-        text=x_col
-    )
+        text=data[x_col],
+        texttemplate='%{text:.1f}%',
+        textposition='outside',
+        showlegend=False,
+        hovertemplate=f'{x_col}=%{{text}}<br>{y_name}=%{{y}}<extra></extra>'
+    ))
     
-    fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
     fig.update_layout(
+        title=title,
+        xaxis_title=x_col,
+        yaxis_title=y_name,
         yaxis={'categoryorder': 'total ascending'},
         margin=dict(t=50, b=50, l=50, r=150),
         height=max(400, len(data) * 25)
@@ -99,6 +174,7 @@ def create_horizontal_bar_chart(stats_df: pd.DataFrame,
     return fig
 
 
+@perf.timed
 def create_likert_heatmap(stats_df: pd.DataFrame, title: str) -> go.Figure:
     """
     Crea heatmap para respuestas Likert.
@@ -112,6 +188,16 @@ def create_likert_heatmap(stats_df: pd.DataFrame, title: str) -> go.Figure:
         )
         return fig
     
+    return _cached_figure(
+        'likert_heatmap', (stats_df, title),
+        lambda: _build_likert_heatmap(stats_df, title)
+    )
+
+
+def _build_likert_heatmap(stats_df: pd.DataFrame, title: str) -> go.Figure:
+    """
+    Construye el heatmap de promedios Likert.
+    """
     # Simplificar nombres de preguntas para mejor visualización
     stats_df_display = stats_df.copy()
     stats_df_display.index = [
@@ -146,16 +232,15 @@ def create_likert_heatmap(stats_df: pd.DataFrame, title: str) -> go.Figure:
     return fig
 
 
+@perf.timed
 def create_likert_stacked_bar(df: pd.DataFrame, prefix: str, title: str) -> go.Figure:
     """
     Crea gráfico de barras apiladas para respuestas Likert.
     """
-    likert_data = df[
-        df['Atributo'].str.startswith(prefix) & 
-        df['Likert_Score'].notna()
-    ]
+    # % por pregunta y nivel (desde el cubo de respuestas si está disponible)
+    contingency = data_utils.get_likert_distribution(df, prefix)
     
-    if len(likert_data) == 0:
+    if len(contingency) == 0:
         fig = go.Figure()
         fig.add_annotation(
             text="No hay datos disponibles",
@@ -164,32 +249,17 @@ def create_likert_stacked_bar(df: pd.DataFrame, prefix: str, title: str) -> go.F
         )
         return fig
     
-    # Mapear scores a etiquetas
-    score_labels = {
-        -2: 'Muy en desacuerdo',
-        -1: 'En desacuerdo', 
-        0: 'Neutro',
-        1: 'De acuerdo',
-        2: 'Muy de acuerdo'
-    }
-    
-    # Crear tabla de contingencia
-    likert_data = likert_data.copy()  # Evitar SettingWithCopyWarning
-    likert_data.loc[:, 'Score_Label'] = likert_data['Likert_Score'].map(score_labels)
-    
-    # Simplificar nombres de preguntas
-    likert_data.loc[:, 'Pregunta_Short'] = likert_data['Atributo'].str.replace(prefix, "").str.strip()
-    
-    # Calcular porcentajes por pregunta
-    contingency = pd.crosstab(
-        likert_data['Pregunta_Short'], 
-        likert_data['Score_Label'], 
-        normalize='index'
-    ) * 100
-    
-    # Reordenar columnas
-    score_order = ['Muy en desacuerdo', 'En desacuerdo', 'Neutro', 'De acuerdo', 'Muy de acuerdo']
-    contingency = contingency.reindex(columns=[col for col in score_order if col in contingency.columns])
+    return _cached_figure(
+        'likert_apilado', (contingency, title),
+        lambda: _build_likert_stacked_bar(contingency, title)
+    )
+
+
+def _build_likert_stacked_bar(contingency: pd.DataFrame, title: str) -> go.Figure:
+    """
+    Construye las barras apiladas a partir del % por pregunta y nivel.
+    """
+    score_order = list(LIKERT_LABELS.values())
     
     # Crear gráfico apilado
     fig = go.Figure()
@@ -268,7 +338,7 @@ def create_kpi_cards(kpis: dict) -> str:
 
 def create_timeline_comments(responses_df: pd.DataFrame) -> str:
     """
-    Crea una visualización tipo timeline para comentarios.
+    Crea una visualización tipo timeline para comentarios (texto escapado).
     """
     if len(responses_df) == 0:
         return "<p>No hay comentarios disponibles.</p>"
@@ -279,8 +349,8 @@ def create_timeline_comments(responses_df: pd.DataFrame) -> str:
     
     for _, row in responses_df.iterrows():
         fecha = row['Hora de inicio'].strftime('%d/%m/%Y %H:%M') if pd.notna(row['Hora de inicio']) else 'Sin fecha'
-        nombre = row['Nombre'] if pd.notna(row['Nombre']) else 'Anónimo'
-        comentario = row['Valor'] if pd.notna(row['Valor']) else ''
+        nombre = escape(str(row['Nombre'])) if pd.notna(row['Nombre']) else 'Anónimo'
+        comentario = escape(str(row['Valor'])) if pd.notna(row['Valor']) else ''
         
         html += f"""
         <div style="border-left: 3px solid #1f77b4; padding-left: 15px; margin-bottom: 20px;">
@@ -298,6 +368,7 @@ def create_timeline_comments(responses_df: pd.DataFrame) -> str:
     return html
 
 
+@perf.timed
 def create_nps_pie_chart(df: pd.DataFrame) -> go.Figure:
     """
     Crea gráfico de torta para recomendación a un colega (NPS).
@@ -305,7 +376,7 @@ def create_nps_pie_chart(df: pd.DataFrame) -> go.Figure:
     from constants import Q_NPS
     
     # Filtrar datos NPS
-    nps_data = df[df['Atributo'] == Q_NPS]['Valor'].value_counts()
+    nps_data = _value_counts(indexes.select_question(df, Q_NPS)['Valor'])
     
     if len(nps_data) == 0:
         fig = go.Figure()
@@ -317,6 +388,13 @@ def create_nps_pie_chart(df: pd.DataFrame) -> go.Figure:
         )
         return fig
     
+    return _cached_figure('nps', (nps_data,), lambda: _build_nps_pie_chart(nps_data))
+
+
+def _build_nps_pie_chart(nps_data: pd.Series) -> go.Figure:
+    """
+    Construye la torta de NPS a partir de los conteos por respuesta.
+    """
     # Colores para las categorías NPS
     colors = {
         'Muy recomendable': '#2E8B57',      # Verde oscuro
@@ -329,20 +407,18 @@ def create_nps_pie_chart(df: pd.DataFrame) -> go.Figure:
     # Crear lista de colores en el orden de los datos
     chart_colors = [colors.get(label, '#CCCCCC') for label in nps_data.index]
     
-    fig = px.pie(
+    fig = go.Figure(go.Pie(
         values=nps_data.values,
-        names=nps_data.index,
-        title="Recomendación a un Colega",
-        color_discrete_sequence=chart_colors
-    )
-    
-    fig.update_traces(
+        labels=nps_data.index,
+        marker=dict(colors=chart_colors),
+        showlegend=True,
         textposition='inside',
         textinfo='percent+label',
         hovertemplate='<b>%{label}</b><br>Respuestas: %{value}<br>Porcentaje: %{percent}<extra></extra>'
-    )
+    ))
     
     fig.update_layout(
+        title="Recomendación a un Colega",
         font=dict(size=12),
         showlegend=True,
         legend=dict(
@@ -14,6 +14,20 @@ Q_IMPEDIMENTOS = "¿Existe algún impedimento para utilizar más Copilot?"
 Q_CAPACITACIONES = "¿Que capacitaciones te ayudarían a sacarle más provecho?"
 Q_COMENTARIOS = "Comentarios y recomendaciones que quieras hacer:"
 
+# Identificadores numéricos de preguntas (los ítems Likert comparten el id de su familia)
+QUESTION_IDS = {
+    Q_SENTIMIENTO: 1,
+    Q_USO: 2,
+    Q_USO_IMPACTO: 3,
+    Q_YO_PREFIX: 4,
+    Q_EQ_PREFIX: 5,
+    Q_MODO: 6,
+    Q_NPS: 7,
+    Q_IMPEDIMENTOS: 8,
+    Q_CAPACITACIONES: 9,
+    Q_COMENTARIOS: 10
+}
+
 # Mapeo de valores Likert (incluyendo variantes con tildes/espacios)
 LIKERT_MAPPING = {
     "Estoy muy de acuerdo": 2,
@@ -32,6 +46,15 @@ LIKERT_MAPPING = {
     "Muy en desacuerdo": -2
 }
 
+# Etiquetas de la escala Likert (en orden)
+LIKERT_LABELS = {
+    -2: "Muy en desacuerdo",
+    -1: "En desacuerdo",
+    0: "Neutro",
+    1: "De acuerdo",
+    2: "Muy de acuerdo"
+}
+
 # Mapeo de NPS
 NPS_MAPPING = {
     "Muy recomendable": "Promotor",
@@ -45,6 +68,12 @@ NPS_MAPPING = {
 REQUIRED_COLUMNS = ["Id", "Hora de inicio", "Hora de finalización", 
                    "Correo electrónico", "Nombre", "Atributo", "Valor"]
 
+# Columnas de texto repetidas en cada fila explotada (se guardan como categorías)
+CATEGORICAL_COLUMNS = ["Correo electrónico", "Nombre", "Atributo", "Valor", "NPS_Class"]
+
+# Columna con el archivo de origen cuando se combinan varias encuestas (ver storage.load_sources)
+SOURCE_COLUMN = "Fuente"
+
 # Bloques de preguntas para el filtro
 BLOQUES = [
     "Portada",
@@ -55,12 +84,20 @@ BLOQUES = [
     "Exportar"
 ]
 
-# Patrones de tiempo para detección
+# Respuestas de texto libre por página en "Comentarios de Usuarios"
+TEXT_PAGE_SIZE = 10
+
+# Patrones de tiempo para detección (se comparan sin mayúsculas ni acentos;
+# un `*` al final de una palabra acepta cualquier terminación, ver patterns.py)
 TIEMPO_PATTERNS = [
     "ahorre tiempo",
     "ahorro tiempo", 
     "ahorré tiempo",
     "ahorrar tiempo",
     "save time",
-    "tiempo ahorrado"
+    "tiempo ahorrado",
+    "ahorr* tiempo",
+    "ahorr* de tiempo",
+    "tiempo ahorrad*",
+    "sav* time"
 ]
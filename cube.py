@@ -0,0 +1,235 @@
+"""
+Cubo pre-agregado de respuestas: conteos por (respuesta, pregunta, valor).
+
+Se construye una vez al cargar los datos. Cada respuesta (Id + inicio + correo +
+nombre, y la fuente si hay varias) es una fila del cubo, y cada par (pregunta, valor) de las preguntas de
+opción y Likert es una columna. Los filtros del dashboard seleccionan respuestas
+completas, así que cualquier estadística se obtiene reduciendo la matriz sobre
+un bitmap de respuestas, sin volver a recorrer la tabla larga.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import indexes
+from constants import (
+    Q_SENTIMIENTO, Q_USO, Q_USO_IMPACTO, Q_MODO, Q_NPS, Q_YO_PREFIX, Q_EQ_PREFIX, SOURCE_COLUMN
+)
+
+# Preguntas (y familias por prefijo) que entran al cubo; el texto libre queda afuera
+CUBE_QUESTIONS = [Q_SENTIMIENTO, Q_USO, Q_USO_IMPACTO, Q_MODO, Q_NPS]
+CUBE_PREFIXES = [Q_YO_PREFIX, Q_EQ_PREFIX]
+
+# Columnas que identifican una respuesta (constantes dentro de cada respuesta)
+UNIT_COLUMNS = ["Id", "Hora de inicio", "Correo electrónico", "Nombre"]
+
+
+def unit_columns(df: pd.DataFrame) -> list:
+    """
+    Columnas que identifican una respuesta en `df`.
+
+    Con varias fuentes se agrega `Fuente`: dos libros pueden repetir Id, inicio,
+    correo y nombre, y sus respuestas no deben fusionarse.
+    """
+    if SOURCE_COLUMN in df.columns:
+        return UNIT_COLUMNS + [SOURCE_COLUMN]
+    return UNIT_COLUMNS
+
+
+def _plain(values: pd.Series) -> pd.Series:
+    """
+    Convierte una columna categórica al tipo de sus categorías.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.astype(values.cat.categories.dtype)
+    return values
+
+
+def build_response_cube(df: pd.DataFrame) -> Dict:
+    """
+    Construye el cubo de respuestas de un DataFrame procesado.
+    """
+    units = df.groupby(
+        unit_columns(df), dropna=False, sort=False, observed=True
+    ).ngroup().to_numpy()
+    n_units = int(units.max()) + 1 if len(units) > 0 else 0
+    _, unit_first_row = np.unique(units, return_index=True)
+
+    # Correo de cada respuesta (-1 = sin correo)
+    correo = df['Correo electrónico']
+    if isinstance(correo.dtype, pd.CategoricalDtype):
+        email_codes = correo.cat.codes.to_numpy()
+    else:
+        email_codes = pd.factorize(correo)[0]
+    unit_email = email_codes[unit_first_row]
+
+    # Respuestas agrupadas por correo para contar personas distintas
+    con_correo = np.flatnonzero(unit_email >= 0)
+    email_order = con_correo[np.argsort(unit_email[con_correo], kind='stable')]
+    sorted_emails = unit_email[email_order]
+    email_starts = np.flatnonzero(np.r_[True, sorted_emails[1:] != sorted_emails[:-1]]) \
+        if len(sorted_emails) > 0 else np.empty(0, dtype=np.intp)
+
+    # Filas que entran al cubo y sus pares (pregunta, valor)
+    partes = [indexes.question_positions(df, q) for q in CUBE_QUESTIONS]
+    partes += [indexes.prefix_positions(df, p) for p in CUBE_PREFIXES]
+    pos = np.sort(np.concatenate(partes)) if partes else np.empty(0, dtype=np.intp)
+    filas = df.iloc[pos]
+    pair_codes = filas.groupby(
+        ['Atributo', 'Valor'], dropna=False, sort=True, observed=True
+    ).ngroup().to_numpy()
+    n_pairs = int(pair_codes.max()) + 1 if len(pair_codes) > 0 else 0
+
+    _, pair_first = np.unique(pair_codes, return_index=True)
+    pairs = pd.DataFrame({
+        col: _plain(filas[col].iloc[pair_first]).reset_index(drop=True)
+        for col in ['Atributo', 'Valor', 'Likert_Score', 'NPS_Class']
+    })
+
+    flat = units[pos].astype(np.int64) * n_pairs + pair_codes
+    counts = np.bincount(flat, minlength=n_units * n_pairs).astype(np.uint16)
+    counts = counts.reshape(n_units, n_pairs)
+
+    return {
+        'likert': {prefix: _likert_layout(pairs, prefix) for prefix in CUBE_PREFIXES},
+        'unit_first_row': unit_first_row,
+        'counts': counts,
+        # Bitmap respuesta x par, ordenado por correo para reducir por persona
+        'presencia_por_correo': counts[email_order] > 0,
+        'email_order': email_order,
+        'email_starts': email_starts,
+        'pairs': pairs,
+        'columnas': {},
+    }
+
+
+def _likert_layout(pairs: pd.DataFrame, prefix: str) -> Dict:
+    """
+    Agrupación precalculada de los pares Likert de una familia de preguntas.
+
+    Para cada columna del cubo con score guarda su pregunta y su par (pregunta,
+    score) únicos, en el orden en que los agruparía pandas; así una estadística
+    Likert es `pair_rows` más sumas ponderadas, sin agrupar en cada llamada.
+    """
+    mask = pairs['Atributo'].str.startswith(prefix).to_numpy() & pairs['Likert_Score'].notna().to_numpy()
+    columnas = np.flatnonzero(mask)
+    atributos = pairs['Atributo'].iloc[columnas].to_numpy()
+    scores = pairs['Likert_Score'].iloc[columnas].to_numpy(dtype=float)
+
+    orden_atributos = pd.Index(np.unique(atributos).astype(object), dtype=pairs['Atributo'].dtype,
+                               name='Atributo')
+    grupo = orden_atributos.get_indexer(atributos)
+    unicos = pd.DataFrame({'Atributo': atributos, 'Likert_Score': scores}).drop_duplicates()
+    unicos = unicos.sort_values(['Atributo', 'Likert_Score'], kind='stable').reset_index(drop=True)
+    par = pd.MultiIndex.from_frame(unicos).get_indexer(pd.MultiIndex.from_arrays([atributos, scores]))
+    return {
+        'columnas': columnas,
+        'atributos': orden_atributos,
+        'grupo': grupo,
+        'scores': scores,
+        'acuerdo': np.isin(scores, [1, 2]),
+        'par': par,
+        'pares': unicos.astype({'Atributo': pairs['Atributo'].dtype}),
+    }
+
+
+def likert_rows(cubo: Dict, sel: Optional[np.ndarray], prefix: str) -> Tuple[Dict, np.ndarray]:
+    """
+    (agrupación Likert del prefijo, filas por columna) para las respuestas seleccionadas.
+    """
+    layout = cubo['likert'].get(prefix)
+    if layout is None:
+        layout = cubo['likert'][prefix] = _likert_layout(cubo['pairs'], prefix)
+    return layout, pair_rows(cubo, sel, layout['columnas'])
+
+
+def get_response_cube(df: pd.DataFrame) -> Dict:
+    """
+    Cubo del DataFrame, construido la primera vez que se pide.
+    """
+    return indexes.state_entry(df, 'cubo', build_response_cube)
+
+
+def lookup(df: pd.DataFrame) -> Optional[Tuple[Dict, Optional[np.ndarray]]]:
+    """
+    Busca un cubo aplicable a `df`: (cubo, selección de respuestas) o None.
+
+    Sirve para el DataFrame sobre el que se construyó el cubo (selección None) y
+    para los subconjuntos que `filter_df` derivó de él.
+    """
+    cubo = indexes.attached(df, 'cubo')
+    if cubo is not None:
+        return cubo, None
+
+    origen = indexes.parent_of(df)
+    if origen is None:
+        return None
+    parent, mask = origen
+    cubo = indexes.attached(parent, 'cubo')
+    if cubo is None:
+        return None
+    return cubo, mask[cubo['unit_first_row']]
+
+
+def pair_columns(cubo: Dict, atributo: str = None, prefix: str = None) -> np.ndarray:
+    """
+    Columnas del cubo de una pregunta o de una familia de preguntas (memoizadas).
+    """
+    clave = (atributo, prefix)
+    if clave not in cubo['columnas']:
+        atributos = cubo['pairs']['Atributo']
+        if atributo is not None:
+            mask = atributos == atributo
+        else:
+            mask = atributos.str.startswith(prefix)
+        cubo['columnas'][clave] = np.flatnonzero(mask.to_numpy())
+    return cubo['columnas'][clave]
+
+
+def pair_rows(cubo: Dict, sel: Optional[np.ndarray], columnas: np.ndarray) -> np.ndarray:
+    """
+    Cantidad de filas por par para las respuestas seleccionadas.
+    """
+    counts = cubo['counts'][:, columnas]
+    if sel is not None:
+        counts = counts[sel]
+    return counts.sum(axis=0, dtype=np.int64)
+
+
+def _por_persona(cubo: Dict, sel: Optional[np.ndarray], columnas: np.ndarray) -> np.ndarray:
+    """
+    Bitmap persona x par: la persona tiene el par en alguna respuesta seleccionada.
+    """
+    presencia = cubo['presencia_por_correo'][:, columnas]
+    if sel is not None:
+        presencia = presencia & sel[cubo['email_order']][:, None]
+    if len(cubo['email_starts']) == 0:
+        return np.zeros((0, len(columnas)), dtype=bool)
+    return np.logical_or.reduceat(presencia, cubo['email_starts'], axis=0)
+
+
+def pair_users(cubo: Dict, sel: Optional[np.ndarray], columnas: np.ndarray) -> np.ndarray:
+    """
+    Personas distintas (por correo) que respondieron cada par.
+    """
+    return _por_persona(cubo, sel, columnas).sum(axis=0, dtype=np.int64)
+
+
+def users_with_any(cubo: Dict, sel: Optional[np.ndarray], columnas: np.ndarray) -> int:
+    """
+    Personas distintas que respondieron al menos uno de los pares.
+    """
+    return int(_por_persona(cubo, sel, columnas).any(axis=1).sum())
+
+
+def total_users(cubo: Dict, sel: Optional[np.ndarray]) -> int:
+    """
+    Personas distintas (por correo) entre las respuestas seleccionadas.
+    """
+    if len(cubo['email_starts']) == 0:
+        return 0
+    if sel is None:
+        return len(cubo['email_starts'])
+    return int(np.logical_or.reduceat(sel[cubo['email_order']], cubo['email_starts']).sum())
@@ -4,17 +4,22 @@ Dashboard principal de Streamlit para análisis de adopción de GitHub Copilot.
 
 import streamlit as st
 import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import io
+from datetime import datetime
 from typing import List, Optional
 
 # Importar módulos del proyecto
 import data_utils
 import charts
+import cube
+import exports
+import indexes
+import memo
+import perf
+import storage
+import textindex
 from constants import (
     BLOQUES, Q_SENTIMIENTO, Q_USO, Q_MODO, Q_YO_PREFIX, Q_EQ_PREFIX,
-    Q_IMPEDIMENTOS, Q_CAPACITACIONES, Q_COMENTARIOS, Q_NPS
+    Q_IMPEDIMENTOS, Q_CAPACITACIONES, Q_COMENTARIOS, Q_NPS, TEXT_PAGE_SIZE
 )
 
 # Configuración de la página
@@ -43,13 +48,24 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-@st.cache_data
-def load_survey_data(file_path: str = "Encuesta de adopción de GitHub Copilot tabla.xlsx"):
+@st.cache_resource
+def load_survey_data(file_path: str = storage.DEFAULT_SOURCE):
     """
-    Carga los datos de la encuesta con caching.
+    Carga los datos de la encuesta con caching (en memoria y snapshot en disco).
+
+    `file_path` puede ser un archivo, un directorio o un patrón glob con varias
+    encuestas (variable de entorno `SURVEY_SOURCE`, ver `storage.load_sources`).
+
+    Se usa `cache_resource` para compartir el mismo DataFrame (y sus índices) entre
+    reruns; el resto del código no lo modifica.
     """
     try:
-        return data_utils.load_data(file_path)
+        df = storage.load_sources(file_path)
+        indexes.get_question_index(df)
+        cube.get_response_cube(df)
+        textindex.get_text_index(df)
+        memo.register_dataset(df)
+        return df
     except Exception as e:
         st.error(f"Error al cargar los datos: {str(e)}")
         return pd.DataFrame()
@@ -64,8 +80,7 @@ def create_sidebar_filters(df: pd.DataFrame):
     # Filtro de personas
     if not df.empty:
         # Solo mostrar nombres únicos (sin emails) y limpiar espacios extra
-        nombres_raw = df['Nombre'].dropna().unique().tolist()
-        nombres_disponibles = sorted([nombre.strip() for nombre in nombres_raw if nombre.strip()])
+        nombres_disponibles = indexes.person_names(df)
         
         # Agregar opción "Todos" al principio
         opciones_personas = ["Todos"] + nombres_disponibles
@@ -81,11 +96,22 @@ def create_sidebar_filters(df: pd.DataFrame):
         if "Todos" in personas_seleccionadas:
             personas_seleccionadas = []
         
+        # Filtro de fuente (solo cuando se combinan varias encuestas)
+        fuentes_disponibles = indexes.source_names(df)
+        fuentes_seleccionadas = []
+        if len(fuentes_disponibles) > 1:
+            fuentes_seleccionadas = st.sidebar.multiselect(
+                "Seleccionar fuentes:",
+                options=fuentes_disponibles,
+                help="Encuestas (archivos) a incluir; vacío para ver todas"
+            )
+        
         # Eliminar filtro de fechas ya que no es necesario
         fecha_desde = None
         fecha_hasta = None
     else:
         personas_seleccionadas = []
+        fuentes_seleccionadas = []
         fecha_desde = None
         fecha_hasta = None
     
@@ -97,9 +123,10 @@ def create_sidebar_filters(df: pd.DataFrame):
         index=0
     )
     
-    return personas_seleccionadas, fecha_desde, fecha_hasta, bloque_seleccionado
+    return personas_seleccionadas, fuentes_seleccionadas, fecha_desde, fecha_hasta, bloque_seleccionado
 
 
+@perf.timed(name="dashboard.show_portada")
 def show_portada(df: pd.DataFrame):
     """
     Muestra la página de portada con KPIs y gráfico de sentimiento.
@@ -139,8 +166,7 @@ def show_portada(df: pd.DataFrame):
     with col1:
         st.subheader("🎭 Sentimiento hacia GitHub Copilot")
         st.caption("_¿Cómo te sentirías si ya no pudieras usar más GitHub Copilot?_")
-        sentiment_data = df[df['Atributo'] == Q_SENTIMIENTO]
-        if not sentiment_data.empty:
+        if len(indexes.question_positions(df, Q_SENTIMIENTO)) > 0:
             fig_pie = charts.create_sentiment_chart(df, Q_SENTIMIENTO, "pie")
             st.plotly_chart(fig_pie, use_container_width=True)
         else:
@@ -149,14 +175,14 @@ def show_portada(df: pd.DataFrame):
     # Gráfico de NPS
     with col2:
         st.subheader("📊 Recomendación a un Colega")
-        nps_data = df[df['Atributo'] == Q_NPS]
-        if not nps_data.empty:
+        if len(indexes.question_positions(df, Q_NPS)) > 0:
             fig_nps = charts.create_nps_pie_chart(df)
             st.plotly_chart(fig_nps, use_container_width=True)
         else:
             st.info("No hay datos de recomendación disponibles.")
 
 
+@perf.timed(name="dashboard.show_uso")
 def show_uso(df: pd.DataFrame):
     """
     Muestra análisis de uso de Copilot.
@@ -206,6 +232,7 @@ def show_uso(df: pd.DataFrame):
         st.info("No hay datos de modos disponibles.")
 
 
+@perf.timed(name="dashboard.show_percepcion_individual")
 def show_percepcion_individual(df: pd.DataFrame):
     """
     Muestra análisis de percepción individual.
@@ -235,6 +262,7 @@ def show_percepcion_individual(df: pd.DataFrame):
         st.info("No hay datos de percepción individual disponibles.")
 
 
+@perf.timed(name="dashboard.show_percepcion_equipo")
 def show_percepcion_equipo(df: pd.DataFrame):
     """
     Muestra análisis de percepción del equipo.
@@ -264,6 +292,69 @@ def show_percepcion_equipo(df: pd.DataFrame):
         st.info("No hay datos de percepción del equipo disponibles.")
 
 
+# Opciones de orden del visor de comentarios -> (criterio, ascendente)
+TEXT_SORT_OPTIONS = {
+    "Más recientes": ('fecha', False),
+    "Más antiguos": ('fecha', True),
+    "Nombre (A-Z)": ('nombre', True),
+    "Nombre (Z-A)": ('nombre', False),
+}
+
+
+def show_text_responses(df: pd.DataFrame, atributo: str, clave: str, mensaje_vacio: str):
+    """
+    Visor paginado de respuestas de texto libre con búsqueda y orden.
+
+    Solo se envía al navegador la página visible, así que el costo de cada
+    rerun no depende de la cantidad total de respuestas.
+    """
+    if data_utils.get_text_responses(df, atributo).empty:
+        st.info(mensaje_vacio)
+        return
+    
+    col1, col2, col3 = st.columns([3, 2, 1])
+    with col1:
+        busqueda = st.text_input(
+            "Buscar", key=f"buscar_{clave}", placeholder="Palabras a buscar (OR para alternativas)"
+        )
+    with col2:
+        orden, ascendente = TEXT_SORT_OPTIONS[
+            st.selectbox("Ordenar por", list(TEXT_SORT_OPTIONS), key=f"orden_{clave}")
+        ]
+    
+    total = len(data_utils.search_text_responses(df, atributo, busqueda, orden, ascendente))
+    paginas = max(1, -(-total // TEXT_PAGE_SIZE))
+    # Si la búsqueda achicó los resultados, volver a una página válida
+    if st.session_state.get(f"pagina_{clave}", 1) > paginas:
+        st.session_state[f"pagina_{clave}"] = paginas
+    with col3:
+        pagina = st.number_input(
+            "Página", min_value=1, max_value=paginas, value=1, step=1, key=f"pagina_{clave}"
+        )
+    
+    if total == 0:
+        st.info("Ninguna respuesta coincide con la búsqueda.")
+        return
+    
+    respuestas, _ = data_utils.page_text_responses(
+        df, atributo, int(pagina), TEXT_PAGE_SIZE, busqueda, orden, ascendente
+    )
+    bloques = [
+        f"**{nombre}** _{fecha}_\n\n_{valor}_"
+        for nombre, fecha, valor in zip(
+            respuestas['Nombre'], respuestas['Hora de inicio'], respuestas['Valor']
+        )
+    ]
+    st.markdown("\n\n---\n\n".join(bloques))
+    
+    inicio = (int(pagina) - 1) * TEXT_PAGE_SIZE
+    st.caption(
+        f"Respuestas {inicio + 1}-{inicio + len(respuestas)} de {total} "
+        f"(página {int(pagina)} de {paginas})"
+    )
+
+
+@perf.timed(name="dashboard.show_texto_libre")
 def show_texto_libre(df: pd.DataFrame):
     """
     Muestra comentarios individuales de los usuarios.
@@ -277,48 +368,50 @@ def show_texto_libre(df: pd.DataFrame):
 
     # Impedimentos
     st.subheader("🚧 Impedimentos")
-    impedimentos = data_utils.get_text_responses(df, Q_IMPEDIMENTOS)
-    
-    if not impedimentos.empty:
-        for _, respuesta in impedimentos.iterrows():
-            st.markdown(f"**{respuesta['Nombre']}** _{respuesta['Hora de inicio']}_")
-            st.markdown(f"_{respuesta['Valor']}_")
-            st.markdown("---")
-    else:
-        st.info("No hay respuestas sobre impedimentos.")
+    show_text_responses(df, Q_IMPEDIMENTOS, 'impedimentos',
+                        "No hay respuestas sobre impedimentos.")
     
     st.markdown("---")
 
     # Capacitaciones
     st.subheader("🎓 Capacitaciones Sugeridas")
-    capacitaciones = data_utils.get_text_responses(df, Q_CAPACITACIONES)
-    
-    if not capacitaciones.empty:
-        for _, respuesta in capacitaciones.iterrows():
-            st.markdown(f"**{respuesta['Nombre']}** _{respuesta['Hora de inicio']}_")
-            st.markdown(f"_{respuesta['Valor']}_")
-            st.markdown("---")
-    else:
-        st.info("No hay respuestas sobre capacitaciones.")
+    show_text_responses(df, Q_CAPACITACIONES, 'capacitaciones',
+                        "No hay respuestas sobre capacitaciones.")
     
     st.markdown("---")
 
     # Comentarios
     st.subheader("💭 Comentarios y Recomendaciones")
-    comentarios = data_utils.get_text_responses(df, Q_COMENTARIOS)
-    
-    if not comentarios.empty:
-        for _, comentario in comentarios.iterrows():
-            st.markdown(f"**{comentario['Nombre']}** _{comentario['Hora de inicio']}_")
-            st.markdown(f"_{comentario['Valor']}_")
-            st.markdown("---")
-    else:
-        st.info("No hay comentarios disponibles.")
+    show_text_responses(df, Q_COMENTARIOS, 'comentarios',
+                        "No hay comentarios disponibles.")
+
+
+def _export_button(df: pd.DataFrame, nombre: str, icono: str):
+    """
+    Botón de una exportación: la tabla y el CSV se generan recién al presionarlo.
+    """
+    spec = exports.EXPORT_REGISTRY[nombre]
+    if st.button(f"{icono} Exportar {spec['label']}", use_container_width=True,
+                 key=f"exportar_{nombre}"):
+        if exports.export_table(df, nombre).empty:
+            st.info(f"No hay datos de {spec['label'].lower()} para exportar.")
+            return
+        st.download_button(
+            label="Descargar CSV",
+            data=exports.export_bytes(df, nombre, 'csv'),
+            file_name=exports.file_name(nombre, 'csv'),
+            mime=exports.mime_type('csv'),
+            key=f"descargar_{nombre}"
+        )
 
 
+@perf.timed(name="dashboard.show_exportar")
 def show_exportar(df: pd.DataFrame):
     """
     Muestra opciones de exportación.
+    
+    Ninguna exportación se calcula al abrir la pestaña: cada una se genera al
+    presionar su botón y queda cacheada para el dataset/filtro actual.
     """
     st.header("📤 Exportar Datos")
     st.markdown("---")
@@ -332,62 +425,12 @@ def show_exportar(df: pd.DataFrame):
     col1, col2 = st.columns(2)
     
     with col1:
-        # Dataset filtrado
-        if st.button("📊 Exportar Dataset Filtrado", use_container_width=True):
-            csv_data = df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="Descargar CSV",
-                data=csv_data,
-                file_name=f"encuesta_copilot_filtrado_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                mime="text/csv"
-            )
-        
-        # Actividades
-        actividades_stats = data_utils.get_actividades_stats(df)
-        if not actividades_stats.empty:
-            if st.button("📋 Exportar Actividades", use_container_width=True):
-                csv_data = actividades_stats.to_csv().encode('utf-8')
-                st.download_button(
-                    label="Descargar CSV",
-                    data=csv_data,
-                    file_name=f"actividades_copilot_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                    mime="text/csv"
-                )
+        _export_button(df, 'dataset', "📊")
+        _export_button(df, 'actividades', "📋")
     
     with col2:
-        # Modos
-        modos_stats = data_utils.get_modos_stats(df)
-        if not modos_stats.empty:
-            if st.button("🎯 Exportar Modos", use_container_width=True):
-                csv_data = modos_stats.to_csv().encode('utf-8')
-                st.download_button(
-                    label="Descargar CSV",
-                    data=csv_data,
-                    file_name=f"modos_copilot_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                    mime="text/csv"
-                )
-        
-        # Respuestas de texto libre
-        impedimentos = data_utils.get_text_responses(df, Q_IMPEDIMENTOS)
-        capacitaciones = data_utils.get_text_responses(df, Q_CAPACITACIONES)
-        comentarios = data_utils.get_text_responses(df, Q_COMENTARIOS)
-        
-        if not impedimentos.empty or not capacitaciones.empty or not comentarios.empty:
-            if st.button("💬 Exportar Comentarios", use_container_width=True):
-                # Combinar todas las respuestas de texto
-                texto_libre = pd.concat([
-                    impedimentos.assign(Tipo='Impedimentos'),
-                    capacitaciones.assign(Tipo='Capacitaciones'),
-                    comentarios.assign(Tipo='Comentarios')
-                ], ignore_index=True)
-                
-                csv_data = texto_libre.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    label="Descargar CSV",
-                    data=csv_data,
-                    file_name=f"texto_libre_copilot_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                    mime="text/csv"
-                )
+        _export_button(df, 'modos', "🎯")
+        _export_button(df, 'texto_libre', "💬")
     
     st.markdown("---")
     
@@ -397,54 +440,102 @@ def show_exportar(df: pd.DataFrame):
     col1, col2 = st.columns(2)
     
     with col1:
-        likert_individual = data_utils.get_likert_stats(df, Q_YO_PREFIX)
-        if not likert_individual.empty:
-            if st.button("👤 Exportar Percepción Individual", use_container_width=True):
-                csv_data = likert_individual.to_csv().encode('utf-8')
-                st.download_button(
-                    label="Descargar CSV",
-                    data=csv_data,
-                    file_name=f"likert_individual_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                    mime="text/csv"
-                )
+        _export_button(df, 'likert_individual', "👤")
     
     with col2:
-        likert_equipo = data_utils.get_likert_stats(df, Q_EQ_PREFIX)
-        if not likert_equipo.empty:
-            if st.button("👥 Exportar Percepción Equipo", use_container_width=True):
-                csv_data = likert_equipo.to_csv().encode('utf-8')
-                st.download_button(
-                    label="Descargar CSV",
-                    data=csv_data,
-                    file_name=f"likert_equipo_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                    mime="text/csv"
-                )
+        _export_button(df, 'likert_equipo', "👥")
+    
+    st.markdown("---")
+    
+    # Paquete con todas las exportaciones
+    st.subheader("📦 Descargar Todo")
+    formato = st.radio(
+        "Formato de los archivos",
+        list(exports.EXPORT_FORMATS),
+        format_func=lambda fmt: exports.EXPORT_FORMATS[fmt][2],
+        horizontal=True,
+        key="formato_paquete"
+    )
+    if st.button("📦 Exportar Todo (ZIP)", use_container_width=True, key="exportar_paquete"):
+        # Se arma en un temporal que no queda en el cache; Streamlit necesita los bytes
+        with exports.bundle_file(df, formato) as paquete:
+            datos_paquete = paquete.read()
+        st.download_button(
+            label="Descargar ZIP",
+            data=datos_paquete,
+            file_name=exports.bundle_file_name(formato),
+            mime="application/zip",
+            key="descargar_paquete"
+        )
+    
+    st.markdown("---")
+    
+    # Vista estática del dashboard para compartir sin Streamlit
+    st.subheader("🌐 Snapshot HTML")
+    st.caption("Un único archivo HTML con Portada, Uso, Percepción y Comentarios para la vista actual.")
+    if st.button("🌐 Generar Snapshot HTML", use_container_width=True, key="exportar_snapshot"):
+        import snapshot  # arrastra report.py y plotly.offline: solo al generarlo
+        
+        st.download_button(
+            label="Descargar HTML",
+            data=snapshot.snapshot_bytes(df),
+            file_name=f"dashboard_copilot_{datetime.now().strftime('%Y%m%d_%H%M')}.html",
+            mime="text/html",
+            key="descargar_snapshot"
+        )
+
+
+def show_perf_panel(run_id: int):
+    """
+    Panel de depuración en el sidebar con los tiempos por etapa de esta ejecución.
+    """
+    with st.sidebar.expander("⏱️ Rendimiento de esta ejecución", expanded=True):
+        resumen = perf.summary(run_id)
+        if resumen.empty:
+            st.caption("Sin etapas registradas en esta ejecución.")
+            return
+        st.dataframe(resumen, use_container_width=True)
+        st.caption(
+            "Tiempo de pared por etapa (ms), filas de salida y variación de memoria "
+            "residente. Cada etapa también se emite como línea JSON en el log `perf`."
+        )
 
 
 def main():
     """
     Función principal de la aplicación.
     """
+    # Instrumentación opcional (se activa desde el sidebar o con SURVEY_PERF=1)
+    debug = st.session_state.get("debug_perf", perf.is_enabled())
+    run_id = perf.start_run(debug)
+    
     # Cargar datos
     df = load_survey_data()
     
     # Crear filtros en sidebar
-    personas_seleccionadas, fecha_desde, fecha_hasta, bloque_seleccionado = create_sidebar_filters(df)
+    (personas_seleccionadas, fuentes_seleccionadas, fecha_desde, fecha_hasta,
+     bloque_seleccionado) = create_sidebar_filters(df)
     
     # Aplicar filtros
     if not df.empty:
         df_filtered = data_utils.filter_df(
             df, 
-            personas_seleccionadas
+            personas_seleccionadas,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            fuentes=fuentes_seleccionadas
         )
         
         # Mostrar información de filtros aplicados
         # Solo mostrar si hay filtros específicos aplicados (no "Todos")
-        filtros_especificos = len(personas_seleccionadas) > 0
+        filtros_especificos = len(personas_seleccionadas) > 0 or len(fuentes_seleccionadas) > 0
         if filtros_especificos:
             st.sidebar.markdown("---")
             st.sidebar.markdown("**Filtros aplicados:**")
-            st.sidebar.markdown(f"👥 Personas: {len(personas_seleccionadas)}")
+            if personas_seleccionadas:
+                st.sidebar.markdown(f"👥 Personas: {len(personas_seleccionadas)}")
+            if fuentes_seleccionadas:
+                st.sidebar.markdown(f"🗂️ Fuentes: {len(fuentes_seleccionadas)}")
             st.sidebar.markdown(f"📊 Registros: {len(df_filtered)}/{len(df)}")
         else:
             st.sidebar.markdown("---")
@@ -470,6 +561,15 @@ def main():
     # Mostrar información en sidebar si no hay datos
     if df.empty:
         st.sidebar.warning("No hay datos disponibles.")
+    else:
+        cache = memo.cache_info()
+        st.sidebar.caption(
+            f"⚡ Cache de estadísticas: {cache['hits']} aciertos / {cache['misses']} fallos"
+        )
+    
+    st.sidebar.checkbox("🛠️ Panel de rendimiento", value=debug, key="debug_perf")
+    if debug:
+        show_perf_panel(run_id)
     
     # Footer
     st.markdown("---")
@@ -5,11 +5,19 @@ Utilidades para carga, limpieza y transformación de datos.
 import pandas as pd
 import numpy as np
 import re
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cube
+import indexes
+import memo
+import patterns
+import perf
+import sqlstore
+import textindex
 from constants import (
-    LIKERT_MAPPING, NPS_MAPPING, REQUIRED_COLUMNS,
+    LIKERT_MAPPING, LIKERT_LABELS, NPS_MAPPING, REQUIRED_COLUMNS, QUESTION_IDS, CATEGORICAL_COLUMNS,
     Q_NPS, Q_USO_IMPACTO, Q_USO, Q_MODO, Q_YO_PREFIX, Q_EQ_PREFIX,
-    TIEMPO_PATTERNS
+    TEXT_PAGE_SIZE
 )
 
 
@@ -29,37 +37,76 @@ def clean_text(s: str) -> str:
     return s
 
 
+@perf.timed
+def clean_column(values: pd.Series) -> pd.Series:
+    """
+    `clean_text` aplicado a una columna completa.
+
+    Cada valor distinto se limpia una sola vez y el resultado se reparte por
+    código. Se usa `re` y no los métodos de string sobre Arrow, que no tratan
+    los espacios Unicode (em space, U+3000, etc.) como espacios. Faltantes y
+    no-strings pasan sin cambios.
+    """
+    codes, uniques = pd.factorize(values)
+    limpios = np.array([clean_text(v) for v in uniques], dtype=object)
+    
+    resultado = values.to_numpy(dtype=object, copy=True)
+    presentes = codes >= 0
+    resultado[presentes] = limpios[codes[presentes]]
+    dtype = 'category' if isinstance(values.dtype, pd.CategoricalDtype) else values.dtype
+    return pd.Series(resultado, index=values.index, name=values.name, dtype=dtype)
+
+
+@perf.timed
 def load_data(file_path: str) -> pd.DataFrame:
     """
     Carga el archivo Excel y selecciona automáticamente la primera hoja válida.
     """
     try:
-        # Intentar leer todas las hojas
-        excel_file = pd.ExcelFile(file_path, engine='openpyxl')
-        
-        # Buscar la primera hoja que tenga las columnas requeridas
-        for sheet_name in excel_file.sheet_names:
-            try:
-                df = pd.read_excel(file_path, sheet_name=sheet_name, engine='openpyxl')
-                
-                # Verificar si tiene las columnas requeridas
-                if all(col in df.columns for col in REQUIRED_COLUMNS):
-                    return process_dataframe(df)
-                    
-            except Exception as e:
-                continue
-        
-        # Si no encuentra ninguna hoja válida, intentar la primera
-        df = pd.read_excel(file_path, sheet_name=0, engine='openpyxl')
+        with pd.ExcelFile(file_path, engine='openpyxl') as excel_file:
+            # Elegir la hoja mirando solo los encabezados y parsear únicamente esa
+            sheet_name = find_valid_sheet(excel_file)
+            with perf.span('data_utils.excel_parse'):
+                df = excel_file.parse(sheet_name=sheet_name)
         return process_dataframe(df)
         
     except Exception as e:
         raise Exception(f"Error al cargar el archivo: {str(e)}")
 
 
-def process_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+def find_valid_sheet(excel_file: pd.ExcelFile):
+    """
+    Devuelve la primera hoja cuyos encabezados incluyen REQUIRED_COLUMNS (o la primera hoja).
+    """
+    for sheet_name in excel_file.sheet_names:
+        try:
+            header = read_sheet_header(excel_file, sheet_name)
+        except Exception:
+            continue
+        
+        if all(col in header for col in REQUIRED_COLUMNS):
+            return sheet_name
+    
+    # Si no encuentra ninguna hoja válida, usar la primera
+    return 0
+
+
+def read_sheet_header(excel_file: pd.ExcelFile, sheet_name: str) -> List:
+    """
+    Lee solo la fila de encabezados de una hoja usando el workbook ya abierto.
+    """
+    worksheet = excel_file.book[sheet_name]
+    for row in worksheet.iter_rows(min_row=1, max_row=1, values_only=True):
+        return [cell for cell in row if cell is not None]
+    return []
+
+
+@perf.timed
+def process_dataframe(df: pd.DataFrame, compact: bool = True) -> pd.DataFrame:
     """
     Procesa el DataFrame: tipos, limpieza, explosión de valores múltiples.
+
+    Con `compact=True` devuelve la representación compacta (ver `compact_dataframe`).
     """
     # Verificar columnas requeridas
     missing_cols = [col for col in REQUIRED_COLUMNS if col not in df.columns]
@@ -70,7 +117,7 @@ def process_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     text_columns = ["Correo electrónico", "Nombre", "Atributo", "Valor"]
     for col in text_columns:
         if col in df.columns:
-            df[col] = df[col].apply(clean_text)
+            df[col] = clean_column(df[col])
     
     # Convertir tipos
     df['Id'] = pd.to_numeric(df['Id'], errors='coerce').astype('Int64')
@@ -86,9 +133,13 @@ def process_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     # Agregar columnas derivadas
     df = add_derived_columns(df)
     
+    if compact:
+        df = compact_dataframe(df)
+    
     return df
 
 
+@perf.timed
 def explode_multivalue(df: pd.DataFrame) -> pd.DataFrame:
     """
     Explota valores múltiples en la columna Valor separados por ;
@@ -98,7 +149,7 @@ def explode_multivalue(df: pd.DataFrame) -> pd.DataFrame:
     
     # Explotar y limpiar
     df_exploded = df.explode('Valor_split')
-    df_exploded['Valor'] = df_exploded['Valor_split'].apply(clean_text)
+    df_exploded['Valor'] = clean_column(df_exploded['Valor_split'])
     
     # Eliminar valores vacíos
     df_exploded = df_exploded[df_exploded['Valor'].notna() & (df_exploded['Valor'] != '')]
@@ -109,19 +160,72 @@ def explode_multivalue(df: pd.DataFrame) -> pd.DataFrame:
     return df_exploded.reset_index(drop=True)
 
 
+@perf.timed
 def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Agrega columnas derivadas: Likert score, NPS class, etc.
+
+    Se calculan por columnas (máscaras + lookup en diccionario) y producen
+    el mismo resultado que `map_likert_score` / `map_nps_class` fila a fila.
     """
+    atributo = df['Atributo'].astype(str)
+    
     # Mapear Likert cuando corresponde
-    df['Likert_Score'] = df.apply(lambda row: map_likert_score(row), axis=1)
+    es_likert = atributo.str.startswith(Q_YO_PREFIX) | atributo.str.startswith(Q_EQ_PREFIX)
+    likert = df['Valor'][es_likert].astype(str).map(LIKERT_MAPPING)
+    df['Likert_Score'] = likert.reindex(df.index).astype(float)
+    
+    # Mapear NPS class (valores no reconocidos cuentan como Detractor)
+    es_nps = atributo == Q_NPS
+    nps = df['Valor'][es_nps].fillna('').astype(str).str.strip().map(NPS_MAPPING)
+    df['NPS_Class'] = nps.fillna('Detractor').reindex(df.index)
+    
+    return df
+
+
+@perf.timed
+def compact_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte la tabla larga a su representación compacta.
+
+    Las columnas de texto repetidas pasan a categorías, `Likert_Score` a Int8 y se
+    agrega `Pregunta_Id` (int8) según QUESTION_IDS. Es idempotente.
+    """
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
     
-    # Mapear NPS class
-    df['NPS_Class'] = df.apply(lambda row: map_nps_class(row), axis=1)
+    if 'Likert_Score' in df.columns:
+        df['Likert_Score'] = df['Likert_Score'].astype('Int8')
+    
+    if 'Atributo' in df.columns:
+        df['Pregunta_Id'] = question_ids(df['Atributo'])
     
     return df
 
 
+def question_id(atributo: str) -> int:
+    """
+    Id numérico de una pregunta (0 si no corresponde a ninguna constante conocida).
+    """
+    if atributo in QUESTION_IDS:
+        return QUESTION_IDS[atributo]
+    for prefix in (Q_YO_PREFIX, Q_EQ_PREFIX):
+        if atributo.startswith(prefix):
+            return QUESTION_IDS[prefix]
+    return 0
+
+
+def question_ids(atributo: pd.Series) -> pd.Series:
+    """
+    Calcula `Pregunta_Id` resolviendo cada categoría de Atributo una sola vez.
+    """
+    atributo = atributo.astype('category')
+    # El último elemento (0) cubre los códigos -1 de valores faltantes
+    ids = np.array([question_id(str(c)) for c in atributo.cat.categories] + [0], dtype=np.int8)
+    return pd.Series(ids[atributo.cat.codes.to_numpy()], index=atributo.index, name='Pregunta_Id')
+
+
 def map_likert_score(row) -> Optional[int]:
     """
     Mapea respuestas Likert a scores numéricos cuando corresponde.
@@ -148,85 +252,223 @@ def map_nps_class(row) -> Optional[str]:
     return None
 
 
+# Registro de KPIs: cada KPI declara columnas por fila (vectorizadas) y cómo
+# agregarlas por encuestado; `compute_kpis` hace un único groupby para todos.
+KPI_REGISTRY: Dict[str, Dict] = {}
+
+def register_kpi(name: str,
+                 features: Dict[str, Tuple[Callable[[pd.DataFrame], pd.Series], str]],
+                 reducer: Callable[[pd.DataFrame], float],
+                 cube_reducer: Optional[Callable] = None) -> None:
+    """
+    Registra un KPI.
+
+    `features` mapea nombre de columna -> (función fila a fila vectorizada, agregación
+    por encuestado), y `reducer` recibe el resumen por encuestado y devuelve el valor.
+    `cube_reducer(cubo, seleccion)` es opcional y calcula el mismo valor desde el cubo.
+    """
+    KPI_REGISTRY[name] = {'features': features, 'reducer': reducer, 'cube_reducer': cube_reducer}
+
+
+@perf.timed
+@memo.memoized(canonical=lambda: sorted(KPI_REGISTRY))
 def compute_kpis(df: pd.DataFrame) -> Dict:
     """
-    Calcula KPIs principales.
+    Calcula KPIs principales en una sola pasada agrupada por encuestado.
+
+    Si `df` tiene una base SQL asociada y todos los KPIs tienen consulta SQL, se
+    consulta la base; si hay un cubo de respuestas y todos los KPIs saben leerlo, se usa el cubo.
+    """
+    base = sqlstore.lookup(df)
+    if base is not None and set(KPI_REGISTRY) <= set(sqlstore.SQL_KPIS):
+        return sqlstore.compute_kpis(*base)
+    
+    fuente = cube.lookup(df)
+    if fuente is not None and all(kpi['cube_reducer'] for kpi in KPI_REGISTRY.values()):
+        return {name: kpi['cube_reducer'](*fuente) for name, kpi in KPI_REGISTRY.items()}
+    
+    columnas = {}
+    agregaciones = {}
+    for kpi in KPI_REGISTRY.values():
+        for col, (func, agg) in kpi['features'].items():
+            if col not in columnas:
+                columnas[col] = func(df)
+                agregaciones[col] = agg
+    
+    resumen = pd.DataFrame(columnas, index=df.index).groupby(
+        df['Correo electrónico'], dropna=False, sort=False
+    ).agg(agregaciones)
+    
+    return {name: kpi['reducer'](resumen) for name, kpi in KPI_REGISTRY.items()}
+
+
+def _kpi_encuestados(resumen: pd.DataFrame) -> int:
+    """
+    Encuestados únicos (correos no nulos).
     """
-    kpis = {}
+    return int(resumen.index.notna().sum())
+
+
+def _kpi_nps(resumen: pd.DataFrame) -> float:
+    """
+    NPS = % promotores - % detractores sobre las respuestas NPS.
+    """
+    total_nps = resumen['respuestas_nps'].sum()
+    if total_nps == 0:
+        return 0
     
-    # Encuestados únicos
-    kpis['encuestados'] = df['Correo electrónico'].nunique()
+    promotores = resumen['nps_promotores'].sum() / total_nps * 100
+    detractores = resumen['nps_detractores'].sum() / total_nps * 100
+    return promotores - detractores
+
+
+def _kpi_ahorro_tiempo(resumen: pd.DataFrame) -> float:
+    """
+    % de personas que respondieron la pregunta de impacto y mencionan ahorro de tiempo.
+    """
+    personas = resumen[resumen.index.notna()]
+    total_personas = personas['responde_tiempo'].sum()
+    if total_personas == 0:
+        return 0
     
-    # NPS
-    nps_data = df[df['NPS_Class'].notna()]
-    if len(nps_data) > 0:
-        nps_counts = nps_data['NPS_Class'].value_counts()
-        total_nps = len(nps_data)
-        
-        promotores = nps_counts.get('Promotor', 0) / total_nps * 100
-        detractores = nps_counts.get('Detractor', 0) / total_nps * 100
-        
-        kpis['nps'] = promotores - detractores
-    else:
-        kpis['nps'] = 0
-    
-    # % Percibe ahorro de tiempo
-    tiempo_data = df[df['Atributo'] == Q_USO_IMPACTO]
-    if len(tiempo_data) > 0:
-        tiempo_responses = tiempo_data['Valor'].str.lower()
-        ahorro_tiempo = any(
-            any(pattern in response for pattern in TIEMPO_PATTERNS)
-            for response in tiempo_responses if isinstance(response, str)
-        )
-        
-        total_personas = tiempo_data['Correo electrónico'].nunique()
-        personas_ahorro = 0
-        
-        for email in tiempo_data['Correo electrónico'].unique():
-            person_responses = tiempo_data[tiempo_data['Correo electrónico'] == email]['Valor']
-            if any(
-                any(pattern in str(resp).lower() for pattern in TIEMPO_PATTERNS)
-                for resp in person_responses
-            ):
-                personas_ahorro += 1
-        
-        kpis['percibe_ahorro_tiempo'] = (personas_ahorro / total_personas * 100) if total_personas > 0 else 0
-    else:
-        kpis['percibe_ahorro_tiempo'] = 0
+    personas_ahorro = personas['ahorra_tiempo'].sum()
+    return personas_ahorro / total_personas * 100
+
+
+def _menciona_ahorro_tiempo(df: pd.DataFrame) -> pd.Series:
+    """
+    Marca las respuestas de impacto que contienen algún patrón de TIEMPO_PATTERNS.
+    """
+    posiciones = indexes.question_positions(df, Q_USO_IMPACTO)
+    coincide = np.zeros(len(df), dtype=bool)
+    coincide[posiciones] = patterns.matches(df['Valor'].iloc[posiciones], 'ahorro_tiempo')
+    return pd.Series(coincide, index=df.index)
+
+
+def _cube_nps(cubo: Dict, sel: Optional[np.ndarray]) -> float:
+    """
+    NPS desde el cubo (filas por clase NPS de la pregunta de recomendación).
+    """
+    columnas = cube.pair_columns(cubo, atributo=Q_NPS)
+    clases = cubo['pairs']['NPS_Class'].to_numpy()[columnas]
+    filas = cube.pair_rows(cubo, sel, columnas)
+    resumen = pd.DataFrame({
+        'respuestas_nps': [filas[pd.notna(clases)].sum()],
+        'nps_promotores': [filas[clases == 'Promotor'].sum()],
+        'nps_detractores': [filas[clases == 'Detractor'].sum()],
+    })
+    return _kpi_nps(resumen)
+
+
+def _cube_ahorro_tiempo(cubo: Dict, sel: Optional[np.ndarray]) -> float:
+    """
+    % de ahorro de tiempo desde el cubo (personas con algún par que lo menciona).
+    """
+    columnas = cube.pair_columns(cubo, atributo=Q_USO_IMPACTO)
+    menciona = patterns.matches(cubo['pairs']['Valor'].iloc[columnas], 'ahorro_tiempo')
     
-    return kpis
+    total_personas = cube.users_with_any(cubo, sel, columnas)
+    if total_personas == 0:
+        return 0
+    
+    personas_ahorro = cube.users_with_any(cubo, sel, columnas[menciona])
+    return np.int64(personas_ahorro) / total_personas * 100
+
+
+register_kpi('encuestados', {}, _kpi_encuestados, cube.total_users)
+register_kpi('nps', {
+    'respuestas_nps': (lambda df: df['NPS_Class'].notna(), 'sum'),
+    'nps_promotores': (lambda df: df['NPS_Class'] == 'Promotor', 'sum'),
+    'nps_detractores': (lambda df: df['NPS_Class'] == 'Detractor', 'sum'),
+}, _kpi_nps, _cube_nps)
+register_kpi('percibe_ahorro_tiempo', {
+    'responde_tiempo': (lambda df: indexes.question_mask(df, Q_USO_IMPACTO), 'any'),
+    'ahorra_tiempo': (_menciona_ahorro_tiempo, 'any'),
+}, _kpi_ahorro_tiempo, _cube_ahorro_tiempo)
+
 
+def _filter_key(personas: List[str] = None, fecha_desde=None, fecha_hasta=None,
+                dominios: List[str] = None, fuentes: List[str] = None) -> Dict:
+    """
+    Forma canónica de una selección de filtros (para memoización).
+    """
+    return {
+        'personas': sorted({p.strip() for p in personas or [] if isinstance(p, str)}),
+        'fecha_desde': fecha_desde.isoformat() if fecha_desde is not None else None,
+        'fecha_hasta': fecha_hasta.isoformat() if fecha_hasta is not None else None,
+        'dominios': sorted({d.strip().lstrip('@').lower() for d in dominios or [] if d}),
+        'fuentes': sorted(set(fuentes or [])),
+    }
 
-def filter_df(df: pd.DataFrame, personas: List[str] = None) -> pd.DataFrame:
+
+@perf.timed
+@memo.memoized(canonical=_filter_key)
+def filter_df(df: pd.DataFrame, personas: List[str] = None,
+              fecha_desde=None, fecha_hasta=None,
+              dominios: List[str] = None, fuentes: List[str] = None) -> pd.DataFrame:
     """
-    Filtra el DataFrame por personas.
+    Filtra el DataFrame por personas, rango de fechas, dominio de correo y fuente.
+
+    Cada dimensión se resuelve con un índice precalculado y se combina como bitmap.
+    Sin filtros devuelve el mismo DataFrame (sin copia): no debe modificarse.
     """
-    filtered_df = df.copy()
+    mask = None
     
-    # Filtrar por personas (solo por nombre)
+    # Filtrar por personas (solo por nombre, sin espacios extremos)
     if personas and len(personas) > 0:
-        # Normalizar nombres para comparación (limpiar espacios)
-        nombres_normalizados = [p.strip() for p in personas]
-        # Crear máscara comparando nombres normalizados
-        mask = filtered_df['Nombre'].str.strip().isin(nombres_normalizados)
-        filtered_df = filtered_df[mask]
+        mask = _and_mask(mask, indexes.name_mask(df, personas))
     
-    return filtered_df
+    if fecha_desde is not None or fecha_hasta is not None:
+        mask = _and_mask(mask, indexes.date_mask(df, fecha_desde, fecha_hasta))
+    
+    if dominios and len(dominios) > 0:
+        mask = _and_mask(mask, indexes.domain_mask(df, dominios))
+    
+    if fuentes and len(fuentes) > 0:
+        mask = _and_mask(mask, indexes.source_mask(df, fuentes))
+    
+    if mask is None:
+        return df
+    
+    filtered = df.take(np.flatnonzero(mask))
+    key = _filter_key(personas, fecha_desde, fecha_hasta, dominios, fuentes)
+    indexes.register_subset(filtered, df, mask)
+    indexes.attach(filtered, 'filtro', key)
+    memo.register_derived(filtered, df, key)
+    return filtered
+
+
+def _and_mask(mask: Optional[np.ndarray], other: np.ndarray) -> np.ndarray:
+    """
+    Combina bitmaps de filtros (None = sin filtro previo).
+    """
+    return other if mask is None else mask & other
 
 
+@perf.timed
+@memo.memoized
 def get_actividades_stats(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calcula estadísticas de actividades de uso.
     """
-    actividades = df[df['Atributo'] == Q_USO]
+    base = sqlstore.lookup(df)
+    if base is not None:
+        return sqlstore.choice_stats(*base, Q_USO)
+    
+    fuente = cube.lookup(df)
+    if fuente is not None:
+        return _cube_choice_stats(*fuente, Q_USO)
+    
+    actividades = indexes.select_question(df, Q_USO)
     if len(actividades) == 0:
         return pd.DataFrame()
     
     total_encuestados = df['Correo electrónico'].nunique()
     
-    stats = actividades.groupby('Valor').agg({
+    stats = actividades.groupby('Valor', observed=True).agg({
         'Correo electrónico': 'nunique'
     }).rename(columns={'Correo electrónico': 'usuarios'})
+    stats.index = _plain_index(stats.index)
     
     stats['porcentaje'] = (stats['usuarios'] / total_encuestados * 100).round(1)
     stats = stats.sort_values('porcentaje', ascending=False)
@@ -234,19 +476,54 @@ def get_actividades_stats(df: pd.DataFrame) -> pd.DataFrame:
     return stats
 
 
+@perf.timed
+@memo.memoized
 def get_modos_stats(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calcula estadísticas de modos de uso.
     """
-    modos = df[df['Atributo'] == Q_MODO]
+    base = sqlstore.lookup(df)
+    if base is not None:
+        return sqlstore.choice_stats(*base, Q_MODO)
+    
+    fuente = cube.lookup(df)
+    if fuente is not None:
+        return _cube_choice_stats(*fuente, Q_MODO)
+    
+    modos = indexes.select_question(df, Q_MODO)
     if len(modos) == 0:
         return pd.DataFrame()
     
     total_encuestados = df['Correo electrónico'].nunique()
     
-    stats = modos.groupby('Valor').agg({
+    stats = modos.groupby('Valor', observed=True).agg({
         'Correo electrónico': 'nunique'
     }).rename(columns={'Correo electrónico': 'usuarios'})
+    stats.index = _plain_index(stats.index)
+    
+    stats['porcentaje'] = (stats['usuarios'] / total_encuestados * 100).round(1)
+    stats = stats.sort_values('porcentaje', ascending=False)
+    
+    return stats
+
+
+def _cube_choice_stats(cubo: Dict, sel: Optional[np.ndarray], atributo: str) -> pd.DataFrame:
+    """
+    Estadísticas de una pregunta de opción desde el cubo (mismo formato que con filas).
+    """
+    columnas = cube.pair_columns(cubo, atributo=atributo)
+    filas = cube.pair_rows(cubo, sel, columnas)
+    presentes = filas > 0
+    if not presentes.any():
+        return pd.DataFrame()
+    
+    total_encuestados = cube.total_users(cubo, sel)
+    valores = cubo['pairs']['Valor'].iloc[columnas[presentes]]
+    
+    stats = pd.DataFrame(
+        {'usuarios': cube.pair_users(cubo, sel, columnas[presentes])},
+        index=pd.Index(valores.to_numpy(), dtype=valores.dtype, name='Valor')
+    )
     
     stats['porcentaje'] = (stats['usuarios'] / total_encuestados * 100).round(1)
     stats = stats.sort_values('porcentaje', ascending=False)
@@ -254,27 +531,116 @@ def get_modos_stats(df: pd.DataFrame) -> pd.DataFrame:
     return stats
 
 
+def _likert_pairs(df: pd.DataFrame, prefix: str) -> pd.DataFrame:
+    """
+    Conteos de filas por (Atributo, Likert_Score) para las preguntas de un prefijo.
+
+    Sale del cubo si existe; si no, de las filas de la pregunta.
+    """
+    fuente = cube.lookup(df)
+    if fuente is not None:
+        layout, filas = cube.likert_rows(*fuente, prefix)
+        por_par = np.bincount(layout['par'], weights=filas, minlength=len(layout['pares'])).astype(np.int64)
+        presentes = por_par > 0
+        pares = layout['pares'][presentes].reset_index(drop=True)
+        pares['filas'] = por_par[presentes]
+        return pares
+    
+    likert_data = indexes.select_prefix(df, prefix)
+    likert_data = likert_data[likert_data['Likert_Score'].notna()]
+    pares = pd.DataFrame({
+        'Atributo': likert_data['Atributo'].astype(str),
+        'Likert_Score': likert_data['Likert_Score'].astype(float),
+    })
+    return pares.groupby(['Atributo', 'Likert_Score'], as_index=False).size().rename(
+        columns={'size': 'filas'}
+    )
+
+
+@perf.timed
+@memo.memoized
+def get_likert_distribution(df: pd.DataFrame, prefix: str) -> pd.DataFrame:
+    """
+    % de respuestas por pregunta (sin el prefijo) y nivel Likert, en orden de la escala.
+    """
+    pares = _likert_pairs(df, prefix)
+    if len(pares) == 0:
+        return pd.DataFrame()
+    
+    pares['Score_Label'] = pares['Likert_Score'].map(LIKERT_LABELS)
+    pares['Pregunta_Short'] = pares['Atributo'].str.replace(prefix, "").str.strip()
+    
+    conteos = pares.pivot_table(
+        index='Pregunta_Short', columns='Score_Label', values='filas',
+        aggfunc='sum', fill_value=0
+    )
+    contingency = conteos.div(conteos.sum(axis=1), axis=0) * 100
+    
+    return contingency.reindex(columns=[col for col in LIKERT_LABELS.values() if col in contingency.columns])
+
+
+@perf.timed
+@memo.memoized
 def get_likert_stats(df: pd.DataFrame, prefix: str) -> pd.DataFrame:
     """
     Calcula estadísticas de preguntas Likert.
     """
-    likert_data = df[
-        df['Atributo'].str.startswith(prefix) & 
-        df['Likert_Score'].notna()
-    ]
+    base = sqlstore.lookup(df)
+    if base is not None:
+        return sqlstore.likert_stats(*base, prefix)
+    
+    fuente = cube.lookup(df)
+    if fuente is not None:
+        return _cube_likert_stats(df, prefix)
+    
+    likert_data = indexes.select_prefix(df, prefix)
+    likert_data = likert_data[likert_data['Likert_Score'].notna()]
     
     if len(likert_data) == 0:
         return pd.DataFrame()
     
-    stats = likert_data.groupby('Atributo').agg({
+    likert_data = likert_data.assign(Likert_Score=likert_data['Likert_Score'].astype(float))
+    
+    stats = likert_data.groupby('Atributo', observed=True).agg({
         'Likert_Score': ['mean', 'count']
     }).round(2)
     
     stats.columns = ['promedio', 'total_respuestas']
+    stats.index = _plain_index(stats.index)
     
     # Calcular % de acuerdo (scores 1 y 2)
     acuerdo_data = likert_data[likert_data['Likert_Score'].isin([1, 2])]
-    acuerdo_stats = acuerdo_data.groupby('Atributo').size()
+    acuerdo_stats = acuerdo_data.groupby('Atributo', observed=True).size()
+    acuerdo_stats.index = _plain_index(acuerdo_stats.index)
+    
+    stats['respuestas_acuerdo'] = stats.index.map(acuerdo_stats).fillna(0)
+    stats['pct_acuerdo'] = (stats['respuestas_acuerdo'] / stats['total_respuestas'] * 100).round(1)
+    
+    return stats
+
+
+def _cube_likert_stats(df: pd.DataFrame, prefix: str) -> pd.DataFrame:
+    """
+    Estadísticas Likert desde la agrupación precalculada del cubo (sumas ponderadas).
+    """
+    layout, filas = cube.likert_rows(*cube.lookup(df), prefix)
+    n_atributos = len(layout['atributos'])
+    total = np.bincount(layout['grupo'], weights=filas, minlength=n_atributos).astype(np.int64)
+    presentes = total > 0
+    if not presentes.any():
+        return pd.DataFrame()
+    
+    suma = np.bincount(layout['grupo'], weights=filas * layout['scores'], minlength=n_atributos)
+    acuerdo = np.bincount(layout['grupo'], weights=filas * layout['acuerdo'],
+                          minlength=n_atributos).astype(np.int64)
+    index = layout['atributos'][presentes]
+    stats = pd.DataFrame({
+        'promedio': suma[presentes] / total[presentes],
+        'total_respuestas': total[presentes],
+    }, index=index).round(2)
+    
+    con_acuerdo = presentes & (acuerdo > 0)
+    acuerdo_stats = pd.Series(acuerdo[con_acuerdo], index=layout['atributos'][con_acuerdo])
     
     stats['respuestas_acuerdo'] = stats.index.map(acuerdo_stats).fillna(0)
     stats['pct_acuerdo'] = (stats['respuestas_acuerdo'] / stats['total_respuestas'] * 100).round(1)
@@ -282,11 +648,26 @@ def get_likert_stats(df: pd.DataFrame, prefix: str) -> pd.DataFrame:
     return stats
 
 
+def _plain_index(index: pd.Index) -> pd.Index:
+    """
+    Convierte un CategoricalIndex (resultado de agrupar categorías) en un índice común.
+    """
+    if isinstance(index, pd.CategoricalIndex):
+        return index.astype(index.categories.dtype)
+    return index
+
+
+@perf.timed
+@memo.memoized
 def get_text_responses(df: pd.DataFrame, atributo: str) -> pd.DataFrame:
     """
     Obtiene respuestas de texto libre para un atributo específico.
     """
-    responses = df[df['Atributo'] == atributo][
+    base = sqlstore.lookup(df)
+    if base is not None:
+        return sqlstore.text_responses(*base, atributo)
+    
+    responses = indexes.select_question(df, atributo)[
         ['Correo electrónico', 'Nombre', 'Hora de inicio', 'Valor']
     ].copy()
     
@@ -301,6 +682,65 @@ def get_text_responses(df: pd.DataFrame, atributo: str) -> pd.DataFrame:
     return responses
 
 
+# Criterios de orden de las respuestas de texto libre -> columna
+TEXT_SORT_COLUMNS = {'fecha': 'Hora de inicio', 'nombre': 'Nombre'}
+
+
+def _sort_key(values: pd.Series) -> pd.Series:
+    """
+    Ordena columnas categóricas por su texto y no por el orden de las categorías.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.astype(values.cat.categories.dtype)
+    return values
+
+
+@perf.timed
+@memo.memoized(canonical=lambda atributo, busqueda='', orden='fecha', ascendente=False: [
+    atributo, (busqueda or '').strip(), orden, ascendente
+])
+def search_text_responses(df: pd.DataFrame, atributo: str, busqueda: str = '',
+                          orden: str = 'fecha', ascendente: bool = False) -> pd.DataFrame:
+    """
+    Respuestas de texto libre que contienen `busqueda` (sin distinguir mayúsculas),
+    ordenadas por fecha o por nombre.
+
+    El índice invertido (textindex.py) acota las filas candidatas y la subcadena
+    se confirma solo sobre ellas.
+    """
+    if orden not in TEXT_SORT_COLUMNS:
+        raise ValueError(f"Orden no soportado: {orden}")
+    
+    responses = get_text_responses(df, atributo)
+    busqueda = (busqueda or '').strip()
+    if busqueda:
+        if atributo in textindex.TEXT_QUESTIONS:
+            candidatas = textindex.substring_candidates(df, busqueda)
+            if candidatas is not None:
+                responses = responses[responses.index.isin(df.index[candidatas])]
+        responses = responses[
+            responses['Valor'].str.contains(busqueda, case=False, regex=False).fillna(False)
+        ]
+    
+    return responses.sort_values(
+        TEXT_SORT_COLUMNS[orden], ascending=ascendente, kind='stable', key=_sort_key
+    )
+
+
+def page_text_responses(df: pd.DataFrame, atributo: str, pagina: int = 1,
+                        por_pagina: int = TEXT_PAGE_SIZE, busqueda: str = '',
+                        orden: str = 'fecha', ascendente: bool = False) -> Tuple[pd.DataFrame, int]:
+    """
+    Página `pagina` (desde 1) de las respuestas de texto libre y el total encontrado.
+
+    La búsqueda y el orden se cachean por dataset/filtro, así que pasar de página
+    solo corta `por_pagina` filas.
+    """
+    resultados = search_text_responses(df, atributo, busqueda, orden, ascendente)
+    inicio = max(pagina - 1, 0) * por_pagina
+    return resultados.iloc[inicio:inicio + por_pagina], len(resultados)
+
+
 # Test functions para validación
 def test_data_quality(df: pd.DataFrame) -> Dict:
     """
@@ -326,7 +766,9 @@ def test_data_quality(df: pd.DataFrame) -> Dict:
     
     # Test: mapeo de Likert
     likert_mapped = df['Likert_Score'].notna().sum()
-    likert_questions = df['Atributo'].str.startswith((Q_YO_PREFIX, Q_EQ_PREFIX)).sum()
+    likert_questions = (
+        len(indexes.prefix_positions(df, Q_YO_PREFIX)) + len(indexes.prefix_positions(df, Q_EQ_PREFIX))
+    )
     tests['likert_mapping'] = {
         'likert_scores_mapped': likert_mapped,
         'potential_likert_questions': likert_questions,
@@ -335,7 +777,7 @@ def test_data_quality(df: pd.DataFrame) -> Dict:
     
     # Test: mapeo de NPS
     nps_mapped = df['NPS_Class'].notna().sum()
-    nps_questions = (df['Atributo'] == Q_NPS).sum()
+    nps_questions = len(indexes.question_positions(df, Q_NPS))
     tests['nps_mapping'] = {
         'nps_classes_mapped': nps_mapped,
         'nps_questions': nps_questions,
@@ -0,0 +1,256 @@
+"""
+Exportaciones del dashboard generadas bajo demanda.
+
+Cada exportación se declara en `EXPORT_REGISTRY` con la función que arma su
+tabla. Nada se calcula hasta que se pide una exportación concreta, y las tablas
+y los bytes de cada exportación se cachean por versión del dataset/filtro (ver
+memo.py); el ZIP completo no se cachea.
+
+`write_bundle` arma un ZIP con todas las exportaciones en CSV, Parquet o un
+libro XLSX de varias hojas: los archivos se generan en paralelo, por bloques de
+filas, en temporales que pasan a disco cuando crecen, y se copian al ZIP por
+bloques de bytes.
+"""
+
+import io
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+import data_utils
+import memo
+from constants import Q_YO_PREFIX, Q_EQ_PREFIX, Q_IMPEDIMENTOS, Q_CAPACITACIONES, Q_COMENTARIOS
+
+# Formato -> (extensión, tipo MIME, etiqueta)
+EXPORT_FORMATS = {
+    'csv': ('csv', 'text/csv', "CSV"),
+    'parquet': ('parquet', 'application/vnd.apache.parquet', "Parquet"),
+    'xlsx': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+             "Excel (XLSX)"),
+}
+
+# Filas por bloque al serializar y bytes por bloque al copiar al ZIP
+DEFAULT_CHUNK_ROWS = 50_000
+COPY_CHUNK_BYTES = 1 << 20
+
+# Los temporales quedan en memoria hasta este tamaño y después pasan a disco
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+# Filas de datos por hoja de Excel (el límite es 1.048.576 contando el encabezado)
+XLSX_MAX_ROWS = 1_048_575
+
+# nombre -> {'label', 'file_prefix', 'build', 'index'}
+EXPORT_REGISTRY: Dict[str, Dict] = {}
+
+
+def register_export(name: str, label: str, file_prefix: str,
+                    build: Callable[[pd.DataFrame], pd.DataFrame],
+                    index: bool = False) -> None:
+    """
+    Registra una exportación.
+
+    `build(df)` arma la tabla a exportar a partir del DataFrame filtrado;
+    `index` indica si el índice de la tabla se incluye en el archivo.
+    """
+    EXPORT_REGISTRY[name] = {
+        'label': label,
+        'file_prefix': file_prefix,
+        'build': build,
+        'index': index,
+    }
+
+
+def _texto_libre(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Combina las respuestas de texto libre de las tres preguntas abiertas.
+    """
+    return pd.concat([
+        data_utils.get_text_responses(df, Q_IMPEDIMENTOS).assign(Tipo='Impedimentos'),
+        data_utils.get_text_responses(df, Q_CAPACITACIONES).assign(Tipo='Capacitaciones'),
+        data_utils.get_text_responses(df, Q_COMENTARIOS).assign(Tipo='Comentarios')
+    ], ignore_index=True)
+
+
+register_export('dataset', "Dataset Filtrado", 'encuesta_copilot_filtrado', lambda df: df)
+register_export('actividades', "Actividades", 'actividades_copilot',
+                data_utils.get_actividades_stats, index=True)
+register_export('modos', "Modos", 'modos_copilot', data_utils.get_modos_stats, index=True)
+register_export('texto_libre', "Comentarios", 'texto_libre_copilot', _texto_libre)
+register_export('likert_individual', "Percepción Individual", 'likert_individual',
+                lambda df: data_utils.get_likert_stats(df, Q_YO_PREFIX), index=True)
+register_export('likert_equipo', "Percepción Equipo", 'likert_equipo',
+                lambda df: data_utils.get_likert_stats(df, Q_EQ_PREFIX), index=True)
+
+
+@memo.memoized
+def export_table(df: pd.DataFrame, name: str) -> pd.DataFrame:
+    """
+    Tabla de una exportación (se calcula la primera vez que se pide).
+    """
+    return EXPORT_REGISTRY[name]['build'](df)
+
+
+def _write_csv(tabla: pd.DataFrame, fileobj, index: bool, chunk_rows: int) -> None:
+    """
+    Escribe una tabla como CSV UTF-8 por bloques de filas.
+    """
+    texto = io.TextIOWrapper(fileobj, encoding='utf-8', newline='', write_through=True)
+    try:
+        for inicio in range(0, max(len(tabla), 1), chunk_rows):
+            tabla.iloc[inicio:inicio + chunk_rows].to_csv(
+                texto, header=inicio == 0, index=index
+            )
+    finally:
+        texto.detach()
+
+
+def _write_parquet(tabla: pd.DataFrame, fileobj, index: bool, chunk_rows: int) -> None:
+    """
+    Escribe una tabla como Parquet, un row group por bloque de filas.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    schema = pa.Schema.from_pandas(tabla, preserve_index=index)
+    with pq.ParquetWriter(fileobj, schema) as writer:
+        for inicio in range(0, len(tabla), chunk_rows):
+            writer.write_table(pa.Table.from_pandas(
+                tabla.iloc[inicio:inicio + chunk_rows], schema=schema, preserve_index=index
+            ))
+
+
+def _write_xlsx(tablas: Dict[str, Tuple[pd.DataFrame, bool]], fileobj) -> None:
+    """
+    Escribe un libro con una hoja por tabla (las tablas muy largas siguen en hojas extra).
+    """
+    with pd.ExcelWriter(fileobj, engine='openpyxl') as writer:
+        for nombre, (tabla, index) in tablas.items():
+            for parte, inicio in enumerate(range(0, max(len(tabla), 1), XLSX_MAX_ROWS)):
+                hoja = nombre if parte == 0 else f"{nombre}_{parte + 1}"
+                tabla.iloc[inicio:inicio + XLSX_MAX_ROWS].to_excel(
+                    writer, sheet_name=hoja[:31], index=index
+                )
+
+
+def write_export(df: pd.DataFrame, name: str, fmt: str, fileobj,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS) -> None:
+    """
+    Escribe una exportación en un archivo binario abierto.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportación no soportado: {fmt}")
+    tabla = export_table(df, name)
+    index = EXPORT_REGISTRY[name]['index']
+    if fmt == 'csv':
+        _write_csv(tabla, fileobj, index, chunk_rows)
+    elif fmt == 'parquet':
+        _write_parquet(tabla, fileobj, index, chunk_rows)
+    else:
+        _write_xlsx({name: (tabla, index)}, fileobj)
+
+
+@memo.memoized(canonical=lambda name, fmt='csv': [name, fmt])
+def export_bytes(df: pd.DataFrame, name: str, fmt: str = 'csv') -> bytes:
+    """
+    Contenido del archivo de una exportación en el formato pedido.
+    """
+    buffer = io.BytesIO()
+    write_export(df, name, fmt, buffer)
+    return buffer.getvalue()
+
+
+def _spool(write: Callable) -> tempfile.SpooledTemporaryFile:
+    """
+    Ejecuta `write(archivo)` sobre un temporal y lo devuelve rebobinado.
+    """
+    tmp = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    try:
+        write(tmp)
+    except BaseException:
+        tmp.close()
+        raise
+    tmp.seek(0)
+    return tmp
+
+
+def write_bundle(df: pd.DataFrame, dest, fmt: str = 'csv',
+                 names: Optional[Iterable[str]] = None,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 max_workers: Optional[int] = None) -> List[str]:
+    """
+    Escribe en `dest` (ruta o archivo binario) un ZIP con las exportaciones.
+
+    En CSV y Parquet cada exportación es un archivo del ZIP; en XLSX todas van a
+    un único libro con una hoja por exportación. Los archivos se generan en
+    paralelo y se agregan al ZIP en orden a medida que están listos.
+    Devuelve los nombres de los archivos incluidos.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportación no soportado: {fmt}")
+    names = list(names) if names is not None else list(EXPORT_REGISTRY)
+    extension = EXPORT_FORMATS[fmt][0]
+    # Parquet ya viene comprimido: se guarda tal cual en el ZIP
+    compresion = zipfile.ZIP_STORED if fmt == 'parquet' else zipfile.ZIP_DEFLATED
+    
+    with ThreadPoolExecutor(max_workers=max_workers or min(4, max(len(names), 1))) as pool:
+        if fmt == 'xlsx':
+            tablas = dict(zip(names, pool.map(lambda name: export_table(df, name), names)))
+            hojas = {name: (tablas[name], EXPORT_REGISTRY[name]['index']) for name in names}
+            partes = [(f"reporte_copilot.{extension}",
+                       pool.submit(_spool, lambda f: _write_xlsx(hojas, f)))]
+        else:
+            partes = [
+                (f"{EXPORT_REGISTRY[name]['file_prefix']}.{extension}",
+                 pool.submit(_spool, lambda f, name=name: write_export(df, name, fmt, f, chunk_rows)))
+                for name in names
+            ]
+        
+        with zipfile.ZipFile(dest, 'w') as bundle:
+            for arcname, future in partes:
+                with future.result() as tmp:
+                    size = tmp.seek(0, io.SEEK_END)
+                    tmp.seek(0)
+                    info = zipfile.ZipInfo(arcname, date_time=datetime.now().timetuple()[:6])
+                    info.compress_type = compresion
+                    with bundle.open(info, 'w', force_zip64=size >= zipfile.ZIP64_LIMIT) as entry:
+                        shutil.copyfileobj(tmp, entry, COPY_CHUNK_BYTES)
+    
+    return [arcname for arcname, _ in partes]
+
+
+def bundle_file(df: pd.DataFrame, fmt: str = 'csv') -> tempfile.SpooledTemporaryFile:
+    """
+    ZIP con todas las exportaciones en un temporal rebobinado (pasa a disco si crece).
+
+    No se cachea: el archivo es del que lo pide y se libera al cerrarlo.
+    """
+    return _spool(lambda f: write_bundle(df, f, fmt))
+
+
+def file_name(name: str, fmt: str = 'csv', now: Optional[datetime] = None) -> str:
+    """
+    Nombre del archivo descargado: prefijo + fecha y hora + extensión.
+    """
+    now = now or datetime.now()
+    extension = EXPORT_FORMATS[fmt][0]
+    return f"{EXPORT_REGISTRY[name]['file_prefix']}_{now.strftime('%Y%m%d_%H%M')}.{extension}"
+
+
+def bundle_file_name(fmt: str = 'csv', now: Optional[datetime] = None) -> str:
+    """
+    Nombre del ZIP descargado con todas las exportaciones.
+    """
+    now = now or datetime.now()
+    return f"exportacion_copilot_{fmt}_{now.strftime('%Y%m%d_%H%M')}.zip"
+
+
+def mime_type(fmt: str = 'csv') -> str:
+    """
+    Tipo MIME de un formato de exportación.
+    """
+    return EXPORT_FORMATS[fmt][1]
@@ -0,0 +1,316 @@
+"""
+Índices posicionales sobre la tabla larga para evitar escaneos completos.
+
+Los índices se construyen una vez por DataFrame y se guardan en un registro
+interno (por identidad del objeto, con weakref), por lo que se asume que la
+tabla no se modifica después de indexarla.
+"""
+
+import weakref
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from constants import SOURCE_COLUMN
+
+# id(df) -> (weakref al DataFrame, estado con sus índices)
+_REGISTRY: Dict[int, Tuple[weakref.ref, Dict]] = {}
+
+
+def _frame_state(df: pd.DataFrame) -> Dict:
+    """
+    Devuelve el diccionario de índices asociado a un DataFrame (lo crea si no existe).
+    """
+    key = id(df)
+    entry = _REGISTRY.get(key)
+    if entry is not None and entry[0]() is df and entry[1].get('n_rows') == len(df):
+        return entry[1]
+
+    state = {'n_rows': len(df)}
+    ref = weakref.ref(df, lambda _, key=key: _REGISTRY.pop(key, None))
+    _REGISTRY[key] = (ref, state)
+    return state
+
+
+def _codes(values: pd.Series, normalize=None) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Códigos enteros y valores distintos de una columna (aprovecha las categorías).
+
+    `normalize` se aplica a cada valor distinto y une los que quedan iguales.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        uniques = values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+        uniques = pd.Index(uniques)
+
+    if normalize is not None:
+        remap, uniques = pd.factorize(pd.Series(uniques, dtype=object).map(normalize))
+        remap = np.append(remap, -1)
+        codes = remap[codes]
+    return codes, pd.Index(uniques)
+
+
+def _group_positions(codes: np.ndarray, uniques: pd.Index) -> Dict[str, np.ndarray]:
+    """
+    Agrupa posiciones de fila por código: valor -> posiciones ordenadas.
+    """
+    # Ordenamiento estable por código: cada valor queda como un tramo contiguo
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    start = int((codes < 0).sum())
+
+    index = {}
+    for value, count in zip(uniques, counts):
+        if count > 0:
+            index[value] = order[start:start + count]
+        start += count
+    return index
+
+
+def build_question_index(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Construye el mapa Atributo -> posiciones de fila (ordenadas) en una sola pasada.
+    """
+    return _group_positions(*_codes(df['Atributo']))
+
+
+def get_question_index(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Índice de preguntas del DataFrame, construido la primera vez que se pide.
+    """
+    state = _frame_state(df)
+    if 'preguntas' not in state:
+        state['preguntas'] = build_question_index(df)
+        state['prefijos'] = {}
+    return state['preguntas']
+
+
+def question_positions(df: pd.DataFrame, atributo: str) -> np.ndarray:
+    """
+    Posiciones de las filas de una pregunta.
+    """
+    return get_question_index(df).get(atributo, np.empty(0, dtype=np.intp))
+
+
+def prefix_positions(df: pd.DataFrame, prefix: str) -> np.ndarray:
+    """
+    Posiciones (ordenadas) de las filas cuyas preguntas empiezan con `prefix`.
+    """
+    index = get_question_index(df)
+    prefijos = _frame_state(df)['prefijos']
+    if prefix not in prefijos:
+        partes = [pos for atributo, pos in index.items() if str(atributo).startswith(prefix)]
+        prefijos[prefix] = (
+            np.sort(np.concatenate(partes)) if partes else np.empty(0, dtype=np.intp)
+        )
+    return prefijos[prefix]
+
+
+def question_mask(df: pd.DataFrame, atributo: str) -> np.ndarray:
+    """
+    Máscara booleana de las filas de una pregunta.
+    """
+    mask = np.zeros(len(df), dtype=bool)
+    mask[question_positions(df, atributo)] = True
+    return mask
+
+
+def select_question(df: pd.DataFrame, atributo: str) -> pd.DataFrame:
+    """
+    Equivale a `df[df['Atributo'] == atributo]` sin recorrer toda la tabla.
+    """
+    return df.iloc[question_positions(df, atributo)]
+
+
+def select_prefix(df: pd.DataFrame, prefix: str) -> pd.DataFrame:
+    """
+    Equivale a `df[df['Atributo'].str.startswith(prefix)]` sin recorrer toda la tabla.
+    """
+    return df.iloc[prefix_positions(df, prefix)]
+
+
+def state_entry(df: pd.DataFrame, name: str, builder):
+    """
+    Devuelve (y construye la primera vez) una entrada del estado del DataFrame.
+    """
+    state = _frame_state(df)
+    if name not in state:
+        state[name] = builder(df)
+    return state[name]
+
+
+def attached(df: pd.DataFrame, name: str):
+    """
+    Devuelve una entrada del estado del DataFrame sin construirla (None si no existe).
+    """
+    entry = _REGISTRY.get(id(df))
+    if entry is None or entry[0]() is not df or entry[1].get('n_rows') != len(df):
+        return None
+    return entry[1].get(name)
+
+
+def attach(df: pd.DataFrame, name: str, value) -> None:
+    """
+    Guarda (o reemplaza) una entrada en el estado del DataFrame.
+    """
+    _frame_state(df)[name] = value
+
+
+def register_subset(child: pd.DataFrame, parent: pd.DataFrame, mask: np.ndarray) -> None:
+    """
+    Registra que `child` son las filas de `parent` marcadas en `mask`.
+    """
+    _frame_state(child)['origen'] = (weakref.ref(parent), mask)
+
+
+def parent_of(df: pd.DataFrame) -> Optional[Tuple[pd.DataFrame, np.ndarray]]:
+    """
+    (DataFrame padre, máscara de filas) si `df` fue registrado como subconjunto.
+    """
+    origen = attached(df, 'origen')
+    if origen is None:
+        return None
+    parent = origen[0]()
+    if parent is None or len(origen[1]) != len(parent):
+        return None
+    return parent, origen[1]
+
+
+def normalize_name(nombre) -> Optional[str]:
+    """
+    Normaliza un nombre para compararlo (sin espacios extremos; vacío -> None).
+    """
+    if not isinstance(nombre, str):
+        return None
+    return nombre.strip() or None
+
+
+def email_domain(correo) -> Optional[str]:
+    """
+    Dominio (en minúsculas) de un correo electrónico.
+    """
+    if not isinstance(correo, str) or '@' not in correo:
+        return None
+    return correo.rsplit('@', 1)[1].strip().lower() or None
+
+
+def get_name_index(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Índice nombre normalizado -> posiciones de fila.
+    """
+    return state_entry(
+        df, 'nombres', lambda df: _group_positions(*_codes(df['Nombre'], normalize_name))
+    )
+
+
+def get_domain_index(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Índice dominio de correo -> posiciones de fila.
+    """
+    return state_entry(
+        df, 'dominios',
+        lambda df: _group_positions(*_codes(df['Correo electrónico'], email_domain))
+    )
+
+
+def get_source_index(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Índice fuente (archivo de origen) -> posiciones de fila; vacío con una sola encuesta.
+    """
+    if SOURCE_COLUMN not in df.columns:
+        return {}
+    return state_entry(df, 'fuentes', lambda df: _group_positions(*_codes(df[SOURCE_COLUMN])))
+
+
+def _build_date_order(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Posiciones ordenadas por 'Hora de inicio' y las fechas válidas en ese orden.
+    """
+    fechas = df['Hora de inicio'].to_numpy(dtype='datetime64[ns]')
+    order = np.argsort(fechas, kind='stable')  # NaT queda al final
+    n_validas = int((~np.isnat(fechas)).sum())
+    return order[:n_validas], fechas[order[:n_validas]]
+
+
+def person_names(df: pd.DataFrame) -> List[str]:
+    """
+    Nombres normalizados disponibles, ordenados alfabéticamente.
+    """
+    return sorted(get_name_index(df))
+
+
+def email_domains(df: pd.DataFrame) -> List[str]:
+    """
+    Dominios de correo disponibles, ordenados alfabéticamente.
+    """
+    return sorted(get_domain_index(df))
+
+
+def source_names(df: pd.DataFrame) -> List[str]:
+    """
+    Fuentes disponibles, ordenadas alfabéticamente.
+    """
+    return sorted(get_source_index(df))
+
+
+def name_mask(df: pd.DataFrame, nombres: Iterable[str]) -> np.ndarray:
+    """
+    Bitmap de las filas de las personas indicadas (nombres comparados sin espacios extremos).
+    """
+    index = get_name_index(df)
+    mask = np.zeros(len(df), dtype=bool)
+    for nombre in set(filter(None, map(normalize_name, nombres))):
+        if nombre in index:
+            mask[index[nombre]] = True
+    return mask
+
+
+def domain_mask(df: pd.DataFrame, dominios: Iterable[str]) -> np.ndarray:
+    """
+    Bitmap de las filas cuyos correos pertenecen a los dominios indicados.
+    """
+    index = get_domain_index(df)
+    mask = np.zeros(len(df), dtype=bool)
+    for dominio in {d.strip().lstrip('@').lower() for d in dominios if d}:
+        if dominio in index:
+            mask[index[dominio]] = True
+    return mask
+
+
+def date_mask(df: pd.DataFrame, desde=None, hasta=None) -> np.ndarray:
+    """
+    Bitmap de las filas con 'Hora de inicio' en [desde, hasta].
+
+    Si `hasta` es una fecha sin hora se incluye el día completo.
+    """
+    order, fechas = state_entry(df, 'fechas', _build_date_order)
+    inicio = 0
+    fin = len(fechas)
+    if desde is not None:
+        inicio = np.searchsorted(fechas, np.datetime64(pd.Timestamp(desde)), side='left')
+    if hasta is not None:
+        if isinstance(hasta, date) and not isinstance(hasta, datetime):
+            limite = np.datetime64(pd.Timestamp(hasta + timedelta(days=1)))
+            fin = np.searchsorted(fechas, limite, side='left')
+        else:
+            fin = np.searchsorted(fechas, np.datetime64(pd.Timestamp(hasta)), side='right')
+
+    mask = np.zeros(len(df), dtype=bool)
+    mask[order[inicio:fin]] = True
+    return mask
+
+
+def source_mask(df: pd.DataFrame, fuentes: Iterable[str]) -> np.ndarray:
+    """
+    Bitmap de las filas que provienen de las fuentes indicadas.
+    """
+    index = get_source_index(df)
+    mask = np.zeros(len(df), dtype=bool)
+    for fuente in set(fuentes):
+        if fuente in index:
+            mask[index[fuente]] = True
+    return mask
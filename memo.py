@@ -0,0 +1,184 @@
+"""
+Memoización de filtros y estadísticas por versión del dataset y selección de filtros.
+
+Cada DataFrame cargado se registra con una versión (`register_dataset`) y cada
+subconjunto que genera `filter_df` hereda un token = hash(token del padre, filtro
+canónico). Las funciones decoradas con `memoized` usan ese token como clave, así
+que volver a una sección o a un filtro ya visto no recalcula nada. El cache es un
+LRU acotado por cantidad de entradas y por tamaño aproximado en bytes.
+
+Los resultados se comparten entre llamadas: no deben modificarse.
+"""
+
+import functools
+import hashlib
+import json
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+import indexes
+
+MAX_ENTRIES = 256
+MAX_BYTES = 256 * 1024 * 1024
+
+_LOCK = threading.Lock()
+_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_COUNTERS = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes': 0}
+
+
+def _canonical_hash(value) -> str:
+    """
+    Hash estable de una estructura (listas, tuplas, fechas, etc.).
+    """
+    texto = json.dumps(value, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+
+def register_dataset(df: pd.DataFrame, version: Optional[str] = None) -> str:
+    """
+    Registra un DataFrame cargado con su versión (por defecto, una nueva al azar).
+    """
+    token = _canonical_hash(['dataset', version or uuid.uuid4().hex])
+    indexes.attach(df, 'memo_token', token)
+    return token
+
+
+def register_derived(child: pd.DataFrame, parent: pd.DataFrame, filtro) -> None:
+    """
+    Asigna a un subconjunto el token derivado del padre y del filtro canónico.
+    """
+    parent_token = dataset_token(parent)
+    if parent_token is not None:
+        indexes.attach(child, 'memo_token', _canonical_hash([parent_token, filtro]))
+
+
+def dataset_token(df: pd.DataFrame) -> Optional[str]:
+    """
+    Token de memoización de un DataFrame (None si no está registrado).
+    """
+    return indexes.attached(df, 'memo_token')
+
+
+def _size_of(value) -> int:
+    """
+    Tamaño aproximado en bytes de un resultado cacheado.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    return sys.getsizeof(value)
+
+
+def _store(key: tuple, value) -> None:
+    """
+    Guarda un resultado y desaloja los menos usados si se exceden los límites.
+
+    Un valor más grande que MAX_BYTES no se guarda (vaciaría el cache sin quedar en él).
+    """
+    size = _size_of(value)
+    with _LOCK:
+        if key in _CACHE:
+            _COUNTERS['bytes'] -= _CACHE.pop(key)[1]
+        if size > MAX_BYTES:
+            return
+        _CACHE[key] = (value, size)
+        _COUNTERS['bytes'] += size
+        while _CACHE and (len(_CACHE) > MAX_ENTRIES or _COUNTERS['bytes'] > MAX_BYTES):
+            _, (_, old_size) = _CACHE.popitem(last=False)
+            _COUNTERS['bytes'] -= old_size
+            _COUNTERS['evictions'] += 1
+
+
+def fingerprint(*parts) -> str:
+    """
+    Huella estable de un conjunto de valores (DataFrames, Series o estructuras simples).
+
+    Sirve para cachear resultados por contenido cuando no hay un DataFrame
+    registrado del que tomar el token.
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+            columnas = list(part.columns) if isinstance(part, pd.DataFrame) else [part.name]
+            digest.update(_canonical_hash([columnas, list(part.index.names)]).encode('ascii'))
+        else:
+            digest.update(_canonical_hash(part).encode('ascii'))
+    return digest.hexdigest()
+
+
+def lookup(key: tuple):
+    """
+    Busca un valor guardado con `store` (None si no está); cuenta aciertos y fallos.
+    """
+    with _LOCK:
+        entry = _CACHE.get(key)
+        if entry is None:
+            _COUNTERS['misses'] += 1
+            return None
+        _CACHE.move_to_end(key)
+        _COUNTERS['hits'] += 1
+        return entry[0]
+
+
+def store(key: tuple, value) -> None:
+    """
+    Guarda un valor en el mismo LRU que usan las funciones memoizadas.
+    """
+    _store(key, value)
+
+
+def memoized(func: Callable = None, canonical: Callable = None):
+    """
+    Decorador para funciones cuyo primer argumento es el DataFrame.
+
+    `canonical(*args, **kwargs)` normaliza el resto de los argumentos para la clave
+    (por defecto se usan tal cual). Si el DataFrame no está registrado se llama
+    directamente a la función.
+    """
+    if func is None:
+        return functools.partial(memoized, canonical=canonical)
+
+    @functools.wraps(func)
+    def wrapper(df, *args, **kwargs):
+        token = dataset_token(df)
+        if token is None:
+            return func(df, *args, **kwargs)
+
+        argumentos = canonical(*args, **kwargs) if canonical else [args, kwargs]
+        key = (func.__module__, func.__qualname__, token, _canonical_hash(argumentos))
+        with _LOCK:
+            entry = _CACHE.get(key)
+            if entry is not None:
+                _CACHE.move_to_end(key)
+                _COUNTERS['hits'] += 1
+                return entry[0]
+            _COUNTERS['misses'] += 1
+
+        value = func(df, *args, **kwargs)
+        _store(key, value)
+        return value
+
+    return wrapper
+
+
+def cache_info() -> Dict:
+    """
+    Contadores del cache: aciertos, fallos, desalojos, entradas y bytes.
+    """
+    with _LOCK:
+        return dict(_COUNTERS, entries=len(_CACHE))
+
+
+def clear_cache() -> None:
+    """
+    Vacía el cache y reinicia los contadores.
+    """
+    with _LOCK:
+        _CACHE.clear()
+        _COUNTERS.update(hits=0, misses=0, evictions=0, bytes=0)
@@ -0,0 +1,107 @@
+"""
+Clasificación de textos por conjuntos de patrones.
+
+Cada conjunto (por ejemplo TIEMPO_PATTERNS) se compila en una sola expresión
+regular sobre texto normalizado (minúsculas y sin acentos, ver
+`textindex.fold_text`). Una columna se clasifica evaluando cada valor distinto
+una única vez y repartiendo el resultado por códigos.
+
+Sintaxis de los patrones: las palabras se separan por espacios (uno o más) y un
+`*` al final de una palabra acepta cualquier terminación (`ahorr*` cubre
+"ahorro", "ahorré", "ahorrar"...).
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from constants import TIEMPO_PATTERNS
+from textindex import fold_text
+
+# nombre -> {'patterns', 'regex'}
+PATTERN_SETS: Dict[str, Dict] = {}
+
+
+def _pattern_regex(pattern: str) -> str:
+    """
+    Traduce un patrón a una expresión regular sobre texto normalizado.
+    """
+    palabras = []
+    for palabra in fold_text(pattern).split(' '):
+        if palabra.endswith('*'):
+            palabras.append(re.escape(palabra.rstrip('*')) + r'\w*')
+        else:
+            palabras.append(re.escape(palabra))
+    return r'\s+'.join(palabras)
+
+
+def compile_patterns(patterns: Iterable[str]) -> re.Pattern:
+    """
+    Compila una lista de patrones en una única expresión regular.
+    """
+    alternativas = [_pattern_regex(p) for p in patterns if fold_text(p)]
+    if not alternativas:
+        return re.compile(r'(?!)')  # no coincide con nada
+    return re.compile('|'.join(f'(?:{a})' for a in alternativas))
+
+
+def register_pattern_set(name: str, patterns: Iterable[str]) -> None:
+    """
+    Registra (o reemplaza) un conjunto de patrones con nombre.
+    """
+    patterns = list(patterns)
+    PATTERN_SETS[name] = {'patterns': patterns, 'regex': compile_patterns(patterns)}
+
+
+def pattern_regex(name: str) -> re.Pattern:
+    """
+    Expresión compilada de un conjunto registrado.
+    """
+    if name not in PATTERN_SETS:
+        raise KeyError(f"Conjunto de patrones no registrado: {name}")
+    return PATTERN_SETS[name]['regex']
+
+
+def _distinct(values: pd.Series):
+    """
+    Códigos por fila (-1 = faltante) y valores distintos de una columna.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), list(values.cat.categories)
+    codes, uniques = pd.factorize(values)
+    return codes, list(uniques)
+
+
+def matches(values: pd.Series, name: str) -> np.ndarray:
+    """
+    Máscara de los valores que contienen algún patrón del conjunto `name`.
+    """
+    regex = pattern_regex(name)
+    codes, uniques = _distinct(values)
+    por_valor = np.array(
+        [isinstance(v, str) and regex.search(fold_text(v)) is not None for v in uniques] + [False],
+        dtype=bool
+    )
+    return por_valor[codes]
+
+
+def classify(values: pd.Series, names: Optional[List[str]] = None) -> pd.Series:
+    """
+    Nombre del primer conjunto (en orden de `names` o de registro) que coincide
+    con cada valor; None si ninguno coincide.
+    """
+    names = list(names) if names is not None else list(PATTERN_SETS)
+    codes, uniques = _distinct(values)
+    etiquetas = []
+    for valor in uniques:
+        texto = fold_text(valor)
+        etiquetas.append(next(
+            (n for n in names if texto and pattern_regex(n).search(texto)), None
+        ))
+    etiquetas.append(None)
+    return pd.Series(np.array(etiquetas, dtype=object)[codes], index=values.index, dtype=object)
+
+
+register_pattern_set('ahorro_tiempo', TIEMPO_PATTERNS)
@@ -0,0 +1,238 @@
+"""
+Instrumentación liviana por etapa: tiempo, filas y memoria.
+
+Las funciones decoradas con `timed` (y los bloques `span`) registran, cuando la
+instrumentación está activa, el tiempo de pared, las filas de entrada/salida y
+la variación de memoria residente. Cada registro se guarda en un buffer acotado
+(para el panel de depuración del dashboard) y se emite como una línea JSON en
+el logger `perf`. Desactivada, el costo es leer un `ContextVar` por llamada.
+
+Se activa para todo el proceso con la variable de entorno `SURVEY_PERF=1`, o
+para el contexto actual (p. ej. una sesión del dashboard) con `enable()` /
+`start_run(True)`: el estado activo y el id de ejecución viven en un
+`ContextVar`, así que cada sesión solo ve y cambia lo suyo.
+"""
+
+import functools
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+MAX_RECORDS = 1000
+
+logger = logging.getLogger("perf")
+
+# Valor por defecto para contextos que no llamaron a `enable` / `start_run`
+_DEFAULT_ENABLED = os.environ.get("SURVEY_PERF", "") not in ("", "0")
+_LOCK = threading.Lock()
+_RECORDS: deque = deque(maxlen=MAX_RECORDS)
+_LOCAL = threading.local()
+_RUN_IDS = itertools.count(1)
+
+# (activa, id de ejecución) del contexto actual; None = valores por defecto
+_STATE: ContextVar = ContextVar("perf_state", default=None)
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def _rss_bytes() -> Optional[int]:
+    """
+    Memoria residente actual del proceso (None si no se puede leer).
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _rows(value) -> Optional[int]:
+    """
+    Filas de un DataFrame/Series (None para otros valores).
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    return None
+
+
+def _install_handler() -> None:
+    """
+    Emite los registros del logger `perf` como líneas sueltas en stderr.
+    """
+    with _LOCK:
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+
+
+if _DEFAULT_ENABLED:
+    _install_handler()
+
+
+def _state():
+    """
+    (activa, id de ejecución) del contexto actual.
+    """
+    state = _STATE.get()
+    return state if state is not None else (_DEFAULT_ENABLED, 0)
+
+
+def enable(enabled: bool = True) -> None:
+    """
+    Activa o desactiva la instrumentación en el contexto actual.
+    """
+    _STATE.set((enabled, _state()[1]))
+    if enabled:
+        _install_handler()
+
+
+def is_enabled() -> bool:
+    """
+    Indica si la instrumentación está activa en el contexto actual.
+    """
+    return _state()[0]
+
+
+def start_run(enabled: Optional[bool] = None) -> Optional[int]:
+    """
+    Marca el comienzo de una ejecución (un rerun del dashboard) en el contexto actual.
+
+    `enabled` activa o desactiva la instrumentación para esta ejecución (por
+    defecto se mantiene). Devuelve el id de la ejecución, o None si está desactivada.
+    """
+    enabled = is_enabled() if enabled is None else enabled
+    if not enabled:
+        _STATE.set((False, 0))
+        return None
+    run_id = next(_RUN_IDS)
+    _STATE.set((True, run_id))
+    _install_handler()
+    return run_id
+
+
+def _record(stage: str, start: float, rss_start: Optional[int],
+            rows_in: Optional[int], rows_out: Optional[int], error: Optional[str]) -> None:
+    """
+    Guarda un registro y lo emite como línea JSON.
+    """
+    rss_end = _rss_bytes()
+    record = {
+        'run': _state()[1],
+        'stage': stage,
+        'depth': len(_LOCAL.stack),
+        'ms': round((time.perf_counter() - start) * 1000, 3),
+        'rows_in': rows_in,
+        'rows_out': rows_out,
+        'rss_delta_bytes': rss_end - rss_start if rss_end is not None and rss_start is not None else None,
+        'rss_bytes': rss_end,
+        'ts': round(time.time(), 3),
+    }
+    if error is not None:
+        record['error'] = error
+    with _LOCK:
+        _RECORDS.append(record)
+    logger.info(json.dumps(record, ensure_ascii=False))
+
+
+@contextmanager
+def span(stage: str, rows_in: Optional[int] = None):
+    """
+    Mide un bloque de código como una etapa.
+    """
+    if not is_enabled():
+        yield
+        return
+    stack = _LOCAL.__dict__.setdefault('stack', [])
+    stack.append(stage)
+    start, rss_start, error = time.perf_counter(), _rss_bytes(), None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        stack.pop()
+        _record(stage, start, rss_start, rows_in, None, error)
+
+
+def timed(func: Callable = None, name: Optional[str] = None):
+    """
+    Decorador que registra cada llamada como una etapa (`modulo.funcion` por defecto).
+
+    Las filas de entrada se toman del primer argumento y las de salida del
+    resultado, cuando son DataFrames o Series.
+    """
+    if func is None:
+        return functools.partial(timed, name=name)
+    stage = name or f"{func.__module__}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not is_enabled():
+            return func(*args, **kwargs)
+        stack = _LOCAL.__dict__.setdefault('stack', [])
+        stack.append(stage)
+        start, rss_start, error, result = time.perf_counter(), _rss_bytes(), None, None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            stack.pop()
+            _record(stage, start, rss_start, _rows(args[0]) if args else None, _rows(result), error)
+
+    return wrapper
+
+
+def records(run: Optional[int] = None) -> List[Dict]:
+    """
+    Registros guardados (de una ejecución, si se indica `run`), en orden de finalización.
+    """
+    with _LOCK:
+        data = list(_RECORDS)
+    if run is not None:
+        data = [r for r in data if r['run'] == run]
+    return data
+
+
+def summary(run: Optional[int] = None) -> pd.DataFrame:
+    """
+    Resumen por etapa: llamadas, tiempo total y máximo, filas y memoria.
+    """
+    data = pd.DataFrame(records(run))
+    if data.empty:
+        return pd.DataFrame(columns=['llamadas', 'ms_total', 'ms_max', 'filas_salida', 'rss_delta_mb'])
+    resumen = data.groupby('stage', sort=False).agg(
+        llamadas=('ms', 'size'),
+        ms_total=('ms', 'sum'),
+        ms_max=('ms', 'max'),
+        filas_salida=('rows_out', 'max'),
+        rss_delta_mb=('rss_delta_bytes', 'sum'),
+    )
+    resumen['rss_delta_mb'] = (resumen['rss_delta_mb'] / (1024 * 1024)).round(2)
+    return resumen.sort_values('ms_total', ascending=False)
+
+
+def clear() -> None:
+    """
+    Borra los registros guardados.
+    """
+    with _LOCK:
+        _RECORDS.clear()
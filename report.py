@@ -0,0 +1,377 @@
+"""
+Reporte por lotes sin Streamlit.
+
+Calcula las estadísticas y los gráficos de cada sección del dashboard para el
+dataset completo y para una lista de filtros (por persona, dominio, fuente,
+rango de fechas o combinaciones leídas de un JSON), repartiendo el trabajo en un pool de
+procesos. Cada par filtro/sección es una tarea que escribe en
+`<salida>/<filtro>/<sección>/`:
+
+- `stats.json`: KPIs y tablas de la sección.
+- `<gráfico>.html` / `<gráfico>.png`: figuras (PNG requiere `kaleido`).
+- `<exportación>.csv`: las tablas de `exports.EXPORT_REGISTRY` de la sección.
+
+El dataset se carga una sola vez desde el snapshot Parquet (ver storage.py) y
+cada proceso reutiliza sus índices y su cache de estadísticas entre tareas. Al
+final se escribe `<salida>/report.json` con el detalle de cada tarea.
+
+Uso:
+    python report.py --output reporte/
+    python report.py --por-persona --por-dominio --formats html png --workers 8
+    python report.py --filtros filtros.json --secciones portada uso
+    python report.py --source "encuestas/*.xlsx" --por-fuente
+
+Formato de `filtros.json` (todas las claves son opcionales):
+    [{"nombre": "Equipo A", "personas": ["Ana Pérez", "Luis Gómez"],
+      "dominios": ["empresa.com"], "fuentes": ["unidad_norte"],
+      "fecha_desde": "2025-01-01", "fecha_hasta": "2025-03-31"}]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import charts
+import data_utils
+import exports
+import indexes
+import memo
+import storage
+from constants import (
+    Q_SENTIMIENTO, Q_NPS, Q_YO_PREFIX, Q_EQ_PREFIX,
+    Q_IMPEDIMENTOS, Q_CAPACITACIONES, Q_COMENTARIOS
+)
+from textindex import fold_text
+
+FIGURE_FORMATS = ['html', 'png']
+PLOTLY_JS = "plotly.min.js"
+
+# nombre -> {'label', 'build', 'exports'}
+REPORT_SECTIONS: Dict[str, Dict] = {}
+
+# Dataset del proceso (se hereda con fork o se carga en el inicializador del pool)
+_DATASET: Dict = {'df': None}
+
+
+def register_section(name: str, label: str, build: Callable,
+                     export_names: List[str] = ()) -> None:
+    """
+    Registra una sección del reporte.
+
+    `build(df)` devuelve (stats, figuras): un diccionario serializable a JSON y
+    un diccionario nombre -> figura. `export_names` son las exportaciones de
+    `exports.EXPORT_REGISTRY` que se escriben como CSV.
+    """
+    REPORT_SECTIONS[name] = {'label': label, 'build': build, 'exports': list(export_names)}
+
+
+def _records(tabla: pd.DataFrame) -> List[Dict]:
+    """
+    Filas de una tabla como diccionarios (el índice con nombre pasa a columna).
+    """
+    if tabla.index.name is not None:
+        tabla = tabla.reset_index()
+    return tabla.astype(object).where(tabla.notna(), None).to_dict('records')
+
+
+def _json_default(value):
+    """
+    Conversión a JSON de escalares numpy, fechas y faltantes.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if value is pd.NA or value is pd.NaT:
+        return None
+    raise TypeError(f"No serializable: {type(value).__name__}")
+
+
+def _portada(df: pd.DataFrame):
+    """
+    KPIs y gráficos de sentimiento y recomendación.
+    """
+    figuras = {}
+    if len(indexes.question_positions(df, Q_SENTIMIENTO)) > 0:
+        figuras['sentimiento'] = charts.create_sentiment_chart(df, Q_SENTIMIENTO, "pie")
+    if len(indexes.question_positions(df, Q_NPS)) > 0:
+        figuras['nps'] = charts.create_nps_pie_chart(df)
+    return {'kpis': data_utils.compute_kpis(df)}, figuras
+
+
+def _uso(df: pd.DataFrame):
+    """
+    Actividades y modos de uso.
+    """
+    actividades = data_utils.get_actividades_stats(df)
+    modos = data_utils.get_modos_stats(df)
+    figuras = {}
+    if not actividades.empty:
+        figuras['actividades'] = charts.create_horizontal_bar_chart(
+            actividades, "Todas las actividades utilizadas", top_n=None
+        )
+    if not modos.empty:
+        figuras['modos'] = charts.create_horizontal_bar_chart(modos, "Modos de uso preferidos")
+    return {'actividades': _records(actividades), 'modos': _records(modos)}, figuras
+
+
+def _percepcion(prefix: str, titulo: str) -> Callable:
+    """
+    Sección de percepción (individual o de equipo) para un prefijo Likert.
+    """
+    def build(df: pd.DataFrame):
+        likert = data_utils.get_likert_stats(df, prefix)
+        figuras = {}
+        if not likert.empty:
+            figuras['distribucion'] = charts.create_likert_stacked_bar(
+                df, prefix, f"{titulo} - Distribución"
+            )
+        return {'likert': _records(likert)}, figuras
+    return build
+
+
+def _comentarios(df: pd.DataFrame):
+    """
+    Cantidad de respuestas de texto libre por pregunta (el detalle va al CSV).
+    """
+    return {
+        'respuestas': {
+            clave: len(data_utils.get_text_responses(df, atributo))
+            for clave, atributo in [('impedimentos', Q_IMPEDIMENTOS),
+                                    ('capacitaciones', Q_CAPACITACIONES),
+                                    ('comentarios', Q_COMENTARIOS)]
+        }
+    }, {}
+
+
+register_section('portada', "Portada", _portada)
+register_section('uso', "Uso", _uso, ['actividades', 'modos'])
+register_section('percepcion_individual', "Percepción Individual",
+                 _percepcion(Q_YO_PREFIX, "Percepción Individual"), ['likert_individual'])
+register_section('percepcion_equipo', "Percepción Equipo",
+                 _percepcion(Q_EQ_PREFIX, "Percepción del Equipo"), ['likert_equipo'])
+register_section('comentarios', "Comentarios de Usuarios", _comentarios, ['texto_libre'])
+register_section('exportar', "Exportar", lambda df: ({}, {}), ['dataset'])
+
+
+def slugify(texto: str) -> str:
+    """
+    Nombre de carpeta a partir de un texto (minúsculas, sin acentos ni símbolos).
+    """
+    return re.sub(r'[^a-z0-9]+', '-', fold_text(texto)).strip('-') or 'filtro'
+
+
+def _parse_fecha(valor):
+    """
+    Fecha de un filtro: 'AAAA-MM-DD' es un día completo, el resto un instante.
+    """
+    if valor is None or isinstance(valor, (date, datetime)):
+        return valor
+    if re.fullmatch(r'\d{4}-\d{2}-\d{2}', valor):
+        return date.fromisoformat(valor)
+    return pd.Timestamp(valor)
+
+
+def build_filters(df: pd.DataFrame, archivo: Optional[str] = None,
+                  por_persona: bool = False, por_dominio: bool = False,
+                  por_fuente: bool = False) -> List[Dict]:
+    """
+    Lista de filtros del reporte: el dataset completo, los del archivo JSON y,
+    opcionalmente, uno por persona, por dominio de correo y por fuente.
+    """
+    filtros = [{'nombre': "Todos"}]
+    if archivo:
+        with open(archivo, encoding='utf-8') as f:
+            filtros += json.load(f)
+    if por_persona:
+        filtros += [{'nombre': f"persona {n}", 'personas': [n]} for n in indexes.person_names(df)]
+    if por_dominio:
+        filtros += [{'nombre': f"dominio {d}", 'dominios': [d]} for d in indexes.email_domains(df)]
+    if por_fuente:
+        filtros += [{'nombre': f"fuente {f}", 'fuentes': [f]} for f in indexes.source_names(df)]
+
+    # Carpeta única por filtro
+    usados = set()
+    for i, filtro in enumerate(filtros):
+        filtro.setdefault('nombre', f"filtro {i}")
+        slug = base = slugify(filtro['nombre'])
+        n = 2
+        while slug in usados:
+            slug, n = f"{base}-{n}", n + 1
+        usados.add(slug)
+        filtro['slug'] = slug
+    return filtros
+
+
+def apply_filter(df: pd.DataFrame, filtro: Dict) -> pd.DataFrame:
+    """
+    Aplica un filtro del reporte con `data_utils.filter_df`.
+    """
+    return data_utils.filter_df(
+        df,
+        filtro.get('personas'),
+        fecha_desde=_parse_fecha(filtro.get('fecha_desde')),
+        fecha_hasta=_parse_fecha(filtro.get('fecha_hasta')),
+        dominios=filtro.get('dominios'),
+        fuentes=filtro.get('fuentes'),
+    )
+
+
+def load_dataset(file_path: str) -> pd.DataFrame:
+    """
+    Dataset procesado del proceso actual (snapshot + índices), cargado una vez.
+    """
+    if _DATASET['df'] is None:
+        df = storage.load_sources(file_path)
+        indexes.get_question_index(df)
+        memo.register_dataset(df)
+        _DATASET['df'] = df
+    return _DATASET['df']
+
+
+def run_task(file_path: str, filtro: Dict, seccion: str, output: str,
+             formats: List[str]) -> Dict:
+    """
+    Calcula una sección para un filtro y escribe sus archivos.
+    """
+    inicio = time.perf_counter()
+    resultado = {'filtro': filtro['slug'], 'seccion': seccion, 'archivos': []}
+    try:
+        df = apply_filter(load_dataset(file_path), filtro)
+        destino = os.path.join(output, filtro['slug'], seccion)
+        os.makedirs(destino, exist_ok=True)
+        spec = REPORT_SECTIONS[seccion]
+        resultado['filas'] = len(df)
+
+        stats, figuras = spec['build'](df) if not df.empty else ({}, {})
+        archivos = []
+        with open(os.path.join(destino, 'stats.json'), 'w', encoding='utf-8') as f:
+            json.dump({'filtro': filtro['nombre'], 'seccion': spec['label'], 'filas': len(df),
+                       **stats}, f, ensure_ascii=False, indent=2, default=_json_default)
+        archivos.append('stats.json')
+
+        for nombre, fig in figuras.items():
+            if 'html' in formats:
+                # plotly.js se escribe una sola vez en la raíz de la salida
+                fig.write_html(os.path.join(destino, f"{nombre}.html"),
+                               include_plotlyjs=f"../../{PLOTLY_JS}", full_html=True)
+                archivos.append(f"{nombre}.html")
+            if 'png' in formats:
+                fig.write_image(os.path.join(destino, f"{nombre}.png"))
+                archivos.append(f"{nombre}.png")
+
+        for nombre in spec['exports']:
+            if df.empty:
+                continue
+            with open(os.path.join(destino, f"{nombre}.csv"), 'wb') as f:
+                exports.write_export(df, nombre, 'csv', f)
+            archivos.append(f"{nombre}.csv")
+        resultado['archivos'] = archivos
+    except Exception as e:
+        resultado['error'] = f"{type(e).__name__}: {e}"
+    resultado['segundos'] = round(time.perf_counter() - inicio, 4)
+    return resultado
+
+
+def _init_worker(file_path: str) -> None:
+    """
+    Inicializador del pool: deja el dataset cargado en cada proceso.
+    """
+    load_dataset(file_path)
+
+
+def run_report(file_path: str, output: str, filtros: List[Dict], secciones: List[str],
+               formats: List[str], workers: Optional[int] = None) -> Dict:
+    """
+    Ejecuta todas las tareas filtro x sección en un pool de procesos y escribe
+    el resumen en `<output>/report.json`.
+    """
+    os.makedirs(output, exist_ok=True)
+    if 'html' in formats:
+        import plotly.offline
+
+        with open(os.path.join(output, PLOTLY_JS), 'w', encoding='utf-8') as f:
+            f.write(plotly.offline.get_plotlyjs())
+
+    # El proceso principal carga (y si hace falta genera) el snapshot antes de crear el pool
+    df = load_dataset(file_path)
+    inicio = time.perf_counter()
+    tareas = [(filtro, seccion) for filtro in filtros for seccion in secciones]
+    resultados = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(file_path,)) as pool:
+        futuros = [pool.submit(run_task, file_path, filtro, seccion, output, formats)
+                   for filtro, seccion in tareas]
+        for i, futuro in enumerate(as_completed(futuros), 1):
+            resultado = futuro.result()
+            resultados.append(resultado)
+            if 'error' in resultado:
+                print(f"[{i}/{len(tareas)}] {resultado['filtro']}/{resultado['seccion']}: "
+                      f"{resultado['error']}", file=sys.stderr)
+            elif i % 50 == 0 or i == len(tareas):
+                print(f"[{i}/{len(tareas)}] tareas completadas")
+
+    orden = {(f['slug'], s): i for i, (f, s) in enumerate(tareas)}
+    resultados.sort(key=lambda r: orden[(r['filtro'], r['seccion'])])
+    informe = {
+        'generado': datetime.now().isoformat(timespec='seconds'),
+        'fuente': os.path.abspath(file_path),
+        'filas_dataset': len(df),
+        'secciones': secciones,
+        'formatos': formats,
+        'filtros': filtros,
+        'segundos': round(time.perf_counter() - inicio, 3),
+        'errores': sum('error' in r for r in resultados),
+        'tareas': resultados,
+    }
+    with open(os.path.join(output, 'report.json'), 'w', encoding='utf-8') as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2, default=_json_default)
+    return informe
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--source', default=storage.DEFAULT_SOURCE,
+                        help="Excel/CSV, directorio o patrón glob con las encuestas")
+    parser.add_argument('--output', default='reporte', help="Carpeta de salida")
+    parser.add_argument('--filtros', help="JSON con la lista de filtros")
+    parser.add_argument('--por-persona', action='store_true', help="Un filtro por persona")
+    parser.add_argument('--por-dominio', action='store_true', help="Un filtro por dominio de correo")
+    parser.add_argument('--por-fuente', action='store_true', help="Un filtro por encuesta de origen")
+    parser.add_argument('--secciones', nargs='+', choices=list(REPORT_SECTIONS),
+                        default=list(REPORT_SECTIONS))
+    parser.add_argument('--formats', nargs='+', choices=FIGURE_FORMATS, default=['html'],
+                        help="Formatos de las figuras")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Procesos del pool (por defecto, uno por CPU)")
+    args = parser.parse_args()
+
+    if 'png' in args.formats and importlib.util.find_spec('kaleido') is None:
+        parser.error("El formato png requiere el paquete kaleido (pip install kaleido)")
+
+    df = load_dataset(args.source)
+    filtros = build_filters(df, args.filtros, args.por_persona, args.por_dominio,
+                            args.por_fuente)
+    print(f"{len(filtros)} filtros x {len(args.secciones)} secciones sobre {len(df)} filas")
+
+    informe = run_report(args.source, args.output, filtros, args.secciones,
+                         args.formats, args.workers)
+    print(f"Reporte en {args.output}/ ({informe['segundos']:.1f} s, "
+          f"{informe['errores']} errores)")
+    sys.exit(1 if informe['errores'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+Snapshot HTML estático del dashboard.
+
+Arma un único archivo HTML autocontenido con Portada, Uso, las dos secciones de
+Percepción y los comentarios, reutilizando las secciones de `report.py`, los
+gráficos de `charts.py` y los bloques HTML `create_kpi_cards` /
+`create_timeline_comments`. plotly.js se incluye una sola vez en el `<head>` y
+cada gráfico solo aporta su JSON, así que el archivo se puede servir desde
+cualquier servidor estático sin cómputo por visita.
+
+Uso: python snapshot.py [--source encuesta.xlsx] [--output dashboard.html]
+                        [--max-comentarios 200]
+"""
+
+import argparse
+import os
+from datetime import datetime
+from html import escape
+from typing import Optional
+
+import pandas as pd
+
+import charts
+import data_utils
+import memo
+import perf
+import report
+import storage
+from constants import Q_IMPEDIMENTOS, Q_CAPACITACIONES, Q_COMENTARIOS
+
+# Comentarios por pregunta incluidos en el snapshot (los más recientes)
+SNAPSHOT_MAX_COMMENTS = 200
+
+# (clave, pregunta, título)
+SNAPSHOT_COMMENTS = [
+    ('impedimentos', Q_IMPEDIMENTOS, "🚧 Impedimentos"),
+    ('capacitaciones', Q_CAPACITACIONES, "🎓 Capacitaciones Sugeridas"),
+    ('comentarios', Q_COMENTARIOS, "💭 Comentarios y Recomendaciones"),
+]
+
+# (sección de report.py, título, gráficos en orden)
+SNAPSHOT_SECTIONS = [
+    ('portada', "🤖 Portada", ['sentimiento', 'nps']),
+    ('uso', "🚀 Uso de GitHub Copilot", ['actividades', 'modos']),
+    ('percepcion_individual', "👤 Percepción Individual", ['distribucion']),
+    ('percepcion_equipo', "👥 Percepción del Equipo", ['distribucion']),
+]
+
+_STYLE = """
+body { font-family: "Source Sans Pro", sans-serif; margin: 0 auto; max-width: 1200px;
+       padding: 0 24px 48px; color: #262730; }
+nav { position: sticky; top: 0; background: white; padding: 12px 0;
+      border-bottom: 1px solid #e6e6e6; z-index: 10; }
+nav a { margin-right: 16px; color: #1f77b4; text-decoration: none; }
+section { padding-top: 24px; border-bottom: 1px solid #e6e6e6; }
+.graficos { display: flex; flex-wrap: wrap; gap: 16px; }
+.graficos > div { flex: 1 1 480px; min-width: 0; }
+.pie { color: #808495; font-size: 0.9em; margin-top: 24px; }
+"""
+
+
+def _figure_div(fig, div_id: str) -> str:
+    """
+    HTML de un gráfico sin plotly.js (se carga una vez en el `<head>`).
+    """
+    return fig.to_html(full_html=False, include_plotlyjs=False, div_id=div_id,
+                       config={'responsive': True, 'displaylogo': False})
+
+
+def _comments_html(df: pd.DataFrame, max_comentarios: Optional[int]) -> str:
+    """
+    Comentarios de las tres preguntas abiertas, los más recientes primero.
+    """
+    partes = []
+    for clave, atributo, titulo in SNAPSHOT_COMMENTS:
+        respuestas = data_utils.search_text_responses(df, atributo, orden='fecha', ascendente=False)
+        total = len(respuestas)
+        if max_comentarios is not None:
+            respuestas = respuestas.head(max_comentarios)
+        partes.append(f"<h3>{titulo}</h3>")
+        if total > len(respuestas):
+            partes.append(f'<p class="pie">Mostrando los {len(respuestas)} más recientes '
+                          f'de {total} respuestas.</p>')
+        partes.append(charts.create_timeline_comments(respuestas))
+    return "\n".join(partes)
+
+
+@memo.memoized
+def _snapshot_body(df: pd.DataFrame, max_comentarios: Optional[int]) -> str:
+    """
+    Navegación y secciones del snapshot (sin la fecha), cacheadas por versión del dataset/filtro.
+    """
+    nav = ['<a href="#comentarios">💬 Comentarios</a>']
+    secciones = []
+
+    for nombre, encabezado, graficos in SNAPSHOT_SECTIONS:
+        nav.insert(len(nav) - 1, f'<a href="#{nombre}">{escape(encabezado)}</a>')
+        partes = [f'<section id="{nombre}"><h2>{escape(encabezado)}</h2>']
+        if df.empty:
+            partes.append("<p>No hay datos disponibles para mostrar.</p>")
+        else:
+            stats, figuras = report.REPORT_SECTIONS[nombre]['build'](df)
+            if 'kpis' in stats:
+                partes.append(charts.create_kpi_cards(stats['kpis']))
+            divs = [_figure_div(figuras[g], f"{nombre}-{g}") for g in graficos if g in figuras]
+            if divs:
+                partes.append('<div class="graficos">' + "".join(f"<div>{d}</div>" for d in divs)
+                              + '</div>')
+            else:
+                partes.append("<p>No hay datos disponibles para esta sección.</p>")
+        partes.append('</section>')
+        secciones.append("\n".join(partes))
+
+    secciones.append('<section id="comentarios"><h2>💬 Comentarios de Usuarios</h2>\n'
+                     + (_comments_html(df, max_comentarios) if not df.empty
+                        else "<p>No hay comentarios disponibles.</p>")
+                     + '</section>')
+    return f"<nav>{' '.join(nav)}</nav>\n{''.join(secciones)}"
+
+
+@perf.timed
+def render_snapshot(df: pd.DataFrame, titulo: str = "Dashboard - Adopción GitHub Copilot",
+                    max_comentarios: Optional[int] = SNAPSHOT_MAX_COMMENTS,
+                    generado: Optional[datetime] = None) -> str:
+    """
+    Documento HTML completo del dashboard para `df`.
+
+    Las secciones salen del cache; la fecha del pie se toma en cada llamada.
+    """
+    import plotly.offline
+
+    generado = generado or datetime.now()
+    cuerpo = _snapshot_body(df, max_comentarios)
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{escape(titulo)}</title>
+<style>{_STYLE}</style>
+<script type="text/javascript">{plotly.offline.get_plotlyjs()}</script>
+</head>
+<body>
+<h1>{escape(titulo)}</h1>
+{cuerpo}
+<p class="pie">Snapshot generado el {generado.strftime('%d/%m/%Y %H:%M')}
+sobre {len(df)} registros.</p>
+</body>
+</html>
+"""
+
+
+def snapshot_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Snapshot HTML (UTF-8) con la fecha actual; las secciones se reutilizan del cache.
+    """
+    return render_snapshot(df).encode('utf-8')
+
+
+def write_snapshot(df: pd.DataFrame, path: str, **kwargs) -> None:
+    """
+    Escribe el snapshot de forma atómica: un servidor estático nunca ve un archivo a medias.
+    """
+    html = render_snapshot(df, **kwargs)
+
+    def escribir(tmp: str) -> None:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(html)
+
+    storage.write_atomic(path, escribir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--source', default=storage.DEFAULT_SOURCE,
+                        help="Excel/CSV, directorio o patrón glob con las encuestas")
+    parser.add_argument('--output', default='dashboard.html')
+    parser.add_argument('--max-comentarios', type=int, default=SNAPSHOT_MAX_COMMENTS,
+                        help="Comentarios por pregunta (0 = todos)")
+    args = parser.parse_args()
+
+    df = report.load_dataset(args.source)
+    write_snapshot(df, args.output, max_comentarios=args.max_comentarios or None)
+    print(f"Snapshot en {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,545 @@
+"""
+Backend SQL embebido (SQLite) para la capa de estadísticas.
+
+La tabla larga procesada se guarda en un archivo SQLite local: las columnas
+categóricas como códigos (los textos quedan en `categorias`), las fechas como
+enteros en nanosegundos, con índices por pregunta/valor, encuestado, nombre,
+fecha y fuente. Tablas auxiliares guardan lo que en pandas se calcula sobre
+cada valor distinto (nombre normalizado, dominio del correo, respuestas vacías
+y coincidencias con los conjuntos de patrones de patterns.py). La base guarda
+la huella de esos patrones: si cambian, `is_current` la da por vencida y las
+consultas vuelven al backend en memoria hasta que se regenere.
+
+Las consultas (`choice_stats`, `likert_stats`, `text_responses`,
+`compute_kpis`) reciben el mismo filtro canónico que `data_utils.filter_df` y
+devuelven DataFrames idénticos a los de `data_utils`: la agregación corre en
+SQL y solo el formateo final (porcentajes, redondeo, orden) se hace en pandas
+sobre el resultado chico. `read_frame` reconstruye la tabla completa con sus
+tipos.
+
+Se activa con `SURVEY_BACKEND=sqlite` (ver storage.py): el DataFrame cargado
+queda asociado a su base y `data_utils` la consulta en lugar de agregar en memoria.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import indexes
+import patterns
+from constants import Q_USO_IMPACTO, SOURCE_COLUMN
+
+# Incrementar cuando cambie el esquema de la base para regenerarla
+SQL_SCHEMA_VERSION = 1
+
+TABLE = "respuestas"
+
+# Filas por lote al insertar
+INSERT_BATCH_ROWS = 50_000
+
+# Índices de la tabla de respuestas (nombre -> columnas)
+SQL_INDEXES = {
+    'ix_pregunta_valor': ["Atributo", "Valor"],
+    'ix_encuestado': ["Correo electrónico"],
+    'ix_nombre': ["Nombre"],
+    'ix_inicio': ["Hora de inicio"],
+    'ix_fuente': [SOURCE_COLUMN],
+}
+
+# Columnas de las respuestas de texto libre (mismo orden que data_utils.get_text_responses)
+TEXT_COLUMNS = ['Correo electrónico', 'Nombre', 'Hora de inicio', 'Valor']
+
+_NAT = np.iinfo(np.int64).min
+
+# nombre -> función(con, where, params)
+SQL_KPIS: Dict[str, Callable] = {}
+
+
+def register_sql_kpi(name: str, compute: Callable) -> None:
+    """
+    Registra la implementación SQL de un KPI de `data_utils.KPI_REGISTRY`.
+    """
+    SQL_KPIS[name] = compute
+
+
+def _quote(nombre: str) -> str:
+    """
+    Identificador SQL entre comillas.
+    """
+    return '"' + nombre.replace('"', '""') + '"'
+
+
+def _column_kind(values: pd.Series) -> Dict:
+    """
+    Cómo se guarda una columna y cómo se recupera su tipo.
+    """
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return {'kind': 'category', 'dtype': str(dtype.categories.dtype), 'ordered': bool(dtype.ordered)}
+    if pd.api.types.is_datetime64_dtype(dtype):
+        return {'kind': 'datetime', 'dtype': str(dtype)}
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_integer_dtype(dtype):
+        return {'kind': 'nullable', 'dtype': str(dtype)}
+    if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return {'kind': 'numpy', 'dtype': str(dtype)}
+    return {'kind': 'object', 'dtype': str(dtype)}
+
+
+def _to_sql_values(values: pd.Series, spec: Dict) -> list:
+    """
+    Valores de una columna como objetos de Python (None = faltante).
+    """
+    kind = spec['kind']
+    if kind == 'category':
+        codes = values.cat.codes.to_numpy().astype(np.int64)
+        salida = codes.tolist()
+        faltantes = np.flatnonzero(codes < 0)
+    elif kind == 'datetime':
+        ns = values.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        salida = ns.tolist()
+        faltantes = np.flatnonzero(ns == _NAT)
+    elif kind == 'nullable':
+        faltantes = np.flatnonzero(values.isna().to_numpy())
+        salida = values.fillna(0).to_numpy(dtype=np.int64).tolist()
+    elif kind == 'numpy':
+        salida = values.to_numpy().tolist()
+        faltantes = np.flatnonzero(values.isna().to_numpy())
+    else:
+        return values.astype(object).where(values.notna(), None).tolist()
+    for i in faltantes:
+        salida[i] = None
+    return salida
+
+
+def _from_sql_values(valores: list, spec: Dict, categorias: Optional[List[str]] = None) -> pd.api.extensions.ExtensionArray:
+    """
+    Reconstruye una columna con su tipo original a partir de los valores leídos.
+    """
+    kind = spec['kind']
+    if kind == 'category':
+        codes = np.array([-1 if v is None else v for v in valores], dtype=np.int64)
+        return pd.Categorical.from_codes(
+            codes, categories=pd.Index(categorias, dtype=spec['dtype']), ordered=spec['ordered']
+        )
+    if kind == 'datetime':
+        ns = np.array([_NAT if v is None else v for v in valores], dtype=np.int64)
+        return ns.view('datetime64[ns]').astype(spec['dtype'])
+    if kind == 'nullable':
+        return pd.array(valores, dtype=spec['dtype'])
+    if kind == 'numpy':
+        return np.array([np.nan if v is None else v for v in valores]).astype(spec['dtype'])
+    return pd.array(valores, dtype=spec['dtype'])
+
+
+def patterns_fingerprint() -> str:
+    """
+    Huella de los conjuntos de patrones registrados (cambia si se edita o agrega alguno).
+    """
+    definiciones = sorted((name, entry['regex'].pattern) for name, entry in patterns.PATTERN_SETS.items())
+    texto = json.dumps(definiciones, ensure_ascii=False)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def database_key() -> str:
+    """
+    Parte del nombre de la base que depende del esquema y de los patrones.
+    """
+    return f"v{SQL_SCHEMA_VERSION}-{patterns_fingerprint()[:12]}"
+
+
+def _create_schema(con: sqlite3.Connection, df: pd.DataFrame, specs: Dict[str, Dict]) -> None:
+    """
+    Crea las tablas, guarda los metadatos y las tablas auxiliares de cada valor distinto.
+    """
+    tipos = {'category': 'INTEGER', 'datetime': 'INTEGER', 'nullable': 'INTEGER',
+             'numpy': 'NUMERIC', 'object': 'TEXT'}
+    columnas = ", ".join(f"{_quote(col)} {tipos[spec['kind']]}" for col, spec in specs.items())
+    con.execute(f"CREATE TABLE {TABLE} (fila INTEGER PRIMARY KEY, etiqueta INTEGER, {columnas})")
+    con.execute("CREATE TABLE meta (clave TEXT PRIMARY KEY, valor TEXT)")
+    con.execute("CREATE TABLE categorias (columna TEXT, codigo INTEGER, texto TEXT, "
+                "PRIMARY KEY (columna, codigo))")
+    con.execute("CREATE TABLE nombres (codigo INTEGER PRIMARY KEY, normalizado TEXT)")
+    con.execute("CREATE TABLE correos (codigo INTEGER PRIMARY KEY, dominio TEXT)")
+    con.execute("CREATE TABLE valores (codigo INTEGER PRIMARY KEY, vacio INTEGER)")
+    con.execute("CREATE TABLE coincidencias (patron TEXT, valor INTEGER, PRIMARY KEY (patron, valor))")
+
+    con.executemany("INSERT INTO meta VALUES (?, ?)", [
+        ('version', str(SQL_SCHEMA_VERSION)),
+        ('patrones', patterns_fingerprint()),
+        ('columnas', json.dumps(specs, ensure_ascii=False)),
+        ('filas', str(len(df))),
+    ])
+    for col, spec in specs.items():
+        if spec['kind'] == 'category':
+            con.executemany("INSERT INTO categorias VALUES (?, ?, ?)", [
+                (col, i, texto) for i, texto in enumerate(df[col].cat.categories.tolist())
+            ])
+
+    if 'Nombre' in specs:
+        con.executemany("INSERT INTO nombres VALUES (?, ?)", [
+            (i, indexes.normalize_name(v)) for i, v in enumerate(df['Nombre'].cat.categories)
+        ])
+    if 'Correo electrónico' in specs:
+        con.executemany("INSERT INTO correos VALUES (?, ?)", [
+            (i, indexes.email_domain(v)) for i, v in enumerate(df['Correo electrónico'].cat.categories)
+        ])
+    if 'Valor' in specs:
+        categorias = pd.Series(df['Valor'].cat.categories)
+        con.executemany("INSERT INTO valores VALUES (?, ?)", [
+            (i, int(isinstance(v, str) and v.strip() == '')) for i, v in enumerate(categorias)
+        ])
+        for patron in patterns.PATTERN_SETS:
+            coincide = np.flatnonzero(patterns.matches(categorias, patron))
+            con.executemany("INSERT INTO coincidencias VALUES (?, ?)",
+                            [(patron, int(i)) for i in coincide])
+
+
+def write_database(df: pd.DataFrame, path: str) -> None:
+    """
+    Guarda la tabla larga procesada (compacta) en una base SQLite nueva en `path`.
+
+    Si el archivo existe se reemplaza; para publicarla sin que otro lector vea una
+    base a medias, escribirla en un temporal (ver `storage.attach_database`).
+    """
+    specs = {col: _column_kind(df[col]) for col in df.columns}
+    if os.path.exists(path):
+        os.remove(path)
+    con = sqlite3.connect(path)
+    try:
+        con.execute("PRAGMA journal_mode = OFF")
+        con.execute("PRAGMA synchronous = OFF")
+        _create_schema(con, df, specs)
+
+        marcadores = ", ".join("?" * (len(specs) + 2))
+        etiquetas = df.index.to_numpy(dtype=np.int64)
+        for inicio in range(0, len(df), INSERT_BATCH_ROWS):
+            bloque = df.iloc[inicio:inicio + INSERT_BATCH_ROWS]
+            columnas = [range(inicio, inicio + len(bloque)),
+                        etiquetas[inicio:inicio + INSERT_BATCH_ROWS].tolist()]
+            columnas += [_to_sql_values(bloque[col], spec) for col, spec in specs.items()]
+            con.executemany(f"INSERT INTO {TABLE} VALUES ({marcadores})", zip(*columnas))
+
+        for nombre, columnas in SQL_INDEXES.items():
+            if all(col in specs for col in columnas):
+                con.execute(f"CREATE INDEX {nombre} ON {TABLE} "
+                            f"({', '.join(_quote(c) for c in columnas)})")
+        con.execute("ANALYZE")
+        con.commit()
+    finally:
+        con.close()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    """
+    Conexión de solo lectura a una base existente.
+    """
+    return sqlite3.connect(f"{Path(path).absolute().as_uri()}?mode=ro", uri=True)
+
+
+@lru_cache(maxsize=32)
+def _metadata(path: str, mtime_ns: int) -> Tuple[Dict[str, str], Dict[str, Dict], Dict[str, List[str]]]:
+    """
+    Metadatos, especificación de columnas y categorías de una base (cacheados por archivo y mtime).
+    """
+    with _connect(path) as con:
+        meta = dict(con.execute("SELECT clave, valor FROM meta").fetchall())
+        categorias: Dict[str, List[str]] = {}
+        for columna, texto in con.execute(
+                "SELECT columna, texto FROM categorias ORDER BY columna, codigo"):
+            categorias.setdefault(columna, []).append(texto)
+    return meta, json.loads(meta['columnas']), categorias
+
+
+def metadata(path: str) -> Tuple[Dict[str, Dict], Dict[str, List[str]]]:
+    """
+    (especificación de columnas, categorías por columna) de una base.
+    """
+    return _metadata(path, os.stat(path).st_mtime_ns)[1:]
+
+
+def is_current(path: str) -> bool:
+    """
+    Indica si la base existe, es de esta versión de esquema y sus coincidencias
+    corresponden a los patrones registrados ahora.
+    """
+    try:
+        meta = _metadata(path, os.stat(path).st_mtime_ns)[0]
+    except (OSError, sqlite3.Error, KeyError, TypeError, ValueError):
+        return False
+    return (meta.get('version') == str(SQL_SCHEMA_VERSION)
+            and meta.get('patrones') == patterns_fingerprint())
+
+
+def _frame(path: str, filas: List[tuple], columnas: List[str]) -> pd.DataFrame:
+    """
+    DataFrame con los tipos originales a partir de filas (etiqueta, columnas...).
+    """
+    specs, categorias = metadata(path)
+    valores = list(zip(*filas)) if filas else [()] * (len(columnas) + 1)
+    datos = {
+        col: _from_sql_values(list(valores[i + 1]), specs[col], categorias.get(col, []))
+        for i, col in enumerate(columnas)
+    }
+    return pd.DataFrame(datos, index=pd.Index(np.array(valores[0], dtype=np.int64)))
+
+
+def read_frame(path: str) -> pd.DataFrame:
+    """
+    Reconstruye la tabla completa guardada en la base.
+    """
+    specs, _ = metadata(path)
+    columnas = list(specs)
+    with _connect(path) as con:
+        filas = con.execute(
+            f"SELECT etiqueta, {', '.join(_quote(c) for c in columnas)} FROM {TABLE} ORDER BY fila"
+        ).fetchall()
+    df = _frame(path, filas, columnas)
+    if len(df) and (df.index.to_numpy() == np.arange(len(df))).all():
+        df.index = pd.RangeIndex(len(df))
+    return df
+
+
+def _bounds_ns(fecha_desde: Optional[str], fecha_hasta: Optional[str]) -> Tuple[Optional[int], Optional[int], bool]:
+    """
+    Límites del filtro de fechas en ns: (desde, hasta, hasta_exclusivo).
+
+    Igual que `indexes.date_mask`: una fecha sin hora en `hasta` incluye el día completo.
+    """
+    desde = pd.Timestamp(fecha_desde).as_unit('ns').value if fecha_desde else None
+    if not fecha_hasta:
+        return desde, None, False
+    if len(fecha_hasta) == 10:
+        return desde, (pd.Timestamp(fecha_hasta) + timedelta(days=1)).as_unit('ns').value, True
+    return desde, pd.Timestamp(fecha_hasta).as_unit('ns').value, False
+
+
+def _where(path: str, filtro: Optional[Dict]) -> Tuple[str, list]:
+    """
+    Condiciones SQL (con AND inicial) de un filtro canónico de `data_utils.filter_df`.
+    """
+    if not filtro:
+        return "", []
+    specs, _ = metadata(path)
+    condiciones, params = [], []
+
+    def en(columna: str, subconsulta: str, valores: List[str]):
+        marcadores = ", ".join("?" * len(valores))
+        condiciones.append(f"{_quote(columna)} IN ({subconsulta} ({marcadores}))")
+        params.extend(valores)
+
+    if filtro.get('personas'):
+        en('Nombre', "SELECT codigo FROM nombres WHERE normalizado IN", filtro['personas'])
+    desde, hasta, exclusivo = _bounds_ns(filtro.get('fecha_desde'), filtro.get('fecha_hasta'))
+    if desde is not None:
+        condiciones.append('"Hora de inicio" >= ?')
+        params.append(desde)
+    if hasta is not None:
+        condiciones.append(f'"Hora de inicio" {"<" if exclusivo else "<="} ?')
+        params.append(hasta)
+    if filtro.get('dominios'):
+        en('Correo electrónico', "SELECT codigo FROM correos WHERE dominio IN", filtro['dominios'])
+    if filtro.get('fuentes'):
+        if SOURCE_COLUMN not in specs:
+            condiciones.append("0")
+        else:
+            en(SOURCE_COLUMN, "SELECT codigo FROM categorias WHERE columna = "
+                              f"'{SOURCE_COLUMN}' AND texto IN", filtro['fuentes'])
+    return "".join(f" AND {c}" for c in condiciones), params
+
+
+def _codes_of(path: str, columna: str, textos: List[str]) -> List[int]:
+    """
+    Códigos de los textos de una columna categórica (los que no existen se omiten).
+    """
+    _, categorias = metadata(path)
+    posicion = {texto: i for i, texto in enumerate(categorias.get(columna, []))}
+    return [posicion[t] for t in textos if t in posicion]
+
+
+def _total_users(con: sqlite3.Connection, where: str, params: list) -> int:
+    """
+    Encuestados distintos (correos no nulos) del filtro.
+    """
+    return con.execute(
+        f'SELECT COUNT(DISTINCT "Correo electrónico") FROM {TABLE} WHERE 1{where}', params
+    ).fetchone()[0]
+
+
+def choice_stats(path: str, filtro: Optional[Dict], atributo: str) -> pd.DataFrame:
+    """
+    Equivale a `get_actividades_stats` / `get_modos_stats` para la pregunta `atributo`.
+    """
+    codigo = _codes_of(path, 'Atributo', [atributo])
+    if not codigo:
+        return pd.DataFrame()
+    where, params = _where(path, filtro)
+    with _connect(path) as con:
+        if con.execute(f'SELECT EXISTS (SELECT 1 FROM {TABLE} WHERE "Atributo" = ?{where})',
+                       [codigo[0]] + params).fetchone()[0] == 0:
+            return pd.DataFrame()
+        grupos = con.execute(
+            f'SELECT "Valor", COUNT(DISTINCT "Correo electrónico") FROM {TABLE} '
+            f'WHERE "Atributo" = ? AND "Valor" IS NOT NULL{where} GROUP BY "Valor" ORDER BY "Valor"',
+            [codigo[0]] + params
+        ).fetchall()
+        total_encuestados = _total_users(con, where, params)
+
+    specs, categorias = metadata(path)
+    valores = [categorias['Valor'][c] for c, _ in grupos]
+    stats = pd.DataFrame(
+        {'usuarios': np.array([n for _, n in grupos], dtype=np.int64)},
+        index=pd.Index(valores, dtype=specs['Valor']['dtype'], name='Valor')
+    )
+
+    stats['porcentaje'] = (stats['usuarios'] / total_encuestados * 100).round(1)
+    stats = stats.sort_values('porcentaje', ascending=False)
+
+    return stats
+
+
+def likert_stats(path: str, filtro: Optional[Dict], prefix: str) -> pd.DataFrame:
+    """
+    Equivale a `get_likert_stats` para las preguntas que empiezan con `prefix`.
+    """
+    specs, categorias = metadata(path)
+    codigos = [i for i, texto in enumerate(categorias.get('Atributo', [])) if texto.startswith(prefix)]
+    if not codigos:
+        return pd.DataFrame()
+    where, params = _where(path, filtro)
+    with _connect(path) as con:
+        grupos = con.execute(
+            f'SELECT "Atributo", COUNT(*), SUM("Likert_Score"), SUM("Likert_Score" IN (1, 2)) '
+            f'FROM {TABLE} WHERE "Atributo" IN ({", ".join("?" * len(codigos))}) '
+            f'AND "Likert_Score" IS NOT NULL{where} GROUP BY "Atributo" ORDER BY "Atributo"',
+            codigos + params
+        ).fetchall()
+    if not grupos:
+        return pd.DataFrame()
+
+    index = pd.Index([categorias['Atributo'][c] for c, *_ in grupos],
+                     dtype=specs['Atributo']['dtype'], name='Atributo')
+    total = np.array([n for _, n, _, _ in grupos], dtype=np.int64)
+    suma = np.array([s for _, _, s, _ in grupos], dtype=np.float64)
+
+    stats = pd.DataFrame({'promedio': suma / total, 'total_respuestas': total}, index=index).round(2)
+
+    # Calcular % de acuerdo (scores 1 y 2)
+    acuerdo = np.array([a for *_, a in grupos], dtype=np.int64)
+    acuerdo_stats = pd.Series(acuerdo[acuerdo > 0], index=index[acuerdo > 0])
+
+    stats['respuestas_acuerdo'] = stats.index.map(acuerdo_stats).fillna(0)
+    stats['pct_acuerdo'] = (stats['respuestas_acuerdo'] / stats['total_respuestas'] * 100).round(1)
+
+    return stats
+
+
+def text_responses(path: str, filtro: Optional[Dict], atributo: str) -> pd.DataFrame:
+    """
+    Equivale a `get_text_responses`: respuestas no vacías, las más recientes primero.
+    """
+    codigo = _codes_of(path, 'Atributo', [atributo])
+    filas = []
+    if codigo:
+        where, params = _where(path, filtro)
+        with _connect(path) as con:
+            filas = con.execute(
+                f'SELECT etiqueta, {", ".join(_quote(c) for c in TEXT_COLUMNS)} FROM {TABLE} '
+                f'WHERE "Atributo" = ? AND "Valor" IS NOT NULL '
+                f'AND "Valor" NOT IN (SELECT codigo FROM valores WHERE vacio){where} ORDER BY fila',
+                [codigo[0]] + params
+            ).fetchall()
+    responses = _frame(path, filas, TEXT_COLUMNS)
+
+    responses = responses.sort_values('Hora de inicio', ascending=False)
+
+    return responses
+
+
+def compute_kpis(path: str, filtro: Optional[Dict] = None) -> Dict:
+    """
+    Equivale a `data_utils.compute_kpis` con los KPIs registrados en SQL_KPIS.
+    """
+    where, params = _where(path, filtro)
+    with _connect(path) as con:
+        return {name: compute(con, path, where, params) for name, compute in SQL_KPIS.items()}
+
+
+def _sql_encuestados(con: sqlite3.Connection, path: str, where: str, params: list) -> int:
+    """
+    Encuestados únicos (correos no nulos).
+    """
+    return int(_total_users(con, where, params))
+
+
+def _sql_nps(con: sqlite3.Connection, path: str, where: str, params: list) -> float:
+    """
+    NPS = % promotores - % detractores sobre las respuestas NPS.
+    """
+    promotor = _codes_of(path, 'NPS_Class', ['Promotor']) or [-1]
+    detractor = _codes_of(path, 'NPS_Class', ['Detractor']) or [-1]
+    total_nps, promotores, detractores = (np.int64(v or 0) for v in con.execute(
+        f'SELECT COUNT("NPS_Class"), SUM("NPS_Class" = ?), SUM("NPS_Class" = ?) '
+        f'FROM {TABLE} WHERE 1{where}', promotor + detractor + params
+    ).fetchone())
+    if total_nps == 0:
+        return 0
+    return promotores / total_nps * 100 - detractores / total_nps * 100
+
+
+def _sql_ahorro_tiempo(con: sqlite3.Connection, path: str, where: str, params: list) -> float:
+    """
+    % de personas que respondieron la pregunta de impacto y mencionan ahorro de tiempo.
+    """
+    codigo = _codes_of(path, 'Atributo', [Q_USO_IMPACTO]) or [-1]
+    total_personas, personas_ahorro = (np.int64(v or 0) for v in con.execute(
+        f'SELECT COUNT(DISTINCT "Correo electrónico"), COUNT(DISTINCT CASE WHEN "Valor" IN '
+        f"(SELECT valor FROM coincidencias WHERE patron = 'ahorro_tiempo') "
+        f'THEN "Correo electrónico" END) FROM {TABLE} WHERE "Atributo" = ?{where}',
+        codigo + params
+    ).fetchone())
+    if total_personas == 0:
+        return 0
+    return personas_ahorro / total_personas * 100
+
+
+register_sql_kpi('encuestados', _sql_encuestados)
+register_sql_kpi('nps', _sql_nps)
+register_sql_kpi('percibe_ahorro_tiempo', _sql_ahorro_tiempo)
+
+
+def attach(df: pd.DataFrame, path: str) -> None:
+    """
+    Asocia una base al DataFrame: `data_utils` la consultará para él y sus filtros.
+    """
+    indexes.attach(df, 'sql', path)
+
+
+def lookup(df: pd.DataFrame) -> Optional[Tuple[str, Optional[Dict]]]:
+    """
+    Base aplicable a `df`: (ruta, filtro canónico) o None.
+
+    Sirve para el DataFrame asociado (filtro None) y para los subconjuntos que
+    `filter_df` derivó directamente de él. Si la base quedó vencida (p. ej. se
+    registró otro conjunto de patrones) devuelve None y se calcula en memoria.
+    """
+    path = indexes.attached(df, 'sql')
+    filtro = None
+    if path is None:
+        origen = indexes.parent_of(df)
+        if origen is None:
+            return None
+        path = indexes.attached(origen[0], 'sql')
+        filtro = indexes.attached(df, 'filtro')
+        if path is None or filtro is None:
+            return None
+    if not is_current(path):
+        return None
+    return path, filtro
@@ -0,0 +1,567 @@
+"""
+Persistencia del dataset procesado en snapshots columnares (Parquet).
+
+Junto a cada snapshot se guarda el índice invertido de las respuestas de texto
+libre (ver textindex.py).
+
+Con `SURVEY_BACKEND=sqlite` el dataset cargado también se guarda en una base
+SQLite en el cache y las estadísticas se consultan ahí (ver sqlstore.py).
+
+Una fuente puede ser un archivo, un directorio o un patrón glob con varias
+encuestas (una por unidad de negocio): cada archivo se carga en un pool de
+procesos con su propio snapshot y los resultados se concatenan con la columna
+`Fuente` (ver `load_sources`).
+"""
+
+import glob
+import hashlib
+import json
+import os
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import data_utils
+import indexes
+import perf
+import sqlstore
+import textindex
+from constants import CATEGORICAL_COLUMNS, REQUIRED_COLUMNS, SOURCE_COLUMN
+
+# Incrementar cuando cambie la salida de `process_dataframe` para invalidar snapshots
+SNAPSHOT_SCHEMA_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.environ.get("SURVEY_CACHE_DIR", ".cache")
+
+# Fuente por defecto del dashboard: un archivo, un directorio o un patrón glob
+DEFAULT_SOURCE = os.environ.get("SURVEY_SOURCE", "Encuesta de adopción de GitHub Copilot tabla.xlsx")
+
+# Archivos que se toman de un directorio fuente
+SOURCE_PATTERNS = ("*.xlsx", "*.csv")
+
+# Backend de las consultas de estadísticas: "pandas" (en memoria) o "sqlite" (ver sqlstore.py)
+QUERY_BACKEND = os.environ.get("SURVEY_BACKEND", "pandas")
+
+# Filas crudas por chunk en la ingesta streaming
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Fuentes más grandes que esto se procesan por chunks en lugar de en memoria
+STREAMING_THRESHOLD_BYTES = 20 * 1024 * 1024
+
+
+def file_sha256(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Calcula el hash SHA-256 del contenido de un archivo.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _manifest_path(file_path: str, cache_dir: str) -> str:
+    """
+    Ruta del manifiesto que asocia un archivo fuente con su último snapshot.
+    """
+    source_key = hashlib.sha256(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"manifest-{source_key}.json")
+
+
+def _snapshot_path(digest: str, cache_dir: str) -> str:
+    """
+    Ruta del snapshot para un contenido y versión de esquema dados.
+    """
+    return os.path.join(cache_dir, f"survey-{digest[:24]}-v{SNAPSHOT_SCHEMA_VERSION}.parquet")
+
+
+def _text_index_path(snapshot: str) -> str:
+    """
+    Ruta del índice de texto guardado junto a un snapshot.
+    """
+    return snapshot[:-len(".parquet")] + ".textindex.npz"
+
+
+def attach_text_index(df: pd.DataFrame, snapshot: str) -> None:
+    """
+    Asocia al DataFrame el índice de texto guardado junto al snapshot.
+
+    Si no existe (o es de otra versión) se construye y se guarda.
+    """
+    path = _text_index_path(snapshot)
+    index = None
+    try:
+        index = textindex.load_text_index(path, len(df))
+    except Exception as e:
+        warnings.warn(f"Índice de texto ilegible, se regenera: {e}")
+    
+    if index is None:
+        index = textindex.build_text_index(df)
+        try:
+            write_atomic(path, lambda tmp: textindex.save_text_index(index, tmp))
+        except Exception as e:
+            warnings.warn(f"No se pudo guardar el índice de texto: {e}")
+    indexes.attach(df, 'texto', index)
+
+
+def _database_path(paths: List[str], nombres: List[str], cache_dir: str) -> Optional[str]:
+    """
+    Ruta de la base SQLite de una fuente (según el contenido de sus archivos, el
+    esquema de la base y los patrones con que se precalculan las coincidencias).
+
+    None si falta el manifiesto de algún archivo (no se pudo escribir el cache).
+    """
+    digest = hashlib.sha256()
+    for nombre, path in zip(nombres, paths):
+        manifest = _read_manifest(_manifest_path(path, cache_dir))
+        if not manifest or manifest.get("schema_version") != SNAPSHOT_SCHEMA_VERSION:
+            return None
+        digest.update(f"{nombre}\0{manifest['sha256']}\n".encode("utf-8"))
+    return os.path.join(
+        cache_dir,
+        f"survey-{digest.hexdigest()[:24]}-v{SNAPSHOT_SCHEMA_VERSION}-{sqlstore.database_key()}.sqlite"
+    )
+
+
+def attach_database(df: pd.DataFrame, path: Optional[str]) -> None:
+    """
+    Asocia al DataFrame su base SQLite; si no existe (o está vencida) la crea.
+
+    Si no se puede crear, las estadísticas se siguen calculando en memoria.
+    """
+    if path is None:
+        warnings.warn("Sin manifiesto de la fuente: se usa el backend en memoria")
+        return
+    try:
+        if not sqlstore.is_current(path):
+            write_atomic(path, lambda tmp: sqlstore.write_database(df, tmp))
+        sqlstore.attach(df, path)
+    except Exception as e:
+        warnings.warn(f"No se pudo crear la base SQLite, se usa el backend en memoria: {e}")
+
+
+def _read_manifest(path: str) -> Optional[Dict]:
+    """
+    Lee el manifiesto; devuelve None si no existe o está corrupto.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_atomic(path: str, write_func) -> None:
+    """
+    Escribe en un archivo temporal y lo renombra para no dejar archivos a medias.
+    """
+    # Único por proceso e hilo: las sesiones de Streamlit son hilos del mismo proceso
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        write_func(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_snapshot(df: pd.DataFrame, path: str) -> None:
+    """
+    Guarda el DataFrame procesado como Parquet.
+    """
+    write_atomic(path, lambda tmp: df.to_parquet(tmp, index=False))
+
+
+@perf.timed
+def read_snapshot(path: str) -> pd.DataFrame:
+    """
+    Lee un snapshot Parquet en su representación compacta.
+    """
+    return data_utils.compact_dataframe(pd.read_parquet(path))
+
+
+@perf.timed
+def load_processed(file_path: str, cache_dir: str = DEFAULT_CACHE_DIR,
+                   incremental: bool = True) -> pd.DataFrame:
+    """
+    Devuelve el dataset procesado usando el snapshot en disco si la fuente no cambió.
+
+    Primero compara tamaño y mtime con el manifiesto; si difieren, compara el hash del
+    contenido. Solo cuando el contenido es nuevo se vuelve a parsear el Excel; con
+    `incremental=True` y un snapshot previo solo se procesan las respuestas nuevas o
+    editadas (ver `update_incremental`).
+    """
+    stat = os.stat(file_path)
+    manifest_path = _manifest_path(file_path, cache_dir)
+    manifest = _read_manifest(manifest_path)
+    
+    # Camino rápido: mismo tamaño, mtime y versión de esquema
+    if (manifest
+            and manifest.get("schema_version") == SNAPSHOT_SCHEMA_VERSION
+            and manifest.get("size") == stat.st_size
+            and manifest.get("mtime_ns") == stat.st_mtime_ns):
+        snapshot = _snapshot_path(manifest["sha256"], cache_dir)
+        if os.path.exists(snapshot):
+            try:
+                df = read_snapshot(snapshot)
+                attach_text_index(df, snapshot)
+                return df
+            except Exception as e:
+                warnings.warn(f"Snapshot ilegible, se regenera: {e}")
+    
+    digest = file_sha256(file_path)
+    snapshot = _snapshot_path(digest, cache_dir)
+    df = None
+    if os.path.exists(snapshot):
+        try:
+            df = read_snapshot(snapshot)
+        except Exception as e:
+            warnings.warn(f"Snapshot ilegible, se regenera: {e}")
+    
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError as e:
+        warnings.warn(f"No se pudo crear el directorio de cache: {e}")
+    
+    if df is None and incremental and _can_update(manifest, cache_dir):
+        try:
+            previous = read_snapshot(_snapshot_path(manifest["sha256"], cache_dir))
+            df = update_incremental(file_path, previous, manifest["watermark"])
+        except Exception as e:
+            warnings.warn(f"Actualización incremental fallida, se reprocesa todo: {e}")
+    
+    if df is None and _use_streaming(file_path, stat.st_size):
+        try:
+            stream_to_snapshot(file_path, snapshot)
+            df = read_snapshot(snapshot)
+        except Exception as e:
+            warnings.warn(f"Ingesta streaming no disponible, se carga en memoria: {e}")
+    
+    if df is None:
+        df = _load_in_memory(file_path)
+    
+    try:
+        if not os.path.exists(snapshot):
+            write_snapshot(df, snapshot)
+        attach_text_index(df, snapshot)
+        new_manifest = {
+            "source": os.path.abspath(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+            "schema_version": SNAPSHOT_SCHEMA_VERSION,
+            "watermark": compute_watermark(df),
+        }
+        write_atomic(manifest_path, lambda tmp: _dump_json(new_manifest, tmp))
+    except Exception as e:
+        # El cache es una optimización: si no se puede escribir seguimos sin él
+        warnings.warn(f"No se pudo guardar el snapshot procesado: {e}")
+    
+    return df
+
+
+def _dump_json(data: Dict, path: str) -> None:
+    """
+    Serializa un diccionario a JSON.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _load_in_memory(file_path: str) -> pd.DataFrame:
+    """
+    Carga y procesa la fuente completa en memoria.
+    """
+    if _is_csv(file_path):
+        return data_utils.process_dataframe(pd.read_csv(file_path))
+    return data_utils.load_data(file_path)
+
+
+def _use_streaming(file_path: str, size: int) -> bool:
+    """
+    Decide si la fuente se ingiere por chunks (CSV o archivos grandes).
+    """
+    return _is_csv(file_path) or size > STREAMING_THRESHOLD_BYTES
+
+
+def _is_csv(file_path: str) -> bool:
+    """
+    Indica si la fuente es un CSV (según su extensión).
+    """
+    return os.path.splitext(file_path)[1].lower() == ".csv"
+
+
+def iter_raw_chunks(file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Recorre la hoja cruda (xlsx o CSV) en bloques de `chunk_size` filas.
+    """
+    if _is_csv(file_path):
+        yield from pd.read_csv(file_path, chunksize=chunk_size)
+        return
+    
+    with pd.ExcelFile(file_path, engine="openpyxl") as excel_file:
+        sheet_name = data_utils.find_valid_sheet(excel_file)
+        if not isinstance(sheet_name, str):
+            sheet_name = excel_file.sheet_names[sheet_name]
+        rows = excel_file.book[sheet_name].iter_rows(values_only=True)
+        
+        header = next(rows, None)
+        if header is None:
+            return
+        
+        buffer = []
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) >= chunk_size:
+                yield _rows_to_frame(buffer, header)
+                buffer = []
+        if buffer:
+            yield _rows_to_frame(buffer, header)
+
+
+def _rows_to_frame(rows, header) -> pd.DataFrame:
+    """
+    Arma un DataFrame con celdas vacías como NaN, igual que `read_excel`.
+    """
+    df = pd.DataFrame.from_records(rows, columns=list(header))
+    df = df.loc[:, df.columns.notna()]
+    return df.dropna(how="all")
+
+
+def _stream_schema():
+    """
+    Esquema Parquet fijo de la tabla compacta para la ingesta por chunks.
+
+    No se infiere de un chunk: una columna toda nula o con otro tipo inferido en
+    el primer chunk haría fallar la escritura de los siguientes. Los metadatos de
+    pandas (Int64, Int8, categorías) salen de una tabla vacía con los tipos finales.
+    """
+    import pyarrow as pa
+    
+    tipos = {
+        "Id": "Int64",
+        "Hora de inicio": "datetime64[us]",
+        "Hora de finalización": "datetime64[us]",
+        "Likert_Score": "Int8",
+        "Pregunta_Id": "int8",
+    }
+    columnas = REQUIRED_COLUMNS + ["Likert_Score", "NPS_Class", "Pregunta_Id"]
+    plantilla = pd.DataFrame({
+        col: pd.Series(dtype=pd.CategoricalDtype(pd.Index([], dtype=str))
+                       if col in CATEGORICAL_COLUMNS else tipos[col])
+        for col in columnas
+    })
+    schema = pa.Schema.from_pandas(plantilla, preserve_index=False)
+    # Índices de 32 bits: cada chunk puede tener muchas más categorías que la plantilla
+    for i, field in enumerate(schema):
+        if pa.types.is_dictionary(field.type):
+            schema = schema.set(i, field.with_type(pa.dictionary(pa.int32(), pa.large_string())))
+    return schema
+
+
+def stream_to_snapshot(file_path: str, dest_path: str,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Limpia, explota y mapea la fuente por chunks y los agrega a un Parquet.
+
+    La memoria pico depende del tamaño del chunk, no del de la fuente.
+    Devuelve la cantidad de filas procesadas escritas.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    tmp_path = f"{dest_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    schema = _stream_schema()
+    writer = pq.ParquetWriter(tmp_path, schema)
+    written = 0
+    try:
+        for raw_chunk in iter_raw_chunks(file_path, chunk_size):
+            # Cada chunk trae sus propias categorías (diccionario por row group);
+            # se unifican al leer el snapshot
+            chunk = data_utils.process_dataframe(raw_chunk)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            written += len(chunk)
+        
+        writer.close()
+        writer = None
+        os.replace(tmp_path, dest_path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    
+    return written
+
+
+def _can_update(manifest: Optional[Dict], cache_dir: str) -> bool:
+    """
+    Indica si hay un snapshot previo compatible desde el cual actualizar.
+    """
+    return bool(
+        manifest
+        and manifest.get("schema_version") == SNAPSHOT_SCHEMA_VERSION
+        and manifest.get("watermark")
+        and os.path.exists(_snapshot_path(manifest["sha256"], cache_dir))
+    )
+
+
+def compute_watermark(df: pd.DataFrame) -> Dict:
+    """
+    Marca de agua del dataset: mayor Id procesado y 'Hora de finalización' por Id.
+    """
+    ids = df["Id"].dropna()
+    finalizacion = df.loc[df["Id"].notna()].groupby("Id", sort=False)["Hora de finalización"].max()
+    return {
+        "max_id": int(ids.max()) if len(ids) > 0 else None,
+        "finalizacion": {
+            str(int(id_)): (fin.isoformat() if pd.notna(fin) else None)
+            for id_, fin in finalizacion.items()
+        },
+    }
+
+
+def update_incremental(file_path: str, previous: pd.DataFrame, watermark: Dict,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Actualiza un dataset procesado procesando solo las respuestas nuevas o editadas.
+
+    Una fila cruda se reprocesa si su Id supera `max_id`, si no se conocía, si su
+    'Hora de finalización' cambió (edición tardía) o si no tiene Id. Las respuestas
+    editadas o eliminadas de la fuente se quitan del dataset previo. El resultado
+    queda ordenado por Id.
+    """
+    max_id = watermark.get("max_id")
+    conocidos = {
+        int(id_): pd.Timestamp(fin) if fin is not None else pd.NaT
+        for id_, fin in watermark.get("finalizacion", {}).items()
+    }
+    
+    vistos = set()
+    reprocesar = set()
+    nuevas = []
+    for raw_chunk in iter_raw_chunks(file_path, chunk_size):
+        ids = pd.to_numeric(raw_chunk["Id"], errors="coerce")
+        fin = pd.to_datetime(raw_chunk["Hora de finalización"], dayfirst=True, errors="coerce")
+        
+        previa = ids.map(conocidos)
+        editada = ~((previa == fin) | (previa.isna() & fin.isna()))
+        seleccion = ids.isna() | ~ids.isin(conocidos.keys()) | editada
+        if max_id is not None:
+            seleccion |= ids > max_id
+        
+        vistos.update(ids.dropna().astype(int).tolist())
+        reprocesar.update(ids[seleccion & ids.notna()].astype(int).tolist())
+        if seleccion.any():
+            nuevas.append(raw_chunk[seleccion.to_numpy()])
+    
+    # Se descartan del dataset previo las respuestas editadas, eliminadas o sin Id
+    descartar = reprocesar | (set(conocidos) - vistos)
+    conservar = previous["Id"].notna() & ~previous["Id"].isin(descartar)
+    partes = [previous[conservar.to_numpy()]]
+    if nuevas:
+        partes.append(data_utils.process_dataframe(pd.concat(nuevas, ignore_index=True), compact=False))
+    
+    merged = pd.concat(partes, ignore_index=True)
+    merged = merged.sort_values("Id", kind="stable", na_position="last").reset_index(drop=True)
+    return data_utils.compact_dataframe(merged)
+
+
+def is_multi_source(source: str) -> bool:
+    """
+    Indica si la fuente es un directorio o un patrón glob (y no un único archivo).
+    """
+    return os.path.isdir(source) or glob.has_magic(source)
+
+
+def resolve_sources(source: str) -> List[str]:
+    """
+    Archivos de una fuente, ordenados: el archivo mismo, los .xlsx/.csv de un
+    directorio o los que coinciden con un patrón glob.
+    """
+    if os.path.isdir(source):
+        paths = [p for patron in SOURCE_PATTERNS for p in glob.glob(os.path.join(source, patron))]
+    elif glob.has_magic(source):
+        paths = glob.glob(source, recursive=True)
+    else:
+        return [source]
+    # Se ignoran los archivos de bloqueo que deja Excel (~$archivo.xlsx)
+    paths = sorted(p for p in paths if os.path.isfile(p) and not os.path.basename(p).startswith("~$"))
+    if not paths:
+        raise FileNotFoundError(f"No se encontraron encuestas en {source}")
+    return paths
+
+
+def source_name(file_path: str) -> str:
+    """
+    Nombre de una fuente en la columna `Fuente` (el archivo sin extensión).
+    """
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def concat_sources(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatena datasets procesados agregando la columna `Fuente`.
+
+    Las categorías de cada columna se unifican antes de concatenar para que el
+    resultado siga siendo compacto sin pasar por columnas de objetos.
+    """
+    nombres = list(frames)
+    partes = list(frames.values())
+    for col in partes[0].columns:
+        if all(isinstance(p[col].dtype, pd.CategoricalDtype) for p in partes):
+            categorias = pd.Index(partes[0][col].cat.categories)
+            for p in partes[1:]:
+                categorias = categorias.append(p[col].cat.categories)
+            categorias = categorias.unique()
+            partes = [p.assign(**{col: p[col].cat.set_categories(categorias)}) for p in partes]
+    
+    df = pd.concat(partes, ignore_index=True)
+    df[SOURCE_COLUMN] = pd.Categorical.from_codes(
+        np.repeat(np.arange(len(nombres)), [len(p) for p in partes]), categories=nombres
+    )
+    return data_utils.compact_dataframe(df)
+
+
+@perf.timed
+def load_sources(source: str, cache_dir: str = DEFAULT_CACHE_DIR, incremental: bool = True,
+                 max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Carga una fuente con una o varias encuestas.
+
+    Un único archivo se carga con `load_processed`. Con un directorio o un patrón
+    glob, cada archivo se carga (y procesa si cambió) en un proceso del pool con
+    su propio snapshot, así que el tiempo depende de los núcleos disponibles y
+    no de la cantidad de archivos; los resultados se concatenan con `Fuente`.
+
+    Con `QUERY_BACKEND == "sqlite"` el resultado queda asociado a su base SQLite.
+    """
+    if not is_multi_source(source):
+        df = load_processed(source, cache_dir, incremental)
+        if QUERY_BACKEND == "sqlite":
+            attach_database(df, _database_path([source], [""], cache_dir))
+        return df
+    
+    paths = resolve_sources(source)
+    nombres = [source_name(p) for p in paths]
+    if len(set(nombres)) < len(nombres):
+        # Mismo nombre en distintas carpetas: se usa la ruta relativa
+        base = os.path.commonpath([os.path.abspath(p) for p in paths])
+        nombres = [os.path.splitext(os.path.relpath(os.path.abspath(p), base))[0] for p in paths]
+    
+    workers = min(len(paths), max_workers or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(
+                load_processed, paths, [cache_dir] * len(paths), [incremental] * len(paths)
+            ))
+    else:
+        frames = [load_processed(p, cache_dir, incremental) for p in paths]
+    df = concat_sources(dict(zip(nombres, frames)))
+    if QUERY_BACKEND == "sqlite":
+        attach_database(df, _database_path(paths, nombres, cache_dir))
+    return df
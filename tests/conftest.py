@@ -0,0 +1,9 @@
+"""
+Configuración común: módulos del proyecto y generador sintético de benchmarks/.
+"""
+
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [REPO_DIR, os.path.join(REPO_DIR, 'benchmarks')]
@@ -0,0 +1,21 @@
+"""
+`clean_column` debe limpiar exactamente como `clean_text`.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_utils
+
+VALORES = ['a\u2003b', 'x\u202fy', 'u\u3000v', 'p\x0bq', 'a\x1cb', 'n\x85m',
+           '  borde\u2028', ' doble  espacio\xa0', 'sin cambios', '', None, np.nan]
+
+
+@pytest.mark.parametrize('dtype', [object, 'str', 'category'])
+def test_clean_column_igual_a_clean_text(dtype):
+    serie = pd.Series(VALORES * 2, dtype=dtype)
+    obtenido = data_utils.clean_column(serie)
+    esperado = serie.map(data_utils.clean_text)
+    for a, b in zip(obtenido, esperado):
+        assert (pd.isna(a) and pd.isna(b)) or a == b, (a, b)
@@ -0,0 +1,69 @@
+"""
+El cubo de respuestas debe dar exactamente lo mismo que reagrupar las filas.
+"""
+
+import pandas as pd
+import pytest
+
+from synthetic import generate_raw_survey
+import cube
+import data_utils
+import indexes
+import storage
+from constants import Q_YO_PREFIX, Q_EQ_PREFIX
+
+SECCIONES = {
+    'kpis': data_utils.compute_kpis,
+    'actividades': data_utils.get_actividades_stats,
+    'modos': data_utils.get_modos_stats,
+    'likert_yo': lambda df: data_utils.get_likert_stats(df, Q_YO_PREFIX),
+    'likert_equipo': lambda df: data_utils.get_likert_stats(df, Q_EQ_PREFIX),
+    'distribucion_yo': lambda df: data_utils.get_likert_distribution(df, Q_YO_PREFIX),
+    'distribucion_equipo': lambda df: data_utils.get_likert_distribution(df, Q_EQ_PREFIX),
+}
+
+
+@pytest.fixture(scope='module')
+def filas():
+    return data_utils.process_dataframe(generate_raw_survey(5000, seed=3))
+
+
+def _con_cubo(df: pd.DataFrame) -> pd.DataFrame:
+    con = df.copy()
+    cube.get_response_cube(con)
+    return con
+
+
+def _filtros(df: pd.DataFrame):
+    nombres = indexes.person_names(df)
+    fechas = df['Hora de inicio'].dropna().sort_values()
+    return [
+        {},
+        {'personas': nombres[:7]},
+        {'personas': ['nadie']},
+        {'fecha_desde': fechas.iloc[len(fechas) // 3].date(),
+         'fecha_hasta': fechas.iloc[2 * len(fechas) // 3].date()},
+    ]
+
+
+def _assert_same(esperado, obtenido):
+    if isinstance(esperado, pd.DataFrame):
+        pd.testing.assert_frame_equal(esperado, obtenido)
+    else:
+        assert esperado == obtenido
+
+
+@pytest.mark.parametrize('seccion', list(SECCIONES))
+def test_cubo_igual_a_filas(filas, seccion):
+    con = _con_cubo(filas)
+    for filtro in _filtros(filas):
+        _assert_same(SECCIONES[seccion](data_utils.filter_df(filas, **filtro)),
+                     SECCIONES[seccion](data_utils.filter_df(con, **filtro)))
+
+
+@pytest.mark.parametrize('seccion', list(SECCIONES))
+def test_cubo_no_fusiona_fuentes(filas, seccion):
+    fuentes = storage.concat_sources({'a': filas, 'b': filas})
+    con = _con_cubo(fuentes)
+    _assert_same(SECCIONES[seccion](data_utils.filter_df(fuentes, fuentes=['a'])),
+                 SECCIONES[seccion](data_utils.filter_df(con, fuentes=['a'])))
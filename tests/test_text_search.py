@@ -0,0 +1,61 @@
+"""
+La búsqueda de comentarios con índice debe dar lo mismo que filtrar por subcadena.
+"""
+
+import numpy as np
+import pytest
+
+from synthetic import generate_raw_survey
+import data_utils
+from constants import Q_COMENTARIOS, Q_IMPEDIMENTOS
+
+EXTRA = ['Uso Copilot a diario', 'La acción sugerida... ¡¡no!!', 'ver  doble espacio',
+         'snake_case_valor', 'C++ / C#', '100% útil']
+
+CONSULTAS = ['pilot', 'COPILOT', 'ción', 'cion', 'accion', '...', '¡¡', '++', '#', '%', '/',
+             'uso cop', 'a diario', 'case_v', '  doble', 'muy útil', 'repetitiv', 'zzz', '']
+
+
+@pytest.fixture(scope='module')
+def filas():
+    df = data_utils.process_dataframe(generate_raw_survey(3000, seed=5))
+    posiciones = np.flatnonzero(df['Atributo'].isin([Q_COMENTARIOS, Q_IMPEDIMENTOS]).to_numpy())
+    df = df.copy()
+    df['Valor'] = df['Valor'].cat.add_categories(EXTRA)
+    columna = df.columns.get_loc('Valor')
+    for i, valor in enumerate(EXTRA):
+        df.iloc[posiciones[2 * i], columna] = valor
+    return df
+
+
+def _por_subcadena(df, atributo, busqueda):
+    responses = data_utils.get_text_responses(df, atributo)
+    busqueda = busqueda.strip()
+    if busqueda:
+        responses = responses[
+            responses['Valor'].str.contains(busqueda, case=False, regex=False).fillna(False)
+        ]
+    return responses.sort_values('Hora de inicio', ascending=False, kind='stable')
+
+
+@pytest.mark.parametrize('atributo', [Q_COMENTARIOS, Q_IMPEDIMENTOS])
+def test_busqueda_igual_a_subcadena(filas, atributo):
+    for busqueda in CONSULTAS:
+        obtenido = data_utils.search_text_responses(filas, atributo, busqueda)
+        esperado = _por_subcadena(filas, atributo, busqueda)
+        assert obtenido.index.tolist() == esperado.index.tolist(), busqueda
+
+
+def test_subcadena_dentro_de_palabra(filas):
+    for atributo in (Q_COMENTARIOS, Q_IMPEDIMENTOS):
+        if len(data_utils.search_text_responses(filas, atributo, 'pilot')):
+            return
+    pytest.fail("'pilot' no encuentra 'Copilot'")
+
+
+def test_busqueda_en_subconjunto(filas):
+    sub = data_utils.filter_df(filas, personas=sorted(filas['Nombre'].dropna().unique())[:20])
+    for busqueda in CONSULTAS:
+        obtenido = data_utils.search_text_responses(sub, Q_COMENTARIOS, busqueda)
+        esperado = _por_subcadena(sub, Q_COMENTARIOS, busqueda)
+        assert obtenido.index.tolist() == esperado.index.tolist(), busqueda
@@ -0,0 +1,248 @@
+"""
+Índice invertido sobre las respuestas de texto libre.
+
+Cubre las filas de Q_IMPEDIMENTOS, Q_CAPACITACIONES y Q_COMENTARIOS. Los tokens
+se normalizan (minúsculas, sin acentos, espacios colapsados como en
+`clean_text`) y cada token apunta a las posiciones de fila que lo contienen.
+El vocabulario está ordenado, así que las búsquedas por prefijo son un rango.
+
+Consultas: los términos se combinan con AND; `OR` (o `|`) separa alternativas y
+un `*` final busca por prefijo. Ejemplo: `capacitacion* OR curso`.
+
+`substring_candidates` usa el vocabulario para acotar una búsqueda por
+subcadena (la de "Comentarios de Usuarios") a las filas que pueden contenerla.
+"""
+
+import os
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import indexes
+from constants import Q_IMPEDIMENTOS, Q_CAPACITACIONES, Q_COMENTARIOS
+
+# Preguntas abiertas que entran al índice
+TEXT_QUESTIONS = [Q_IMPEDIMENTOS, Q_CAPACITACIONES, Q_COMENTARIOS]
+
+# Incrementar cuando cambie la normalización o el formato persistido
+TEXT_INDEX_VERSION = 1
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def fold_text(texto) -> str:
+    """
+    Normaliza un texto para buscar: minúsculas, sin acentos y espacios colapsados.
+    """
+    if not isinstance(texto, str):
+        return ''
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.replace('\xa0', ' ').split())
+
+
+def tokenize(texto) -> List[str]:
+    """
+    Tokens normalizados de un texto.
+    """
+    return _TOKEN_RE.findall(fold_text(texto))
+
+
+def build_text_index(df: pd.DataFrame) -> Dict:
+    """
+    Construye el índice invertido de las respuestas de texto libre de `df`.
+
+    Cada valor distinto se tokeniza una sola vez; las listas de posiciones se
+    arman con operaciones vectorizadas sobre los códigos de fila.
+    """
+    partes = [indexes.question_positions(df, q) for q in TEXT_QUESTIONS]
+    rows = np.concatenate(partes).astype(np.int64)
+    row_question = np.repeat(np.arange(len(partes), dtype=np.int8), [len(p) for p in partes])
+    order = np.argsort(rows, kind='stable')
+    rows, row_question = rows[order], row_question[order]
+
+    codes, uniques = pd.factorize(df['Valor'].iloc[rows])
+    tokens_por_valor = [sorted(set(tokenize(valor))) for valor in uniques]
+    vocab = np.array(sorted({t for tokens in tokens_por_valor for t in tokens}), dtype=str)
+
+    # Tokens de cada valor distinto como ids del vocabulario (formato CSR)
+    largos = np.array([len(tokens) for tokens in tokens_por_valor] + [0], dtype=np.int64)
+    valor_tokens = np.searchsorted(vocab, np.array(
+        [t for tokens in tokens_por_valor for t in tokens], dtype=str
+    )) if len(vocab) > 0 else np.empty(0, dtype=np.int64)
+    valor_inicio = np.concatenate([[0], np.cumsum(largos[:-1])])
+
+    # Pares (token, fila): cada fila aporta los tokens de su valor (-1 = vacío)
+    largos_fila = largos[codes]
+    filas = np.repeat(rows, largos_fila)
+    desplazamiento = np.arange(largos_fila.sum()) - np.repeat(
+        np.cumsum(largos_fila) - largos_fila, largos_fila
+    )
+    token_ids = valor_tokens[np.repeat(valor_inicio[codes], largos_fila) + desplazamiento]
+    orden = np.lexsort((filas, token_ids))
+
+    return {
+        'version': TEXT_INDEX_VERSION,
+        'n_rows': len(df),
+        'vocab': vocab,
+        'offsets': np.searchsorted(token_ids[orden], np.arange(len(vocab) + 1)),
+        'postings': filas[orden],
+        'rows': rows,
+        'row_question': row_question,
+    }
+
+
+def save_text_index(index: Dict, path: str) -> None:
+    """
+    Guarda el índice como .npz (sin pickle).
+    """
+    with open(path, 'wb') as f:
+        np.savez(f, **{k: np.asarray(v) for k, v in index.items()})
+
+
+def load_text_index(path: str, n_rows: int) -> Optional[Dict]:
+    """
+    Lee un índice guardado; None si no existe, es de otra versión o de otra tabla.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        index = {k: data[k] for k in data.files}
+    index['version'] = int(index['version'])
+    index['n_rows'] = int(index['n_rows'])
+    if index['version'] != TEXT_INDEX_VERSION or index['n_rows'] != n_rows:
+        return None
+    return index
+
+
+def get_text_index(df: pd.DataFrame) -> Dict:
+    """
+    Índice de texto del DataFrame, construido la primera vez que se pide.
+    """
+    return indexes.state_entry(df, 'texto', build_text_index)
+
+
+def parse_query(consulta: str) -> List[List[Tuple[str, bool]]]:
+    """
+    Separa una consulta en alternativas (OR) de términos (AND): [[(token, prefijo)]].
+    """
+    grupos: List[List[Tuple[str, bool]]] = [[]]
+    for palabra in (consulta or '').split():
+        if palabra in ('OR', '|'):
+            grupos.append([])
+            continue
+        if palabra == 'AND':
+            continue
+        prefijo = palabra.endswith('*')
+        tokens = tokenize(palabra.rstrip('*'))
+        for i, token in enumerate(tokens):
+            grupos[-1].append((token, prefijo and i == len(tokens) - 1))
+    return [grupo for grupo in grupos if grupo]
+
+
+def _term_rows(index: Dict, token: str, prefijo: bool) -> np.ndarray:
+    """
+    Posiciones de fila (ordenadas) que contienen un token o un token con ese prefijo.
+    """
+    vocab = index['vocab']
+    inicio = np.searchsorted(vocab, token, side='left')
+    if prefijo:
+        fin = np.searchsorted(vocab, token + '\U0010ffff', side='left')
+    else:
+        fin = inicio + 1 if inicio < len(vocab) and vocab[inicio] == token else inicio
+    offsets, postings = index['offsets'], index['postings']
+    if fin - inicio == 1:
+        return postings[offsets[inicio]:offsets[inicio + 1]]
+    return np.unique(postings[offsets[inicio]:offsets[fin]])
+
+
+def query_index(index: Dict, consulta: str, prefix_all: bool = False) -> np.ndarray:
+    """
+    Posiciones de fila que cumplen la consulta.
+
+    Con `prefix_all=True` todos los términos se buscan por prefijo.
+    """
+    resultado = np.empty(0, dtype=np.int64)
+    for grupo in parse_query(consulta):
+        listas = sorted(
+            (_term_rows(index, token, prefijo or prefix_all) for token, prefijo in grupo), key=len
+        )
+        filas = listas[0]
+        for otra in listas[1:]:
+            if len(filas) == 0:
+                break
+            filas = np.intersect1d(filas, otra, assume_unique=True)
+        resultado = np.union1d(resultado, filas)
+    return resultado
+
+
+def _lookup(df: pd.DataFrame) -> Tuple[Dict, Optional[np.ndarray]]:
+    """
+    Índice aplicable a `df` y, si es un subconjunto filtrado, la máscara de filas del padre.
+    """
+    index = indexes.attached(df, 'texto')
+    if index is not None:
+        return index, None
+    origen = indexes.parent_of(df)
+    if origen is not None:
+        parent, mask = origen
+        index = indexes.attached(parent, 'texto')
+        if index is not None:
+            return index, mask
+    return get_text_index(df), None
+
+
+def search(df: pd.DataFrame, consulta: str, prefix_all: bool = False) -> np.ndarray:
+    """
+    Posiciones (en `df`) de las respuestas de texto libre que cumplen la consulta.
+
+    Para un subconjunto de `filter_df` se usa el índice del DataFrame original.
+    """
+    index, mask = _lookup(df)
+    filas = query_index(index, consulta, prefix_all)
+    if mask is None:
+        return filas
+    filas = filas[mask[filas]]
+    return (np.cumsum(mask) - 1)[filas]
+
+
+def facet_counts(df: pd.DataFrame, consulta: str, prefix_all: bool = False) -> Dict[str, int]:
+    """
+    Cantidad de respuestas que cumplen la consulta, por pregunta abierta.
+    """
+    index, mask = _lookup(df)
+    filas = query_index(index, consulta, prefix_all)
+    if mask is not None:
+        filas = filas[mask[filas]]
+    preguntas = index['row_question'][np.searchsorted(index['rows'], filas)]
+    conteos = np.bincount(preguntas, minlength=len(TEXT_QUESTIONS))
+    return {pregunta: int(n) for pregunta, n in zip(TEXT_QUESTIONS, conteos)}
+
+
+def substring_candidates(df: pd.DataFrame, texto: str) -> Optional[np.ndarray]:
+    """
+    Posiciones (en `df`) de las respuestas que pueden contener `texto` como subcadena.
+
+    Si una respuesta contiene `texto` (sin distinguir mayúsculas), cada token de
+    `texto` aparece dentro de algún token de la respuesta: se toman las filas de
+    los tokens del vocabulario que contienen el token más largo de la consulta.
+    Es un superconjunto que hay que confirmar con la comparación exacta. None si
+    `texto` no tiene tokens (solo puntuación o espacios).
+    """
+    tokens = tokenize(texto)
+    if not tokens:
+        return None
+    token = max(tokens, key=len)
+    index, mask = _lookup(df)
+    ids = np.flatnonzero(np.char.find(index['vocab'], token) >= 0)
+    offsets, postings = index['offsets'], index['postings']
+    filas = np.unique(np.concatenate(
+        [postings[offsets[i]:offsets[i + 1]] for i in ids] or [np.empty(0, dtype=np.int64)]
+    ))
+    if mask is None:
+        return filas
+    filas = filas[mask[filas]]
+    return (np.cumsum(mask) - 1)[filas]